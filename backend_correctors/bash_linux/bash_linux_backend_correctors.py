@@ -16,14 +16,20 @@
 #    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
 #     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
 #
-import os
+import functools
 import re
+import threading
+from datetime import datetime
 from pathlib import Path
 
 from croniter import croniter
 
+from backend_correctors.bash_linux.gpu_sales_api import GpuSalesApi
+from backend_correctors.bash_linux.sales_parser import SalesOutputParser
 from backend_correctors.interfaces import BackendCorrector
-from helpers import FileHelper, ProcessRunnerHelper
+from check_reports import report_check_failure, report_check_output, report_check_resource_usage
+from helpers import FileHelper, PortAllocator, ProcessRunnerHelper
+from sandbox import Sandbox, SandboxLimits
 
 
 class BashLinuxBackendCorrector(metaclass=BackendCorrector):
@@ -34,106 +40,268 @@ class BashLinuxBackendCorrector(metaclass=BackendCorrector):
 
 
 class SimpleBashLinuxBackendCorrector(BashLinuxBackendCorrector, FileHelper, ProcessRunnerHelper):
-    _API_PORT = '5000'
-    _OUTPUT_REGEX = (r'\b\w{3} \w{3} \d{2} \d{2}:\d{2}:\d{2} UTC \d{4}\n(?:rtx3060: ?\d+\n|rtx3070: ?\d+\n|rtx3080: ?'
-                     r'\d+\n|rtx3090: ?\d+\n|rx6700: ?\d+\n)+')
+    _API_FIRST_PORT = 5000
+    # Any host serving the GPU API on its default port, e.g. http://0.0.0.0:5000/rtx3060
+    _API_URL_REGEX = r'[\w.-]+:5000\b'
+    _API_URL_PATTERN = re.compile(_API_URL_REGEX)
+    _OUTPUT_REDIRECTION_PATTERN = re.compile(r'>>\s*\S+')
+    _SCRIPT_OUTPUT_FILE = 'sales_1.txt'
+    # The script could not be started, or may have been too slow only because the host was loaded
+    TRANSIENT_FAILURE_REASONS = {'execution_error', 'script_timeout'}
+    _SALES_PARSER = SalesOutputParser(GpuSalesApi.GPUS)
+    _CRON_CACHE_SIZE = 1024
+    _CRON_CADENCE_RUNS = 5
+    # Fixed origin of the cadence check, so that the next runs of an expression are computed once for all candidates
+    _CRON_CADENCE_ORIGIN = datetime(2024, 1, 1)
 
-    def __init__(self):
+    def __init__(self, port_pool_size: int = 64, api_seed: int = 0, expected_cron_interval: int = None,
+                 sandbox_limits: SandboxLimits = None, isolate_scripts: bool = False):
         self._ROOT_DIRECTORY = Path(__file__).parent.absolute()
-        self._API_SCRIPT = self._ROOT_DIRECTORY / Path('api')
+        self._port_allocator = PortAllocator(self._API_FIRST_PORT, port_pool_size)
+        self._api_seed = api_seed
+        self.expected_cron_interval = expected_cron_interval
+        # The scripts query the local GPU API, they cannot be isolated from the host network
+        self._sandbox = Sandbox(sandbox_limits, isolate=isolate_scripts)
+        self._gpu_sales_api = None
+        self._gpu_sales_api_lock = threading.Lock()
+
+    @classmethod
+    def from_args(cls, args):
+        """
+        Builds the backend corrector from the command line options.
+
+        Args:
+            args: The parsed command line arguments.
+
+        Returns:
+            The SimpleBashLinuxBackendCorrector.
+        """
+
+        sandbox_limits = SandboxLimits(cpu_time=args.script_cpu_time, memory=args.script_memory * 1024 ** 2,
+                                       processes=args.script_processes)
+        return cls(expected_cron_interval=args.expected_cron_interval, sandbox_limits=sandbox_limits,
+                   isolate_scripts=args.isolate_scripts)
+
+    def __getstate__(self):
+        # Worker processes start their own API
+        state = self.__dict__.copy()
+        state['_gpu_sales_api'] = None
+        del state['_gpu_sales_api_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._gpu_sales_api_lock = threading.Lock()
+
+    def _fetch_gpu_sales_api(self):
+        """
+        Returns the GPU sales API shared by every candidate, starting it on first use.
+
+        Returns:
+            The running GpuSalesApi.
+        """
+
+        with self._gpu_sales_api_lock:
+            if self._gpu_sales_api is None:
+                self._gpu_sales_api = GpuSalesApi(self._port_allocator, self._api_seed).start()
+            return self._gpu_sales_api
+
+    def fetch_grading_settings(self):
+        return {'api_seed': self._api_seed, 'expected_cron_interval': self.expected_cron_interval,
+                'sandbox': self._sandbox.fetch_settings()}
+
+    def close(self):
+        with self._gpu_sales_api_lock:
+            if self._gpu_sales_api is not None:
+                self._gpu_sales_api.stop()
+                self._gpu_sales_api = None
+
+    @staticmethod
+    def _normalize_cron_schedule(schedule: str):
+        return ' '.join(schedule.split()).lower()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=_CRON_CACHE_SIZE)
+    def _is_valid_cron_schedule(schedule: str):
+        """
+        Checks a normalized cron schedule, once per distinct schedule of the cohort.
+
+        Args:
+            schedule: The normalized cron schedule.
+
+        Returns:
+            True if croniter accepts the schedule, False otherwise.
+        """
+
+        try:
+            croniter(schedule)
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    @functools.lru_cache(maxsize=_CRON_CACHE_SIZE)
+    def _compute_cron_intervals(schedule: str, runs: int):
+        """
+        Computes the intervals between the next runs of a valid normalized cron schedule, once per distinct schedule.
+
+        Args:
+            schedule: The normalized cron schedule.
+            runs: The number of next runs to compute.
+
+        Returns:
+            The distinct intervals between two consecutive runs, in seconds.
+        """
+
+        iterator = croniter(schedule, SimpleBashLinuxBackendCorrector._CRON_CADENCE_ORIGIN)
+        run_times = [iterator.get_next(float) for _ in range(runs)]
+        return frozenset(int(later - earlier) for earlier, later in zip(run_times, run_times[1:]))
+
+    def _parse_sales(self, lines):
+        """
+        Parses the sales blocks written by a candidate, reporting the first offending line.
+
+        Args:
+            lines: The lines of the sales, e.g. an open sales file.
+
+        Returns:
+            The SalesReport of the sales.
+        """
+
+        report = self._SALES_PARSER.parse(lines)
+        if not report.is_valid:
+            location = f"Error in line {report.error_line}: " if report.error_line is not None else "Error: "
+            print(f"{location}{report.error}")
+            report_check_failure(report.reason, f"{location}{report.error}")
+        return report
 
     def _correct_script_output(self, output: str):
-        matches = re.findall(self._OUTPUT_REGEX, output)
-        if not matches:
+        return self._parse_sales(output.splitlines()).is_valid
+
+    def _correct_script_sales(self, output: str, expected_sales: dict):
+        """
+        Checks that the script wrote the sales answered by the GPU API, parsed like the sales file.
+
+        Args:
+            output: The content written by the script.
+            expected_sales: The number of sales answered by each GPU endpoint.
+
+        Returns:
+            True if the output is a valid sales report whose last block holds the expected sales, False otherwise.
+        """
+
+        report = self._parse_sales(output.splitlines())
+        if not report.is_valid:
             return False
-        # Check if all GPU types appear in every occurrence
-        gpu_types = {'rtx3060', 'rtx3070', 'rtx3080', 'rtx3090', 'rx6700'}
-        for match in matches:
-            gpu_occurrences = re.findall(r'(rtx\d+|rx\d+: ?\d+)', match)
-            matched_gpu_types = {
-                gpu_occurrence.split(':')[0]
-                for gpu_occurrence in gpu_occurrences
-            }
-            if not gpu_types.issubset(matched_gpu_types):
-                return False
-        return True
+        # A single run of the script writes a single block, appended after the ones of previous runs, if any
+        written_sales = report.blocks[-1].sales
+        return all(written_sales.get(gpu) == sales for gpu, sales in expected_sales.items())
 
     def _run_script_file(self, script_file: Path):
-        return self._run_script(script_file)
+        return self._execute_script(script_file, cwd=script_file.parent, sandbox=self._sandbox)
 
-    def _run_api_in_background(self):
-        self._release_port(self._API_PORT)
-        self._run_script(self._API_SCRIPT)
+    def _clean_up_bash_file(self, bash_file_path: Path, api_port):
+        """
+        Prepares a candidate script for execution in a single read and write of the file.
 
-    def _clean_up_bash_file(self, bash_file_path: Path):
-        self._remove_empty_lines(bash_file_path)
-        self._remove_comments_from_bash_file(bash_file_path)
+        Empty lines and comments are removed, the script output is redirected to the local output file and the GPU
+        API urls are pointed at the local API.
 
-    @staticmethod
-    def _replace_candidate_path_by_local_path(bash_file_path: Path):
+        Args:
+            bash_file_path: The path to the candidate script.
+            api_port: The port the local GPU API is served on.
+
+        Returns:
+            True if the script was prepared, False otherwise.
+        """
+
+        rewrites = [
+            (self._OUTPUT_REDIRECTION_PATTERN, f'>> {self._SCRIPT_OUTPUT_FILE}'),
+            (self._API_URL_PATTERN, f'127.0.0.1:{api_port}'),
+        ]
         try:
-            if not os.access(bash_file_path, os.W_OK):
-                # Change the permission of the script file to make it executable
-                os.chmod(bash_file_path, 0o744)  # 0o755 sets permission to rwxr-xr-x
-            # Read the content of the bash file
-            with open(bash_file_path, 'r') as file:
-                bash_script = file.read()
-
-            # Use regular expression to replace the text after >>
-            modified_script = re.sub(r'>>\s*\S+', '>> sales_1.txt', bash_script)
-
-            with open(bash_file_path, 'w') as file:
-                file.write(modified_script)
+            self._normalize_text_file(bash_file_path, self._BASH_FILE_COMMENT_PATTERN, rewrites, write=True)
+            return True
         except Exception as e:
             print(f"An error occurred: {e}")
-            return None
+            report_check_failure('unreadable_script', str(e))
+            return False
 
     def correct_exam_file(self, script_file: Path):
-        # TODO check the correctness of the script output
-        self._replace_candidate_path_by_local_path(script_file)
-        self._clean_up_bash_file(script_file)
-
-        self._run_api_in_background()
-        script_output = self._run_script_file(script_file)
-        self._release_port(self._API_PORT)
-        return 'Error' not in script_output
+        script_file = Path(script_file)
+        gpu_sales_api = self._fetch_gpu_sales_api()
+        if not self._clean_up_bash_file(script_file, gpu_sales_api.port):
+            # The script would write to its own files and query the real GPU API
+            return False
+        try:
+            execution = self._run_script_file(script_file)
+        except OSError as e:
+            print(f"Error during execution: {e}")
+            report_check_failure('execution_error', str(e))
+            return False
+        report_check_output(execution.stdout, execution.stderr)
+        report_check_resource_usage(execution.resource_usage.cpu_time, execution.resource_usage.max_memory)
+        if execution.timed_out:
+            report_check_failure('script_timeout', f"Killed after {execution.duration:.1f} seconds")
+            return False
+        if execution.returncode != 0:
+            report_check_failure('script_failed', f"Exit code {execution.returncode}")
+            return False
+        output_file = script_file.parent / self._SCRIPT_OUTPUT_FILE
+        if not output_file.is_file():
+            report_check_failure('no_script_output', f"The script did not write to {self._SCRIPT_OUTPUT_FILE}")
+            return False
+        with open(output_file, 'r', errors='replace') as file:
+            if self._correct_script_sales(file.read(), gpu_sales_api.sales):
+                return True
+        report_check_failure('wrong_sales', "The sales written differ from the ones answered by the API")
+        return False
 
     def correct_sales_file(self, sales_file):
-        self._clean_up_ordinary_file(sales_file)
-        # Define the regex pattern
-        with open(sales_file, 'r') as file:
-            file_content = file.read()
-            return self._correct_script_output(file_content)
+        try:
+            with self._open_text_file(sales_file) as file:
+                return self._parse_sales(file).is_valid
+        except FileNotFoundError:
+            print(f"Error: File '{sales_file}' not found")
+            report_check_failure('file_not_found')
+            return False
 
     def correct_cron_file(self, cron_file):
-        self._clean_up_cron_file(cron_file)
         try:
-            with open(cron_file, 'r') as file:
-                for line_number, line in enumerate(file, start=1):
-
-                    # Split the line into fields (schedule and command)
-                    fields = line.strip().split(maxsplit=5)
-                    if len(fields) != 6:
-                        print(f"Error in line {line_number}: Invalid cron format")
-                        return False
-
-                    schedule = ' '.join(fields[:5])
-                    script_path = fields[5]
-
-                    # Validate the cron schedule
-                    try:
-                        croniter(schedule)
-                    except ValueError:
-                        print(f"Error in line {line_number}: Invalid cron schedule")
-                        return False
-
-                    # # Validate the script path
-                    # if not os.path.isfile(script_path):
-                    #     print(f"Error in line {line_number}: Script file not found")
-                    #     return False
-
+            cron_content = self._clean_up_cron_file(cron_file)
         except FileNotFoundError:
             print(f"Error: File '{cron_file}' not found")
+            report_check_failure('file_not_found')
             return False
 
+        for line_number, line in enumerate(cron_content.splitlines(), start=1):
+
+            # Split the line into fields (schedule and command)
+            fields = line.strip().split(maxsplit=5)
+            if len(fields) != 6:
+                print(f"Error in line {line_number}: Invalid cron format")
+                report_check_failure('invalid_cron_format', f"Error in line {line_number}: {line}")
+                return False
+
+            schedule = ' '.join(fields[:5])
+            script_path = fields[5]
+
+            # Validate the cron schedule
+            schedule = self._normalize_cron_schedule(schedule)
+            if not self._is_valid_cron_schedule(schedule):
+                print(f"Error in line {line_number}: Invalid cron schedule")
+                report_check_failure('invalid_cron_schedule', f"Error in line {line_number}: {line}")
+                return False
+            if self.expected_cron_interval is not None and self._compute_cron_intervals(
+                    schedule, self._CRON_CADENCE_RUNS) != {self.expected_cron_interval}:
+                print(f"Error in line {line_number}: Cron schedule does not run every "
+                      f"{self.expected_cron_interval} seconds")
+                report_check_failure('unexpected_cron_cadence', f"Error in line {line_number}: {line}")
+                return False
+
+            # # Validate the script path
+            # if not os.path.isfile(script_path):
+            #     print(f"Error in line {line_number}: Script file not found")
+            #     return False
+
         return True
@@ -0,0 +1,106 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import contextlib
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from helpers import PortAllocator
+
+
+class GpuSalesApi:
+    """
+    Local stand-in for the GPU sales API the candidates scripts query, served from a background thread.
+
+    Every GPU endpoint answers a constant number of sales derived from the seed, so that the output of a candidate
+    script can be compared exactly to the expected sales whatever the order and concurrency of the requests.
+
+    Attributes:
+        sales: The number of sales answered by each GPU endpoint.
+
+    Methods:
+        start(): Starts serving the API on a leased port.
+        stop(): Stops the API and releases its port.
+    """
+
+    GPUS = ['rtx3060', 'rtx3070', 'rtx3080', 'rtx3090', 'rx6700']
+    _MAX_SALES = 20
+
+    def __init__(self, port_allocator: PortAllocator, seed: int = 0):
+        self.sales = {gpu: random.Random(f'{seed}:{gpu}').randint(0, self._MAX_SALES) for gpu in self.GPUS}
+        self._port_allocator = port_allocator
+        self._resources = contextlib.ExitStack()
+        self._server = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def _build_request_handler(self):
+        sales = self.sales
+
+        class GpuSalesRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                gpu = self.path.strip('/')
+                if gpu not in sales:
+                    self.send_error(404)
+                    return
+                body = str(sales[gpu]).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return GpuSalesRequestHandler
+
+    def start(self):
+        """
+        Starts serving the API on a leased port, held until the API is stopped.
+
+        Returns:
+            The started GpuSalesApi.
+        """
+
+        port = self._resources.enter_context(self._port_allocator.lease())
+        try:
+            self._server = ThreadingHTTPServer(('127.0.0.1', port), self._build_request_handler())
+        except OSError:
+            self._resources.close()
+            raise
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='gpu-sales-api', daemon=True).start()
+        return self
+
+    def stop(self):
+        """
+        Stops the API and releases its port.
+
+        Returns:
+            None
+        """
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._resources.close()
@@ -0,0 +1,126 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import re
+from dataclasses import dataclass, field
+
+
+@dataclass
+class SalesBlock:
+    """
+    A date header followed by the sales of the GPUs at that date.
+
+    Attributes:
+        line_number: The line number of the date header.
+        date: The date header.
+        sales: The number of sales of every GPU listed under the header.
+    """
+
+    line_number: int
+    date: str
+    sales: dict = field(default_factory=dict)
+
+
+@dataclass
+class SalesReport:
+    """
+    Outcome of the parsing of a sales file.
+
+    Attributes:
+        blocks: The blocks parsed before the first error, every block when the file is valid.
+        error_line: The line number of the first offending line, None if the file is valid or has no block at all.
+        error: The description of the first error, None if the file is valid.
+        reason: The code of the first error, 'missing_gpu_sales' or 'no_sales_block', None if the file is valid.
+    """
+
+    MISSING_GPU_SALES = 'missing_gpu_sales'
+    NO_SALES_BLOCK = 'no_sales_block'
+
+    blocks: list = field(default_factory=list)
+    error_line: int = None
+    error: str = None
+    reason: str = None
+
+    @property
+    def is_valid(self):
+        return self.error is None
+
+
+class SalesOutputParser:
+    """
+    Single-pass, line-oriented parser of the sales written by the candidates scripts.
+
+    The lines are consumed one by one from any iterable, e.g. an open file, so that the sales appended every minute
+    by a cron job for hours are never loaded whole. A block is a date header followed by GPU lines; blank lines are
+    skipped, and any other line ends the current block. Every block must list all the GPUs, and the parsing stops at
+    the first block missing one.
+
+    Methods:
+        parse(lines): Parses and validates the sales blocks.
+    """
+
+    _DATE_PATTERN = re.compile(r'\b\w{3} \w{3} \d{2} \d{2}:\d{2}:\d{2} UTC \d{4}$')
+
+    def __init__(self, gpus):
+        self.gpus = frozenset(gpus)
+        self._gpu_line_pattern = re.compile(rf"({'|'.join(map(re.escape, sorted(self.gpus)))}): ?(\d+)")
+
+    def _check_block(self, block: SalesBlock, report: SalesReport):
+        missing_gpus = self.gpus.difference(block.sales)
+        if missing_gpus:
+            report.error_line = block.line_number
+            report.error = f"Missing sales of {', '.join(sorted(missing_gpus))}"
+            report.reason = SalesReport.MISSING_GPU_SALES
+            return False
+        report.blocks.append(block)
+        return True
+
+    def parse(self, lines) -> SalesReport:
+        """
+        Parses and validates the sales blocks.
+
+        Args:
+            lines: The lines of the sales file, with or without their line endings.
+
+        Returns:
+            A SalesReport holding the parsed blocks and the first error, if any.
+        """
+
+        report = SalesReport()
+        block = None
+        for line_number, line in enumerate(lines, start=1):
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            if self._DATE_PATTERN.search(line):
+                # A header without any GPU line is not a block
+                if block is not None and block.sales and not self._check_block(block, report):
+                    return report
+                block = SalesBlock(line_number, line)
+            elif block is not None and (gpu_match := self._gpu_line_pattern.fullmatch(line)):
+                block.sales[gpu_match.group(1)] = int(gpu_match.group(2))
+            elif block is not None:
+                if block.sales and not self._check_block(block, report):
+                    return report
+                block = None
+        if block is not None and block.sales:
+            self._check_block(block, report)
+        if report.is_valid and not report.blocks:
+            report.error = 'No sales block found'
+            report.reason = SalesReport.NO_SALES_BLOCK
+        return report
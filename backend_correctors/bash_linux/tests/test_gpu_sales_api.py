@@ -0,0 +1,52 @@
+import shutil
+from urllib.request import urlopen
+
+import pytest
+
+from backend_correctors.bash_linux.bash_linux_backend_correctors import SimpleBashLinuxBackendCorrector
+from backend_correctors.bash_linux.gpu_sales_api import GpuSalesApi
+from helpers import PortAllocator
+
+
+def test_gpu_sales_api_answers_seeded_sales():
+    # Arrange
+    api = GpuSalesApi(PortAllocator(first_port=47100, pool_size=8), seed=42).start()
+
+    # Act
+    try:
+        answered_sales = {
+            gpu: int(urlopen(f"http://127.0.0.1:{api.port}/{gpu}").read())
+            for gpu in GpuSalesApi.GPUS
+        }
+    finally:
+        api.stop()
+
+    # Assert
+    assert answered_sales == api.sales
+    assert answered_sales == GpuSalesApi(PortAllocator(first_port=47100), seed=42).sales
+
+
+@pytest.mark.skipif(shutil.which("curl") is None, reason="curl is required to run the candidate script")
+@pytest.mark.parametrize("script, expected", [
+    # ID: HappyPath-SalesFetchedFromApi
+    ('date >> /home/ubuntu/sales.txt\nfor gpu in rtx3060 rtx3070 rtx3080 rtx3090 rx6700; do\n'
+     '  echo "$gpu: $(curl -s http://0.0.0.0:5000/$gpu)" >> /home/ubuntu/sales.txt\ndone\n', True),
+    # ID: ErrorCase-HardCodedSales
+    ('for gpu in rtx3060 rtx3070 rtx3080 rtx3090 rx6700; do\n  echo "$gpu: 1000" >> sales.txt\ndone\n', False),
+    # ID: ErrorCase-FailingScript
+    ('exit 1\n', False),
+], ids=["HappyPath-SalesFetchedFromApi", "ErrorCase-HardCodedSales", "ErrorCase-FailingScript"])
+def test_correct_exam_file(tmp_path, script, expected):
+    # Arrange
+    script_file = tmp_path / "exam.sh"
+    script_file.write_text("#!/bin/bash\n" + script)
+    corrector = SimpleBashLinuxBackendCorrector()
+
+    # Act
+    try:
+        result = corrector.correct_exam_file(script_file)
+    finally:
+        corrector.close()
+
+    # Assert
+    assert result == expected
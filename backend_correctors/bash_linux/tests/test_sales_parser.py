@@ -0,0 +1,40 @@
+import pytest
+
+from backend_correctors.bash_linux.gpu_sales_api import GpuSalesApi
+from backend_correctors.bash_linux.sales_parser import SalesOutputParser
+
+BLOCK = "Thu Mar 04 12:00:00 UTC 2021\nrtx3060: 5\nrtx3070: 10\nrtx3080: 15\nrtx3090: 20\nrx6700: 25\n"
+
+
+@pytest.mark.parametrize("content, expected_blocks, expected_error_line", [
+    # ID: HappyPath-BlocksSeparatedByNoise
+    (BLOCK + "some log line\n\n" + BLOCK, 2, None),
+    # ID: ErrorCase-IncompleteSecondBlock
+    (BLOCK + "Thu Mar 04 12:01:00 UTC 2021\nrtx3060: 5\nnoise\n" + BLOCK, 1, 7),
+    # ID: ErrorCase-NoBlock
+    ("rtx3060: 5\n", 0, None),
+], ids=["HappyPath-BlocksSeparatedByNoise", "ErrorCase-IncompleteSecondBlock", "ErrorCase-NoBlock"])
+def test_parse_sales(content, expected_blocks, expected_error_line):
+    # Arrange
+    parser = SalesOutputParser(GpuSalesApi.GPUS)
+
+    # Act
+    report = parser.parse(content.splitlines(keepends=True))
+
+    # Assert
+    assert len(report.blocks) == expected_blocks
+    assert report.error_line == expected_error_line
+    assert report.is_valid == (expected_blocks > 0 and expected_error_line is None)
+
+
+def test_parse_sales_returns_structured_blocks():
+    # Arrange
+    parser = SalesOutputParser(GpuSalesApi.GPUS)
+
+    # Act
+    report = parser.parse(iter(BLOCK.splitlines()))
+
+    # Assert
+    assert report.blocks[0].line_number == 1
+    assert report.blocks[0].date == "Thu Mar 04 12:00:00 UTC 2021"
+    assert report.blocks[0].sales == {"rtx3060": 5, "rtx3070": 10, "rtx3080": 15, "rtx3090": 20, "rx6700": 25}
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 
 from backend_correctors.bash_linux.bash_linux_backend_correctors import SimpleBashLinuxBackendCorrector
@@ -67,3 +69,76 @@ def test_correct_cron_file(tmp_path, cron_content, expected):
 
     # Assert
     assert result == expected
+
+
+@pytest.mark.parametrize("cron_content,expected_cron_interval,expected", [
+    # ID: HappyPath-EveryMinute
+    ("*/1  *  * * * /path/to/script.sh\n* * * * * /path/to/other_script.sh", 60, True),
+    # ID: HappyPath-NoCadenceCheck
+    ("0 * * * * /path/to/script.sh", None, True),
+    # ID: ErrorCase-WrongCadence
+    ("0 * * * * /path/to/script.sh", 60, False),
+], ids=["HappyPath-EveryMinute", "HappyPath-NoCadenceCheck", "ErrorCase-WrongCadence"])
+def test_correct_cron_file_cadence(tmp_path, cron_content, expected_cron_interval, expected):
+    # Arrange
+    cron_file = tmp_path / "cron.txt"
+    cron_file.write_text(cron_content)
+    corrector = SimpleBashLinuxBackendCorrector(expected_cron_interval=expected_cron_interval)
+
+    # Act
+    result = corrector.correct_cron_file(cron_file)
+
+    # Assert
+    assert result == expected
+
+
+def test_cron_schedules_are_validated_once_per_distinct_expression(tmp_path):
+    # Arrange
+    cron_file = tmp_path / "cron.txt"
+    cron_file.write_text("* * * * * /path/to/script.sh\n" * 50 + "*  * * * * /path/to/script.sh\n")
+    corrector = SimpleBashLinuxBackendCorrector()
+    SimpleBashLinuxBackendCorrector._is_valid_cron_schedule.cache_clear()
+
+    # Act
+    result = corrector.correct_cron_file(cron_file)
+
+    # Assert
+    assert result
+    assert SimpleBashLinuxBackendCorrector._is_valid_cron_schedule.cache_info().misses == 1
+
+
+def test_script_is_not_run_when_it_cannot_be_prepared(tmp_path):
+    # Arrange
+    script_file = tmp_path / "exam.sh"
+    script_file.write_text("curl http://10.0.0.1:5000/rtx3060 >> sales.txt\n")
+    corrector = SimpleBashLinuxBackendCorrector()
+
+    # Act
+    with patch.object(corrector, "_normalize_text_file", side_effect=UnicodeDecodeError("utf-8", b"", 0, 1, "bad")), \
+            patch.object(corrector, "_run_script_file") as run_script_file:
+        result = corrector.correct_exam_file(script_file)
+    corrector.close()
+
+    # Assert
+    assert result is False
+    run_script_file.assert_not_called()
+
+
+@pytest.mark.parametrize("output, expected", [
+    ("Thu Mar 04 12:00:00 UTC 2021\nrtx3060: 5\nrtx3070: 10\nrtx3080: 15\nrtx3090: 20\nrx6700: 25\n", True),
+    ("Thu Mar 04 12:00:00 UTC 2021\nrtx3060: 5\nrtx3070: 10\nrtx3080: 15\nrtx3090: 20\nrx6700: 26\n", False),
+    ("rtx3060: 5\nrtx3070: 10\nrtx3080: 15\nrtx3090: 20\nrx6700: 25\n", False),
+    ("Thu Mar 04 12:00:00 UTC 2021\nrtx3060 sold 5\nrtx3070 sold 10\nrtx3080 sold 15\nrtx3090 sold 20\n"
+     "rx6700 sold 25\n", False),
+], ids=["HappyPath-ExpectedSales", "ErrorCase-WrongSales", "ErrorCase-NoDateHeader", "ErrorCase-NotASalesBlock"])
+def test_correct_script_sales_agrees_with_the_sales_file_check(output, expected):
+    # Arrange
+    corrector = SimpleBashLinuxBackendCorrector()
+    expected_sales = {"rtx3060": 5, "rtx3070": 10, "rtx3080": 15, "rtx3090": 20, "rx6700": 25}
+
+    # Act
+    result = corrector._correct_script_sales(output, expected_sales)
+
+    # Assert
+    assert result == expected
+    assert not result or corrector._correct_script_output(output)
@@ -0,0 +1,111 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import asyncio
+import contextlib
+import time
+from concurrent import futures
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from profiler import profile_stage
+
+
+class ApiProbeSuite:
+    """
+    Asynchronous HTTP probes against a candidate API, sharing a single keep-alive connection pool.
+
+    The blocking requests calls run on a small private executor, so that independent probes are in flight at once
+    while the grader thread awaits them all. The latency of every probe is recorded by the active profiler, if any, as
+    a 'probe_<name>' stage of the candidate being graded.
+
+    Methods:
+        request(name, method, path, **kwargs): Sends a probe and returns its response, or None on connection errors.
+        wait_until_alive(path, is_alive, timeout): Polls an endpoint with exponential backoff until it is alive.
+        close(): Closes the connection pool.
+    """
+
+    def __init__(self, base_url: str, auth=None, concurrency: int = 4, request_timeout: float = 10):
+        self.base_url = base_url
+        self.request_timeout = request_timeout
+        self._session = requests.Session()
+        self._session.auth = auth
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self._session.mount('http://', adapter)
+        self._executor = futures.ThreadPoolExecutor(concurrency)
+
+    def _send(self, method, path, **kwargs):
+        try:
+            return self._session.request(method, self.base_url + path, timeout=self.request_timeout, **kwargs)
+        except requests.RequestException:
+            return None
+
+    async def request(self, name: str, method: str, path: str, **kwargs):
+        """
+        Sends a probe to the candidate API.
+
+        Args:
+            name: The name of the probe, its latency is recorded as the 'probe_<name>' stage.
+            method: The HTTP method.
+            path: The path of the endpoint, relative to the base url.
+            **kwargs: Extra arguments of requests.Session.request.
+
+        Returns:
+            The response, or None if the API could not be reached.
+        """
+
+        loop = asyncio.get_running_loop()
+        # Timed from the grader thread, which the profiler attributes to the candidate being graded
+        with profile_stage(f'probe_{name}'):
+            return await loop.run_in_executor(self._executor, lambda: self._send(method, path, **kwargs))
+
+    async def wait_until_alive(self, path: str, is_alive, timeout: float = 50, first_delay: float = 0.01,
+                               max_delay: float = 0.5, has_crashed=None):
+        """
+        Polls an endpoint with exponential backoff until the API is alive.
+
+        Args:
+            path: The path of the health check endpoint.
+            is_alive: Predicate telling whether a response means the API is alive.
+            timeout: The number of seconds after which the API is considered down.
+            first_delay: The delay before the second attempt, doubled after each failed attempt.
+            max_delay: The maximum delay between two attempts.
+            has_crashed: Predicate telling whether the API can no longer answer, e.g. because its process exited,
+                checked between two attempts.
+
+        Returns:
+            True if the API answered alive before the timeout, False otherwise.
+        """
+
+        deadline = time.monotonic() + timeout
+        delay = first_delay
+        while time.monotonic() < deadline:
+            response = await self.request('alive', 'GET', path)
+            with contextlib.suppress(ValueError):
+                if response is not None and is_alive(response):
+                    return True
+            if has_crashed is not None and has_crashed():
+                return False
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, max_delay)
+        return False
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
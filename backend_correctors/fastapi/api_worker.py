@@ -0,0 +1,67 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+"""
+Warm worker serving a single candidate API, run by the interpreter of the candidate virtualenv.
+
+The worker imports the web stack as soon as it is spawned, then blocks until the grader hands it a candidate as a
+single JSON line on its standard input, e.g. {"main_file": "/path/to/main.py", "port": 8000}. This module must only
+depend on the standard library and on the packages of the candidate virtualenv.
+"""
+import contextlib
+import importlib
+import importlib.util
+import json
+import os
+import sys
+
+
+def _preload(modules):
+    for module in modules:
+        # A candidate may not depend on every preloaded package
+        with contextlib.suppress(ImportError):
+            importlib.import_module(module)
+
+
+def _load_app(main_file):
+    # Served from the candidate's own folder, so that relative imports and data files resolve as with uvicorn
+    app_directory = os.path.dirname(main_file)
+    os.chdir(app_directory)
+    sys.path.insert(0, app_directory)
+    module_name = os.path.splitext(os.path.basename(main_file))[0]
+    spec = importlib.util.spec_from_file_location(module_name, main_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def main(preloaded_modules):
+    _preload(preloaded_modules)
+    command = sys.stdin.readline()
+    if not command:
+        # The grader went away before handing over a candidate
+        return
+    command = json.loads(command)
+    app = _load_app(command['main_file'])
+    import uvicorn
+    uvicorn.run(app, host='127.0.0.1', port=command['port'])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,166 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import collections
+import contextlib
+import json
+import subprocess
+import threading
+from pathlib import Path
+
+from backend_correctors.fastapi.virtualenv_cache import VirtualEnvLease
+
+
+class ApiWorkerPool:
+    """
+    Pool of warm Python workers per cached virtualenv, each ready to serve a single candidate API.
+
+    Spare workers are spawned ahead of time with the web stack already imported, so that serving a candidate only
+    costs the import of its main file. A worker is never reused: it is handed a single candidate and terminated with
+    it, a fresh spare being spawned in its place. The pool holds its own lease on every virtualenv it keeps spares
+    for, and only keeps spares for the most recently used virtualenvs.
+
+    Methods:
+        acquire(lease): Returns a warm worker of the leased virtualenv.
+        serve(worker, main_file, port): Hands a candidate API over to a worker.
+        close(): Terminates the spare workers and releases their virtualenvs.
+    """
+
+    PRELOADED_MODULES = [
+        'uvicorn', 'uvicorn.config', 'uvicorn.loops.auto', 'uvicorn.protocols.http.auto', 'uvicorn.lifespan.on',
+        'fastapi', 'pydantic'
+    ]
+    _WORKER_SCRIPT = Path(__file__).parent / 'api_worker.py'
+
+    def __init__(self, spares: int = 2, max_virtualenvs: int = 4):
+        self.spares = spares
+        self.max_virtualenvs = max_virtualenvs
+        # Virtualenv path -> (pool lease, spare workers), in least recently used order
+        self._virtualenvs = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Worker processes warm their own spares
+        return {'spares': self.spares, 'max_virtualenvs': self.max_virtualenvs}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _spawn(self, env_path: Path):
+        # Isolated mode keeps this package's folder out of the candidate's module path
+        return subprocess.Popen(
+            [str(env_path / 'bin' / 'python'), '-I', str(self._WORKER_SCRIPT), *self.PRELOADED_MODULES],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    @staticmethod
+    def terminate(worker: subprocess.Popen):
+        """
+        Terminates a worker, killing it if it does not exit in time.
+
+        Args:
+            worker: The worker process.
+
+        Returns:
+            None
+        """
+
+        worker.terminate()
+        try:
+            worker.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            worker.kill()
+            worker.wait()
+        for stream in (worker.stdin, worker.stdout, worker.stderr):
+            # The candidate left unsent by a dead worker cannot be flushed
+            with contextlib.suppress(BrokenPipeError):
+                if stream:
+                    stream.close()
+
+    def _discard(self, env_path: Path):
+        pool_lease, spares = self._virtualenvs.pop(env_path)
+        for spare in spares:
+            self.terminate(spare)
+        pool_lease.release()
+
+    def _fetch_spares(self, lease: VirtualEnvLease):
+        if lease.path in self._virtualenvs:
+            self._virtualenvs.move_to_end(lease.path)
+        else:
+            while len(self._virtualenvs) >= self.max_virtualenvs:
+                self._discard(next(iter(self._virtualenvs)))
+            self._virtualenvs[lease.path] = (lease.share(), collections.deque())
+        return self._virtualenvs[lease.path][1]
+
+    def acquire(self, lease: VirtualEnvLease) -> subprocess.Popen:
+        """
+        Returns a warm worker of the leased virtualenv, and spawns the spares of its next candidates.
+
+        A worker is spawned on the spot if no spare is ready, e.g. for the first candidate of a virtualenv.
+
+        Args:
+            lease: The lease of the candidate on its virtualenv.
+
+        Returns:
+            The worker process, which must be served a candidate and terminated afterwards.
+        """
+
+        with self._lock:
+            spares = self._fetch_spares(lease)
+            worker = None
+            while spares and worker is None:
+                spare = spares.popleft()
+                if spare.poll() is None:
+                    worker = spare
+                else:
+                    self.terminate(spare)
+            worker = worker or self._spawn(lease.path)
+            while len(spares) < self.spares:
+                spares.append(self._spawn(lease.path))
+        return worker
+
+    @staticmethod
+    def serve(worker: subprocess.Popen, main_file: Path, port: int):
+        """
+        Hands a candidate API over to a worker, which serves it on the given port.
+
+        Args:
+            worker: A worker returned by acquire.
+            main_file: The path to the main file of the candidate API.
+            port: The port the API must be served on.
+
+        Returns:
+            None
+        """
+
+        command = json.dumps({'main_file': str(Path(main_file).absolute()), 'port': port})
+        # A worker that died meanwhile never answers alive, which is reported by the health check
+        with contextlib.suppress(BrokenPipeError):
+            worker.stdin.write(f'{command}\n'.encode())
+            worker.stdin.close()
+
+    def close(self):
+        """
+        Terminates the spare workers and releases their virtualenvs.
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            while self._virtualenvs:
+                self._discard(next(iter(self._virtualenvs)))
@@ -16,15 +16,21 @@
 #    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
 #     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
 #
+import asyncio
 import contextlib
 import json
-import shutil
-import subprocess
-import time
+import threading
 from pathlib import Path
-import requests
+from backend_correctors.fastapi.api_probes import ApiProbeSuite
+from backend_correctors.fastapi.api_worker_pool import ApiWorkerPool
+from backend_correctors.fastapi.virtualenv_cache import VirtualEnvCache
 from backend_correctors.interfaces import BackendCorrector
-from helpers import FileHelper, ProcessRunnerHelper
+from helpers import FileHelper, PortAllocator, ProcessRunnerHelper
+from check_reports import report_check_failure
+from profiler import profile_stage
+
+# Virtualenv lease of the candidate being graded by the current thread
+_CANDIDATE_CONTEXT = threading.local()
 
 
 class FastApiBackendCorrector(metaclass=BackendCorrector):
@@ -33,124 +39,187 @@ class FastApiBackendCorrector(metaclass=BackendCorrector):
 
 
 class SimpleFastApiBackendCorrector(FastApiBackendCorrector, FileHelper, ProcessRunnerHelper):
-    BASE_URL = "http://localhost:8000"
+    API_FIRST_PORT = 8000
     ENDPOINTS = {
-        "questions": f"{BASE_URL}/questions",
-        "add_questions": f"{BASE_URL}/add-questions",
-        "alive": f"{BASE_URL}/alive"
+        "questions": "/questions",
+        "add_questions": "/add-questions",
+        "alive": "/alive"
     }
     AUTH = ("admin", "4dm1N")
+    _RANDOMNESS_SAMPLES = 4
+    # Failed pip installs (network, index outage) and APIs too slow to start on a loaded host, unlike an API whose
+    # process exited before answering (api_crashed)
+    TRANSIENT_FAILURE_REASONS = {'requirements_install_failed', 'requirements_not_installed', 'api_not_alive'}
     TEMPLATE_KEYS = {
         "question", "subject", "use", "correct", "responseA",
         "responseB", "responseC", "responseD", "remark"
     }
 
-    def __init__(self):
+    def __init__(self, virtualenv_cache_disk_budget: int = None, port_pool_size: int = 64, api_worker_spares: int = 2):
         self._ROOT_DIRECTORY = Path(__file__).parent.absolute()
-        self._env_path = self._ROOT_DIRECTORY / "../../myenv"
-        self._extracted_path = self._ROOT_DIRECTORY / "../../extracted_exam_files"
+        self._port_allocator = PortAllocator(self.API_FIRST_PORT, port_pool_size)
+        self._virtualenv_cache = VirtualEnvCache(self._ROOT_DIRECTORY / "../../.virtualenv_cache",
+                                                 virtualenv_cache_disk_budget)
+        self._api_worker_pool = ApiWorkerPool(api_worker_spares)
 
-    @staticmethod
-    def _create_virtualenv():
-        subprocess.run(['python3', '-m', 'venv', 'myenv'], check=True)
+    @classmethod
+    def from_args(cls, args):
+        """
+        Builds the backend corrector from the command line options, none of which applies to FastAPI exams.
+
+        Args:
+            args: The parsed command line arguments.
 
-    def _install_requirements(self, file_path):
-        subprocess.run([self._env_path / 'bin' / 'pip3', 'install', '-r', file_path], check=True)
+        Returns:
+            The SimpleFastApiBackendCorrector.
+        """
 
-    def _add_init_file(self):
-        init_file_path = self._extracted_path / "__init__.py"
-        init_file_path.touch()
+        return cls()
 
-    def _copy_api_file(self, file_path):
-        shutil.copy(file_path, self._extracted_path)
+    def close(self):
+        self._api_worker_pool.close()
 
-    def _run_api(self):
-        uvicorn_command = [
-            str(self._env_path / 'bin' / 'uvicorn'), "extracted_exam_files.main:app"
-        ]
-        return subprocess.Popen(uvicorn_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    @property
+    def _env_path(self):
+        lease = getattr(_CANDIDATE_CONTEXT, 'virtualenv_lease', None)
+        return lease.path if lease else None
+
+    def _lease_virtualenv(self, requirements_file):
+        self._release_virtualenv()
+        with profile_stage('install_requirements'):
+            _CANDIDATE_CONTEXT.virtualenv_lease = self._virtualenv_cache.lease(requirements_file)
 
     @staticmethod
-    def _fetch_response(endpoint):
-        response = requests.get(endpoint, auth=SimpleFastApiBackendCorrector.AUTH)
-        return response.json() if response.status_code == 200 else None
+    def _release_virtualenv():
+        if lease := getattr(_CANDIDATE_CONTEXT, 'virtualenv_lease', None):
+            lease.release()
+            _CANDIDATE_CONTEXT.virtualenv_lease = None
+
+    def _run_api(self, main_file, port):
+        # A warm worker of the candidate virtualenv serves it from the candidate's own folder, so that candidates
+        # never share a module path or data files
+        with profile_stage('start_api'):
+            api_worker = self._api_worker_pool.acquire(_CANDIDATE_CONTEXT.virtualenv_lease)
+            self._api_worker_pool.serve(api_worker, main_file, port)
+        return api_worker
 
     @staticmethod
-    def _responses_are_different(response_1, response_2):
-        return json.dumps(response_1, sort_keys=True) != json.dumps(response_2, sort_keys=True)
+    def _build_base_url(port):
+        return f"http://localhost:{port}"
 
     @staticmethod
-    def _test_if_get_questions_endpoint_response_is_random():
-        response_1 = SimpleFastApiBackendCorrector._fetch_response(SimpleFastApiBackendCorrector.ENDPOINTS["questions"])
-        time.sleep(1)
-        response_2 = SimpleFastApiBackendCorrector._fetch_response(SimpleFastApiBackendCorrector.ENDPOINTS["questions"])
-        return SimpleFastApiBackendCorrector._responses_are_different(response_1, response_2)
+    def _fetch_json(response):
+        if response is None or response.status_code != 200:
+            return None
+        with contextlib.suppress(ValueError):
+            return response.json()
+        return None
 
     @staticmethod
-    def _test_get_questions_endpoint_response_structure():
-        response = SimpleFastApiBackendCorrector._fetch_response(SimpleFastApiBackendCorrector.ENDPOINTS["questions"])
+    def _responses_are_different(response_1, response_2):
+        return json.dumps(response_1, sort_keys=True) != json.dumps(response_2, sort_keys=True)
+
+    def _is_alive_response(self, response):
+        return response.status_code == 200 and response.json() == {'message': "L'API fonctionne"}
+
+    def _test_get_questions_endpoint_response_structure(self, response):
         if response and isinstance(response, list):
             return all(
-                isinstance(item, dict) and set(item.keys()) == SimpleFastApiBackendCorrector.TEMPLATE_KEYS
+                isinstance(item, dict) and set(item.keys()) == self.TEMPLATE_KEYS
                 for item in response
             )
         return False
 
-    def _test_get_questions_endpoint_response(self):
-        structure_valid = self._test_get_questions_endpoint_response_structure()
-        response_is_random = self._test_if_get_questions_endpoint_response_is_random()
+    async def _test_get_questions_endpoint_response(self, probes: ApiProbeSuite):
+        # Two samples are requested at once, more only if they happen to be identical
+        samples = await asyncio.gather(*[
+            probes.request('questions', 'GET', self.ENDPOINTS["questions"]) for _ in range(2)
+        ])
+        responses = [self._fetch_json(sample) for sample in samples]
+        structure_valid = self._test_get_questions_endpoint_response_structure(responses[0])
+        while not self._responses_are_different(responses[0], responses[-1]) and \
+                len(responses) < self._RANDOMNESS_SAMPLES:
+            responses.append(self._fetch_json(await probes.request('questions', 'GET', self.ENDPOINTS["questions"])))
+        response_is_random = self._responses_are_different(responses[0], responses[-1])
         return structure_valid and response_is_random
 
-    @staticmethod
-    def _test_add_questions_endpoint():
-        response = requests.post(SimpleFastApiBackendCorrector.ENDPOINTS["add_questions"],
-                                 auth=SimpleFastApiBackendCorrector.AUTH)
-        return response.status_code == 200 and response.json() == {"Message": "La question a bien été ajoutée"}
+    async def _test_add_questions_endpoint(self, probes: ApiProbeSuite):
+        response = await probes.request('add_questions', 'POST', self.ENDPOINTS["add_questions"])
+        return self._fetch_json(response) == {"Message": "La question a bien été ajoutée"}
 
-    @staticmethod
-    def _test_health_check_endpoint(timeout=50):
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            with contextlib.suppress(Exception):
-                response = requests.get(SimpleFastApiBackendCorrector.ENDPOINTS["alive"])
-                if response.status_code == 200 and response.json() == {'message': "L'API fonctionne"}:
-                    return True
-            time.sleep(1)
+    async def _test_health_check_endpoint(self, probes: ApiProbeSuite, api_worker=None, timeout=50):
+        # The process serving the API exits when the candidate code cannot be imported, e.g. a syntax error
+        def has_crashed():
+            return api_worker is not None and api_worker.poll() is not None
+
+        with profile_stage('wait_until_alive'):
+            api_is_alive = await probes.wait_until_alive(self.ENDPOINTS["alive"], self._is_alive_response, timeout,
+                                                         has_crashed=has_crashed)
+        if api_is_alive:
+            return True
+        if has_crashed():
+            detail = f"The server exited with code {api_worker.returncode} before answering"
+            print(detail)
+            report_check_failure('api_crashed', detail)
+            return False
         print(f"Timeout: Server did not start within {timeout} seconds")
+        report_check_failure('api_not_alive', f"Server did not start within {timeout} seconds")
         return False
 
-    @staticmethod
-    def _terminate_uvicorn_process(uvicorn_process):
-        uvicorn_process.terminate()
-        try:
-            uvicorn_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            uvicorn_process.kill()
+    async def _probe_api(self, base_url, api_worker=None):
+        """
+        Runs the endpoint checks against a served candidate API.
 
-    @staticmethod
-    def _cleanup():
-        shutil.rmtree('myenv')
+        The latency of every probe is recorded as a 'probe_<name>' stage of the active profiler, if any.
+
+        Args:
+            base_url: The url the candidate API is served on.
+            api_worker: The process serving the candidate API, whose exit ends the wait for the API to be alive.
+
+        Returns:
+            True if every endpoint behaves as expected, False otherwise.
+        """
+
+        probes = ApiProbeSuite(base_url, self.AUTH)
+        try:
+            if not await self._test_health_check_endpoint(probes, api_worker):
+                return False
+            with profile_stage('probe_endpoints'):
+                # Questions are sampled before adding one, so that the addition cannot pass for randomness
+                questions_endpoint_valid = await self._test_get_questions_endpoint_response(probes)
+                add_questions_endpoint_valid = await self._test_add_questions_endpoint(probes)
+            if not questions_endpoint_valid:
+                report_check_failure('invalid_questions_endpoint')
+            if not add_questions_endpoint_valid:
+                report_check_failure('invalid_add_questions_endpoint')
+            return questions_endpoint_valid and add_questions_endpoint_valid
+        finally:
+            probes.close()
 
     def correct_main_file(self, main_file):
-        uvicorn_process = None
+        api_worker = None
         try:
-            self._add_init_file()
-            self._copy_api_file(main_file)
-            uvicorn_process = self._run_api()
-            health_check_passed = self._test_health_check_endpoint()
-            questions_endpoint_valid = self._test_get_questions_endpoint_response()
-            add_questions_endpoint_valid = self._test_add_questions_endpoint()
-            return health_check_passed and questions_endpoint_valid and add_questions_endpoint_valid
+            if self._env_path is None:
+                # The requirements could not be installed, the API cannot be served
+                report_check_failure('requirements_not_installed')
+                return False
+            with self._port_allocator.lease() as port:
+                base_url = self._build_base_url(port)
+                try:
+                    api_worker = self._run_api(main_file, port)
+                    return asyncio.run(self._probe_api(base_url, api_worker))
+                finally:
+                    # The port must be free again before its lease is released, and workers never serve twice
+                    if api_worker:
+                        self._api_worker_pool.terminate(api_worker)
         finally:
-            if uvicorn_process:
-                self._terminate_uvicorn_process(uvicorn_process)
-            self._cleanup()
+            self._release_virtualenv()
 
     def correct_requirements_file(self, requirement_file):
         try:
-            self._create_virtualenv()
-            self._install_requirements(requirement_file)
+            self._lease_virtualenv(requirement_file)
             return True
         except Exception as e:
             print(e)
+            report_check_failure('requirements_install_failed', str(e))
             return False
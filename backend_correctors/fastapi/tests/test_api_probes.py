@@ -0,0 +1,112 @@
+import asyncio
+import itertools
+import json
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend_correctors.fastapi.api_probes import ApiProbeSuite
+from backend_correctors.fastapi.fastapi_backend_correctors import SimpleFastApiBackendCorrector
+from check_reports import run_check
+from profiler import StageProfiler
+
+QUESTION = {key: "value" for key in SimpleFastApiBackendCorrector.TEMPLATE_KEYS}
+
+
+def serve_stub_api(random_questions):
+    counter = itertools.count()
+
+    class StubApiHandler(BaseHTTPRequestHandler):
+        def _reply(self, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/alive":
+                self._reply({"message": "L'API fonctionne"})
+            else:
+                self._reply([{**QUESTION, "question": str(next(counter) if random_questions else 0)}])
+
+        def do_POST(self):
+            self._reply({"Message": "La question a bien été ajoutée"})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.mark.parametrize("random_questions, expected", [
+    (True, True),
+    (False, False),
+], ids=["HappyPath-RandomQuestions", "ErrorCase-SameQuestionsEveryTime"])
+def test_probe_api(random_questions, expected):
+    # Arrange
+    server = serve_stub_api(random_questions)
+    corrector = SimpleFastApiBackendCorrector()
+
+    # Act
+    try:
+        result = asyncio.run(corrector._probe_api(f"http://127.0.0.1:{server.server_address[1]}"))
+    finally:
+        server.shutdown()
+
+    # Assert
+    assert result == expected
+
+
+def test_probe_latencies_are_profiled_per_candidate():
+    # Arrange
+    server = serve_stub_api(random_questions=True)
+    corrector = SimpleFastApiBackendCorrector()
+    profiler = StageProfiler().activate()
+
+    # Act
+    try:
+        with profiler.candidate("jane"):
+            asyncio.run(corrector._probe_api(f"http://127.0.0.1:{server.server_address[1]}"))
+    finally:
+        profiler.deactivate()
+        server.shutdown()
+
+    # Assert
+    probe_stages = {span.stage for span in profiler.spans if span.stage.startswith("probe_")}
+    assert probe_stages >= {"probe_alive", "probe_questions", "probe_add_questions"}
+    assert {span.candidate for span in profiler.spans} == {"jane"}
+
+
+@pytest.mark.parametrize("worker_command, expected_reason", [
+    ("import sys; sys.exit(1)", "api_crashed"),
+    ("import time; time.sleep(30)", "api_not_alive"),
+], ids=["ErrorCase-WorkerExited", "ErrorCase-SlowStart"])
+def test_health_check_tells_crashed_apis_from_slow_ones(worker_command, expected_reason):
+    # Arrange
+    corrector = SimpleFastApiBackendCorrector()
+    api_worker = subprocess.Popen([sys.executable, "-c", worker_command])
+    probes = ApiProbeSuite("http://127.0.0.1:9")
+
+    # Act
+    try:
+        with run_check("main.py") as check:
+            start_time = time.monotonic()
+            api_is_alive = asyncio.run(corrector._test_health_check_endpoint(probes, api_worker, timeout=2))
+            duration = time.monotonic() - start_time
+    finally:
+        probes.close()
+        api_worker.kill()
+        api_worker.wait()
+
+    # Assert
+    assert not api_is_alive
+    assert check.reason == expected_reason
+    assert duration < 1.5 if expected_reason == "api_crashed" else duration >= 2
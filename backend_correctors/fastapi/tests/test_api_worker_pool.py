@@ -0,0 +1,87 @@
+import fcntl
+import os
+import sys
+
+import pytest
+
+from backend_correctors.fastapi.api_worker_pool import ApiWorkerPool
+from backend_correctors.fastapi.virtualenv_cache import VirtualEnvLease
+
+
+def lease_fake_virtualenv(tmp_path, name="env"):
+    # The interpreter running the tests stands in for the one of a cached virtualenv
+    env_path = tmp_path / name
+    (env_path / "bin").mkdir(parents=True)
+    os.symlink(sys.executable, env_path / "bin" / "python")
+    lock_file = open(tmp_path / f"{name}.lock", "a")
+    fcntl.flock(lock_file, fcntl.LOCK_SH)
+    return VirtualEnvLease(env_path, lock_file)
+
+
+@pytest.mark.parametrize("spares, candidates", [
+    (1, 1),
+    (2, 3),
+    (0, 2),
+], ids=["HappyPath-OneSpare", "HappyPath-SparesReused", "EdgeCase-NoSpare"])
+def test_acquire_keeps_spares_warm(tmp_path, spares, candidates):
+    # Arrange
+    lease = lease_fake_virtualenv(tmp_path)
+    pool = ApiWorkerPool(spares)
+
+    # Act
+    workers = [pool.acquire(lease) for _ in range(candidates)]
+    spare_workers = list(pool._virtualenvs[lease.path][1])
+    pool.close()
+
+    # Assert
+    try:
+        assert all(worker.poll() is None for worker in workers)
+        assert len(spare_workers) == spares
+        assert not set(spare_workers) & set(workers)
+        assert all(spare.poll() is not None for spare in spare_workers)
+        assert not pool._virtualenvs
+    finally:
+        for worker in workers:
+            pool.terminate(worker)
+        lease.release()
+
+
+def test_acquire_evicts_least_recently_used_virtualenv(tmp_path):
+    # Arrange
+    leases = [lease_fake_virtualenv(tmp_path, f"env_{i}") for i in range(3)]
+    pool = ApiWorkerPool(spares=1, max_virtualenvs=2)
+
+    # Act
+    workers = [pool.acquire(lease) for lease in leases]
+
+    # Assert
+    try:
+        assert list(pool._virtualenvs) == [leases[1].path, leases[2].path]
+    finally:
+        pool.close()
+        for worker in workers:
+            pool.terminate(worker)
+        for lease in leases:
+            lease.release()
+
+
+def test_serve_loads_main_file_from_candidate_folder(tmp_path):
+    # Arrange
+    lease = lease_fake_virtualenv(tmp_path)
+    candidate_folder = tmp_path / "candidate"
+    candidate_folder.mkdir()
+    (candidate_folder / "main.py").write_text("open('loaded', 'w').close()\napp = None\n")
+    pool = ApiWorkerPool(spares=0)
+
+    # Act
+    worker = pool.acquire(lease)
+    pool.serve(worker, candidate_folder / "main.py", 8000)
+    worker.wait(timeout=30)
+
+    # Assert
+    try:
+        assert (candidate_folder / "loaded").exists()
+    finally:
+        pool.terminate(worker)
+        pool.close()
+        lease.release()
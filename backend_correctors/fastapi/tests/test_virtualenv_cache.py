@@ -0,0 +1,32 @@
+import pytest
+
+from backend_correctors.fastapi.virtualenv_cache import VirtualEnvCache
+
+
+@pytest.mark.parametrize("requirements_1,requirements_2,same_key", [
+    # ID: HappyPath-SameRequirements
+    ("fastapi\nuvicorn\npandas\n", "fastapi\nuvicorn\npandas\n", True),
+    # ID: EdgeCase-OrderCommentsAndCase
+    ("fastapi\nuvicorn\npandas\n", "# api\nPandas\n\nUvicorn  # server\nfastapi\n", True),
+    # ID: EdgeCase-NameNormalization
+    ("python_multipart>=0.0.5,<1\n", "Python.Multipart <1, >=0.0.5\n", True),
+    # ID: ErrorCase-DifferentSpecifier
+    ("fastapi==0.110.0\n", "fastapi==0.111.0\n", False),
+    # ID: ErrorCase-MissingRequirement
+    ("fastapi\nuvicorn\n", "fastapi\nuvicorn\npandas\n", False),
+], ids=["HappyPath-SameRequirements", "EdgeCase-OrderCommentsAndCase", "EdgeCase-NameNormalization",
+        "ErrorCase-DifferentSpecifier", "ErrorCase-MissingRequirement"])
+def test_compute_key(tmp_path, requirements_1, requirements_2, same_key):
+    # Arrange
+    cache = VirtualEnvCache(tmp_path / "cache")
+    requirements_file_1 = tmp_path / "requirements_1.txt"
+    requirements_file_1.write_text(requirements_1)
+    requirements_file_2 = tmp_path / "requirements_2.txt"
+    requirements_file_2.write_text(requirements_2)
+
+    # Act
+    key_1 = cache.compute_key(requirements_file_1)
+    key_2 = cache.compute_key(requirements_file_2)
+
+    # Assert
+    assert (key_1 == key_2) == same_key
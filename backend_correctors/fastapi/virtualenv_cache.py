@@ -0,0 +1,242 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import fcntl
+import hashlib
+import os
+import platform
+import shutil
+import stat
+import subprocess
+import sys
+from pathlib import Path
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+
+class VirtualEnvLease:
+    """
+    A shared lock on a cached virtualenv, preventing its eviction while a candidate is using it.
+
+    Attributes:
+        path: The path of the leased virtualenv.
+    """
+
+    def __init__(self, path: Path, lock_file):
+        self.path = path
+        self._lock_file = lock_file
+
+    def share(self):
+        """
+        Takes another lease on the same virtualenv, held until it is released independently of this one.
+
+        Returns:
+            The new VirtualEnvLease.
+        """
+
+        lock_file = open(self._lock_file.name, 'a')
+        fcntl.flock(lock_file, fcntl.LOCK_SH)
+        return VirtualEnvLease(self.path, lock_file)
+
+    def release(self):
+        """
+        Releases the lease, allowing the virtualenv to be evicted again.
+
+        Returns:
+            None
+        """
+
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+
+class VirtualEnvCache:
+    """
+    Content-addressed cache of virtualenvs keyed by a requirements set.
+
+    Two requirements files resolving to the same set of canonicalized specifiers, for the same interpreter, share
+    a single prebuilt virtualenv. Environments are built once, made read-only and evicted in least recently used
+    order whenever the cache grows past its disk budget.
+
+    Methods:
+        compute_key(requirements_file): Computes the cache key of a requirements file.
+        lease(requirements_file): Returns a lease on a virtualenv satisfying the requirements file.
+    """
+
+    _COMPLETE_MARKER = '.complete'
+    _LOCK_SUFFIX = '.lock'
+    _DEFAULT_DISK_BUDGET = 5 * 1024 ** 3
+
+    def __init__(self, cache_directory: Path, disk_budget: int = None):
+        self.cache_directory = Path(cache_directory)
+        self.disk_budget = disk_budget or self._DEFAULT_DISK_BUDGET
+
+    @staticmethod
+    def _canonicalize_requirement(line: str):
+        """
+        Canonicalizes a single requirements file line.
+
+        Args:
+            line: A line of a requirements file.
+
+        Returns:
+            The canonical form of the requirement, or None for blank and comment lines.
+        """
+
+        line = line.split(' #', 1)[0].strip()
+        if not line or line.startswith('#'):
+            return None
+        try:
+            requirement = Requirement(line)
+        except InvalidRequirement:
+            # Options, urls and editable installs are kept verbatim
+            return ' '.join(line.split())
+        extras = f"[{','.join(sorted(requirement.extras))}]" if requirement.extras else ''
+        specifier = ','.join(sorted(str(s) for s in requirement.specifier))
+        marker = f';{requirement.marker}' if requirement.marker else ''
+        url = f'@{requirement.url}' if requirement.url else ''
+        return f'{canonicalize_name(requirement.name)}{extras}{specifier}{url}{marker}'
+
+    @staticmethod
+    def _interpreter_tag():
+        return f'{platform.python_implementation()}-{platform.python_version()}'
+
+    def compute_key(self, requirements_file: Path) -> str:
+        """
+        Computes the cache key of a requirements file.
+
+        Args:
+            requirements_file: The path to the requirements file.
+
+        Returns:
+            The hex digest of the sorted canonical requirements and the interpreter version.
+        """
+
+        with open(requirements_file, 'r') as file:
+            requirements = {
+                requirement
+                for line in file
+                if (requirement := self._canonicalize_requirement(line)) is not None
+            }
+        digest = hashlib.sha256(self._interpreter_tag().encode())
+        for requirement in sorted(requirements):
+            digest.update(b'\n' + requirement.encode())
+        return digest.hexdigest()
+
+    def _open_lock(self, key: str):
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        return open(self.cache_directory / f'{key}{self._LOCK_SUFFIX}', 'a')
+
+    @staticmethod
+    def _directory_size(path: Path) -> int:
+        return sum(
+            os.lstat(os.path.join(root, file)).st_size
+            for root, directories, files in os.walk(path)
+            for file in files
+        )
+
+    @staticmethod
+    def _set_writable(path: Path, writable: bool):
+        for root, directories, files in os.walk(path):
+            for name in directories + files:
+                entry = os.path.join(root, name)
+                if os.path.islink(entry):
+                    continue
+                mode = os.lstat(entry).st_mode
+                mode = mode | stat.S_IWUSR if writable else mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+                os.chmod(entry, mode)
+
+    def _build(self, env_path: Path, requirements_file: Path):
+        if env_path.exists():
+            # Leftover of an interrupted build
+            self._remove(env_path)
+        subprocess.run([sys.executable, '-m', 'venv', env_path], check=True)
+        subprocess.run([env_path / 'bin' / 'pip3', 'install', '-q', '-r', requirements_file], check=True)
+        size = self._directory_size(env_path)
+        self._set_writable(env_path, False)
+        (self.cache_directory / f'{env_path.name}{self._COMPLETE_MARKER}').write_text(str(size))
+
+    def _remove(self, env_path: Path):
+        self._set_writable(env_path, True)
+        shutil.rmtree(env_path, ignore_errors=True)
+        (self.cache_directory / f'{env_path.name}{self._COMPLETE_MARKER}').unlink(missing_ok=True)
+
+    def _evict(self, keep: str):
+        """
+        Evicts the least recently used virtualenvs until the cache fits in its disk budget.
+
+        Environments currently leased by a candidate are never evicted.
+
+        Args:
+            keep: The key of the virtualenv being leased, which must survive the eviction.
+
+        Returns:
+            None
+        """
+
+        markers = sorted(self.cache_directory.glob(f'*{self._COMPLETE_MARKER}'), key=lambda m: m.stat().st_mtime)
+        total_size = sum(int(marker.read_text() or 0) for marker in markers)
+        for marker in markers:
+            if total_size <= self.disk_budget:
+                break
+            key = marker.name.removesuffix(self._COMPLETE_MARKER)
+            if key == keep:
+                continue
+            with self._open_lock(key) as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                total_size -= int(marker.read_text() or 0)
+                self._remove(self.cache_directory / key)
+
+    def lease(self, requirements_file: Path) -> VirtualEnvLease:
+        """
+        Returns a lease on a virtualenv satisfying the requirements file, building it on a cache miss.
+
+        Args:
+            requirements_file: The path to the requirements file.
+
+        Returns:
+            A VirtualEnvLease that must be released once the candidate is graded.
+
+        Raises:
+            subprocess.CalledProcessError: If the virtualenv could not be built.
+        """
+
+        key = self.compute_key(requirements_file)
+        env_path = self.cache_directory / key
+        marker = self.cache_directory / f'{key}{self._COMPLETE_MARKER}'
+        lock_file = self._open_lock(key)
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            if not marker.exists():
+                # Upgrade to an exclusive lock, somebody else may have built it in the meantime
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                if not marker.exists():
+                    self._build(env_path, requirements_file)
+                fcntl.flock(lock_file, fcntl.LOCK_SH)
+            os.utime(marker)
+        except BaseException:
+            lock_file.close()
+            raise
+        self._evict(keep=key)
+        return VirtualEnvLease(env_path, lock_file)
@@ -0,0 +1,207 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import io
+import random
+import tarfile
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from backend_correctors.bash_linux.gpu_sales_api import GpuSalesApi
+
+
+class CohortGenerator:
+    """
+    Generates synthetic cohorts of candidates archives, mixing valid and invalid exams, to benchmark the graders.
+
+    The cohort is fully determined by the seed, so that benchmarks run on different commits grade the same archives.
+
+    Methods:
+        generate_bash_cohort(size, valid_ratio, archive_format, sales_blocks, nesting_depth): Generates bash exams.
+        generate_fastapi_cohort(size, valid_ratio, archive_format, nesting_depth): Generates FastAPI exams.
+    """
+
+    ARCHIVE_FORMATS = {
+        'tar': ('.tar', 'w'),
+        'tar.gz': ('.tar.gz', 'w:gz'),
+        'tar.bz2': ('.tar.bz2', 'w:bz2'),
+        'tar.xz': ('.tar.xz', 'w:xz'),
+        'zip': ('.zip', None),
+    }
+    _SALES_ORIGIN = datetime(2024, 3, 4, 12, 0, 0)
+    _BASH_MISTAKES = ['invalid_cron', 'incomplete_sales', 'hard_coded_sales', 'missing_script']
+    _FASTAPI_MISTAKES = ['not_random', 'wrong_alive_message', 'missing_requirements']
+
+    _VALID_SCRIPT = (
+        '#!/bin/bash\n'
+        '# Appends the current sales of every GPU\n'
+        'date >> /home/ubuntu/sales.txt\n'
+        'for gpu in {gpus}; do\n'
+        '  echo "$gpu: $(curl -s http://0.0.0.0:5000/$gpu)" >> /home/ubuntu/sales.txt\n'
+        'done\n'
+    )
+    _HARD_CODED_SCRIPT = (
+        '#!/bin/bash\n'
+        'date >> /home/ubuntu/sales.txt\n'
+        'for gpu in {gpus}; do\n'
+        '  echo "$gpu: 1000" >> /home/ubuntu/sales.txt\n'
+        'done\n'
+    )
+    _FASTAPI_APP = '''import random
+
+from fastapi import Depends, FastAPI
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
+
+app = FastAPI()
+security = HTTPBasic()
+questions = [
+    {{"question": f"Question {{index}}", "subject": "BDD", "use": "Test", "correct": "A", "responseA": "a",
+      "responseB": "b", "responseC": "c", "responseD": "d", "remark": ""}}
+    for index in range(20)
+]
+
+
+@app.get("/alive")
+def is_alive():
+    return {{"message": "{alive_message}"}}
+
+
+@app.get("/questions")
+def get_questions(credentials: HTTPBasicCredentials = Depends(security)):
+    return {sample}
+
+
+@app.post("/add-questions")
+def add_questions(credentials: HTTPBasicCredentials = Depends(security)):
+    return {{"Message": "La question a bien été ajoutée"}}
+'''
+    _FASTAPI_REQUIREMENTS = 'fastapi\nuvicorn\n'
+
+    def __init__(self, destination: Path, seed: int = 0):
+        self.destination = Path(destination)
+        self._random = random.Random(seed)
+
+    def _pick_mistakes(self, size, valid_ratio, mistakes):
+        valid_count = round(size * valid_ratio)
+        candidates_mistakes = [None] * valid_count + [
+            self._random.choice(mistakes) for _ in range(size - valid_count)
+        ]
+        self._random.shuffle(candidates_mistakes)
+        return candidates_mistakes
+
+    def _write_archive(self, name, files, archive_format, nesting_depth):
+        """
+        Writes the files of a candidate to an archive, nested under the given number of folders.
+
+        Args:
+            name: The name of the candidate.
+            files: The content of every file of the candidate, by file name.
+            archive_format: One of ARCHIVE_FORMATS.
+            nesting_depth: The number of folders the files are nested under inside the archive.
+
+        Returns:
+            The path to the archive.
+        """
+
+        suffix, tar_mode = self.ARCHIVE_FORMATS[archive_format]
+        archive_path = self.destination / f'exam_{name}{suffix}'
+        folder = '/'.join(['exam'] + [f'level_{depth}' for depth in range(1, nesting_depth)])
+        members = {f'{folder}/{file_name}': content.encode() for file_name, content in files.items()}
+        if tar_mode is None:
+            with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for member_name, content in members.items():
+                    archive.writestr(member_name, content)
+        else:
+            with tarfile.open(archive_path, tar_mode) as archive:
+                for member_name, content in members.items():
+                    member = tarfile.TarInfo(member_name)
+                    member.size = len(content)
+                    member.mode = 0o644
+                    archive.addfile(member, io.BytesIO(content))
+        return archive_path
+
+    def _build_sales(self, blocks, complete=True):
+        lines = []
+        for block in range(blocks):
+            lines.append((self._SALES_ORIGIN + timedelta(minutes=block)).strftime('%a %b %d %H:%M:%S UTC %Y'))
+            gpus = GpuSalesApi.GPUS if complete or block < blocks - 1 else GpuSalesApi.GPUS[:-1]
+            lines.extend(f'{gpu}: {self._random.randint(0, 20)}' for gpu in gpus)
+        return '\n'.join(lines) + '\n'
+
+    def generate_bash_cohort(self, size: int, valid_ratio: float = 0.8, archive_format: str = 'tar',
+                             sales_blocks: int = 10, nesting_depth: int = 1):
+        """
+        Generates a cohort of bash exams.
+
+        Args:
+            size: The number of candidates.
+            valid_ratio: The share of candidates whose exam is correct.
+            archive_format: One of ARCHIVE_FORMATS.
+            sales_blocks: The number of sales blocks in the sales file, one per minute the cron job ran.
+            nesting_depth: The number of folders the files are nested under inside the archives.
+
+        Returns:
+            A dictionary mapping the archive of every candidate to whether it must pass.
+        """
+
+        self.destination.mkdir(parents=True, exist_ok=True)
+        gpus = ' '.join(GpuSalesApi.GPUS)
+        cohort = {}
+        for index, mistake in enumerate(self._pick_mistakes(size, valid_ratio, self._BASH_MISTAKES)):
+            files = {
+                'cron.txt': '# Every minute\n* * * * * /home/ubuntu/exam.sh\n',
+                'sales.txt': self._build_sales(sales_blocks, complete=mistake != 'incomplete_sales'),
+                'exam.sh': (self._HARD_CODED_SCRIPT if mistake == 'hard_coded_sales' else self._VALID_SCRIPT).format(
+                    gpus=gpus),
+            }
+            if mistake == 'invalid_cron':
+                files['cron.txt'] = '* * * * /home/ubuntu/exam.sh\n'
+            elif mistake == 'missing_script':
+                del files['exam.sh']
+            cohort[self._write_archive(f'bash{index:05d}', files, archive_format, nesting_depth)] = mistake is None
+        return cohort
+
+    def generate_fastapi_cohort(self, size: int, valid_ratio: float = 0.8, archive_format: str = 'zip',
+                                nesting_depth: int = 1):
+        """
+        Generates a cohort of FastAPI exams, all sharing the same requirements.
+
+        Args:
+            size: The number of candidates.
+            valid_ratio: The share of candidates whose exam is correct.
+            archive_format: One of ARCHIVE_FORMATS.
+            nesting_depth: The number of folders the files are nested under inside the archives.
+
+        Returns:
+            A dictionary mapping the archive of every candidate to whether it must pass.
+        """
+
+        self.destination.mkdir(parents=True, exist_ok=True)
+        cohort = {}
+        for index, mistake in enumerate(self._pick_mistakes(size, valid_ratio, self._FASTAPI_MISTAKES)):
+            files = {
+                'main.py': self._FASTAPI_APP.format(
+                    alive_message='API down' if mistake == 'wrong_alive_message' else "L'API fonctionne",
+                    sample='questions[:5]' if mistake == 'not_random' else 'random.sample(questions, 5)'),
+                'requirements.txt': self._FASTAPI_REQUIREMENTS,
+            }
+            if mistake == 'missing_requirements':
+                del files['requirements.txt']
+            cohort[self._write_archive(f'fastapi{index:05d}', files, archive_format, nesting_depth)] = mistake is None
+        return cohort
@@ -0,0 +1,200 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.cohort_generator import CohortGenerator
+from exams_correctors.interfaces import ExamCorrector
+from exams_correctors.registry import load_corrector
+from exams_correctors.result_sinks import MemoryResultSink
+from profiler import StageProfiler
+
+
+class CohortBenchmark:
+    """
+    Measures the end-to-end and per-stage throughput of a grader on a synthetic cohort.
+
+    Every repetition grades the same cohort from scratch, without results cache, and checks that each candidate got
+    the expected verdict, so that a faster grader cannot silently become a wrong one.
+
+    Methods:
+        run(): Runs the benchmark and returns its record.
+    """
+
+    _PROJECT_DIRECTORY = Path(__file__).parent.parent.absolute()
+
+    def __init__(self, exam_type: str = 'bash', size: int = 50, valid_ratio: float = 0.8, archive_format: str = 'tar',
+                 sales_blocks: int = 10, nesting_depth: int = 1, engine: str = 'thread', workers: int = None,
+                 repeat: int = 3, seed: int = 0):
+        self.exam_type = exam_type
+        self.size = size
+        self.valid_ratio = valid_ratio
+        self.archive_format = archive_format
+        self.sales_blocks = sales_blocks
+        self.nesting_depth = nesting_depth
+        self.engine = engine
+        self.workers = workers
+        self.repeat = repeat
+        self.seed = seed
+
+    def _fetch_config(self):
+        return {
+            'exam_type': self.exam_type,
+            'size': self.size,
+            'valid_ratio': self.valid_ratio,
+            'archive_format': self.archive_format,
+            'sales_blocks': self.sales_blocks if self.exam_type == 'bash' else None,
+            'nesting_depth': self.nesting_depth,
+            'engine': self.engine,
+            'workers': self.workers,
+            'seed': self.seed,
+        }
+
+    def _generate_cohort(self, destination):
+        generator = CohortGenerator(destination, self.seed)
+        if self.exam_type == 'bash':
+            return generator.generate_bash_cohort(self.size, self.valid_ratio, self.archive_format,
+                                                  self.sales_blocks, self.nesting_depth)
+        return generator.generate_fastapi_cohort(self.size, self.valid_ratio, self.archive_format,
+                                                 self.nesting_depth)
+
+    def _build_corrector(self, cohort_folder, profiler, result_sink):
+        exam_corrector_class, backend_corrector_class = load_corrector(self.exam_type)
+        return exam_corrector_class(cohort_folder, backend_corrector_class(), engine=self.engine, workers=self.workers,
+                                    profiler=profiler, result_sinks=[result_sink])
+
+    def _count_wrong_verdicts(self, cohort, results):
+        expected_verdicts = {
+            ExamCorrector._fetch_candidate_name_from_folder_path(archive): 'Passed' if passes else 'Failed'
+            for archive, passes in cohort.items()
+        }
+        verdicts = {result['candidate_name']: result['result'] for result in results}
+        return sum(verdicts.get(candidate) != verdict for candidate, verdict in expected_verdicts.items())
+
+    def _fetch_commit(self):
+        try:
+            commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=self._PROJECT_DIRECTORY, capture_output=True,
+                                    text=True, check=True).stdout.strip()
+            dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                        cwd=self._PROJECT_DIRECTORY, capture_output=True, text=True).stdout.strip())
+        except (OSError, subprocess.CalledProcessError):
+            return None, None
+        return commit, dirty
+
+    def run(self):
+        """
+        Runs the benchmark.
+
+        Returns:
+            The record of the benchmark: the commit, the configuration, the wall time of every repetition, the
+            throughput, the latency of every stage in the last repetition and the number of wrong verdicts.
+        """
+
+        wall_times, wrong_verdicts = [], 0
+        with tempfile.TemporaryDirectory(prefix='exam_corrector_benchmark_') as cohort_folder:
+            cohort = self._generate_cohort(cohort_folder)
+            for _ in range(self.repeat):
+                profiler, result_sink = StageProfiler(), MemoryResultSink()
+                corrector = self._build_corrector(cohort_folder, profiler, result_sink)
+                start_time = time.perf_counter()
+                # The profile table of every repetition would drown the benchmark report
+                with contextlib.redirect_stdout(io.StringIO()):
+                    corrector.correct_candidate_files()
+                wall_times.append(time.perf_counter() - start_time)
+                wrong_verdicts = max(wrong_verdicts, self._count_wrong_verdicts(cohort, result_sink.results))
+        commit, dirty = self._fetch_commit()
+        median_wall_time = statistics.median(wall_times)
+        return {
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'config': self._fetch_config(),
+            'wall_times': wall_times,
+            'median_wall_time': median_wall_time,
+            'candidates_per_second': self.size / median_wall_time,
+            'stages': profiler.summarize(),
+            'wrong_verdicts': wrong_verdicts,
+        }
+
+
+def load_history(history_file: Path):
+    if not history_file.is_file():
+        return []
+    with open(history_file, 'r') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def append_to_history(history_file: Path, record: dict):
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_file, 'a') as file:
+        file.write(json.dumps(record) + '\n')
+
+
+def print_report(record: dict, previous_record: dict = None):
+    print(f"commit {record['commit']}{' (dirty)' if record['dirty'] else ''} - {json.dumps(record['config'])}")
+    print(f"median wall time: {record['median_wall_time']:.3f}s "
+          f"({record['candidates_per_second']:.2f} candidates/s), wrong verdicts: {record['wrong_verdicts']}")
+    if previous_record is not None:
+        change = record['median_wall_time'] / previous_record['median_wall_time'] - 1
+        print(f"vs commit {previous_record['commit']}: {previous_record['median_wall_time']:.3f}s ({change:+.1%})")
+    for stage in record['stages']:
+        print(f"  {stage['stage']:<24} n={stage['count']:<6} p50={stage['p50'] * 1000:9.2f}ms "
+              f"p95={stage['p95'] * 1000:9.2f}ms max={stage['max'] * 1000:9.2f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the graders on a synthetic cohort')
+    parser.add_argument('--type', choices=['bash', 'fastapi'], default='bash', help='Type of the exams to generate')
+    parser.add_argument('--size', type=int, default=50, help='Number of candidates of the cohort')
+    parser.add_argument('--valid-ratio', type=float, default=0.8, help='Share of correct exams in the cohort')
+    parser.add_argument('--format', choices=list(CohortGenerator.ARCHIVE_FORMATS), default='tar',
+                        help='Archive format of the exams')
+    parser.add_argument('--sales-blocks', type=int, default=10,
+                        help='Number of sales blocks of every sales file (bash exams only)')
+    parser.add_argument('--depth', type=int, default=1, help='Number of folders the files are nested under')
+    parser.add_argument('--engine', choices=['thread', 'process'], default='thread', help='Grading engine')
+    parser.add_argument('--workers', type=int, default=None, help='Number of grading workers')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of times the cohort is graded')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the cohort generator')
+    parser.add_argument('--history', default=Path(__file__).parent / 'history.jsonl',
+                        help='JSON lines file the benchmark records are appended to')
+    args = parser.parse_args()
+
+    benchmark = CohortBenchmark(args.type, args.size, args.valid_ratio, args.format, args.sales_blocks, args.depth,
+                                args.engine, args.workers, args.repeat, args.seed)
+    record = benchmark.run()
+    history_file = Path(args.history)
+    previous_records = [
+        previous_record
+        for previous_record in load_history(history_file)
+        if previous_record['config'] == record['config']
+    ]
+    print_report(record, previous_records[-1] if previous_records else None)
+    append_to_history(history_file, record)
@@ -0,0 +1,138 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import contextlib
+import threading
+import time
+from dataclasses import dataclass
+
+# The check being run by the current thread, if any
+_CURRENT_CHECK = threading.local()
+
+
+@dataclass
+class CheckReport:
+    """
+    Machine-readable outcome of the check of a candidate file.
+
+    Attributes:
+        file: The name of the checked file.
+        status: One of PASSED, FAILED or MISSING.
+        reason: The code of the reason the check failed, e.g. 'invalid_cron_schedule', None if it passed.
+        detail: A human-readable detail of the failure, e.g. the offending line.
+        duration: The duration of the check, in seconds.
+        stdout: The beginning of the standard output of the candidate code run by the check, if any.
+        stderr: The beginning of the standard error of the candidate code run by the check, if any.
+        cpu_time: The CPU time used by the candidate code run by the check, in seconds, if any.
+        max_memory: The peak resident memory of the candidate code run by the check, in bytes, if any.
+    """
+
+    PASSED = 'passed'
+    FAILED = 'failed'
+    MISSING = 'missing'
+    _MAX_EXCERPT_SIZE = 2000
+
+    file: str
+    status: str = None
+    reason: str = None
+    detail: str = None
+    duration: float = 0.0
+    stdout: str = ''
+    stderr: str = ''
+    cpu_time: float = None
+    max_memory: int = None
+
+    def fail(self, reason: str, detail: str = None):
+        # The first failure is the root cause, the following ones are its consequences
+        if self.reason is None:
+            self.reason, self.detail = reason, detail
+
+    def capture_output(self, stdout: str, stderr: str):
+        self.stdout = stdout[:self._MAX_EXCERPT_SIZE]
+        self.stderr = stderr[:self._MAX_EXCERPT_SIZE]
+
+
+@contextlib.contextmanager
+def run_check(file: str):
+    """
+    Runs the check of a candidate file, collecting the failures and outputs reported by the backend corrector.
+
+    Args:
+        file: The name of the checked file.
+
+    Yields:
+        The CheckReport of the check, whose status must be set by the caller.
+    """
+
+    previous_check = getattr(_CURRENT_CHECK, 'report', None)
+    _CURRENT_CHECK.report = report = CheckReport(file)
+    start_time = time.perf_counter()
+    try:
+        yield report
+    finally:
+        report.duration = time.perf_counter() - start_time
+        _CURRENT_CHECK.report = previous_check
+
+
+def report_check_failure(reason: str, detail: str = None):
+    """
+    Reports why the running check fails, if a check is running in the current thread.
+
+    Args:
+        reason: The code of the reason, in snake case.
+        detail: A human-readable detail of the failure.
+
+    Returns:
+        None
+    """
+
+    if report := getattr(_CURRENT_CHECK, 'report', None):
+        report.fail(reason, detail)
+
+
+def report_check_output(stdout: str, stderr: str):
+    """
+    Reports the outputs of the candidate code run by the running check, if a check is running in the current thread.
+
+    Args:
+        stdout: The standard output of the candidate code.
+        stderr: The standard error of the candidate code.
+
+    Returns:
+        None
+    """
+
+    if report := getattr(_CURRENT_CHECK, 'report', None):
+        report.capture_output(stdout, stderr)
+
+
+def report_check_resource_usage(cpu_time: float, max_memory: int):
+    """
+    Reports the resources used by the candidate code run by the running check, if a check is running in the current
+    thread.
+
+    Args:
+        cpu_time: The CPU time used by the candidate code, in seconds.
+        max_memory: The peak resident memory of the candidate code, in bytes.
+
+    Returns:
+        None
+    """
+
+    if report := getattr(_CURRENT_CHECK, 'report', None):
+        report.cpu_time, report.max_memory = cpu_time, max_memory
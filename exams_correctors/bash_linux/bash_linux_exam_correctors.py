@@ -41,5 +41,6 @@ class BashLinuxExamCorrector(ExamCorrector):
     _SCRIPT_FILE = 'exam.sh'
 
     _FILES_TO_CORRECT = [_CRON_FILE, _SALES_FILE, _SCRIPT_FILE]
+    _FILES_TO_MATERIALIZE = [_SCRIPT_FILE]
 
 
@@ -0,0 +1,150 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import json
+import os
+import threading
+import time
+from concurrent import futures
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class Cohort:
+    """
+    An exams folder of the batch and the type of exam it holds.
+
+    Attributes:
+        name: The name of the cohort, unique in the batch.
+        path: The path to the exams folder.
+        type: The type of the exam, e.g. 'bash' or 'fastapi'.
+    """
+
+    name: str
+    path: Path
+    type: str
+
+
+def load_manifest(manifest_path: Path, exam_types: list[str]) -> list[Cohort]:
+    """
+    Loads the cohorts of a batch manifest.
+
+    The manifest is a JSON list of objects with the 'path' of an exams folder, relative to the manifest, its exam
+    'type' and an optional 'name', e.g. [{"path": "session_1", "type": "bash"}]. The name defaults to the type and
+    the folder name.
+
+    Args:
+        manifest_path: The path to the manifest.
+        exam_types: The known exam types.
+
+    Returns:
+        The cohorts of the manifest, in order.
+
+    Raises:
+        ValueError: If the manifest is malformed, an exam type is unknown or two cohorts share a name.
+    """
+
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, 'r', encoding='utf-8') as file:
+        entries = json.load(file)
+    if not isinstance(entries, list):
+        raise ValueError(f"The manifest {manifest_path} must be a list of cohorts")
+    cohorts = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict) or 'path' not in entry:
+            raise ValueError(f"Cohort {index} of the manifest has no path")
+        if entry.get('type') not in exam_types:
+            raise ValueError(f"Cohort {index} of the manifest has unknown type {entry.get('type')!r}, expected one of "
+                             f"{exam_types}")
+        path = manifest_path.parent / entry['path']
+        cohorts.append(Cohort(entry.get('name') or f"{entry['type']}-{path.name}", path, entry['type']))
+    names = [cohort.name for cohort in cohorts]
+    if duplicates := sorted({name for name in names if names.count(name) > 1}):
+        raise ValueError(f"Cohorts must have unique names, found several {', '.join(duplicates)}")
+    return cohorts
+
+
+class BatchGrader:
+    """
+    Grades several cohorts in a single process, on a shared budget of candidates graded at once.
+
+    Every cohort is graded by its own exam corrector, built on demand, but the correctors of a same exam type are
+    expected to share their backend corrector, so that its warmed resources (local API, virtualenvs, worker pool)
+    outlive the cohorts. Several cohorts are graded at once, so that the budget freed by the tail of a cohort is
+    taken by the next one, and every grader acquires the shared budget before grading a candidate.
+
+    Attributes:
+        cohorts: The cohorts to grade.
+        create_exam_corrector: Callable returning the exam corrector of a cohort, given the cohort and the shared
+            worker budget, a semaphore the corrector must hold while grading a candidate.
+        workers: The number of candidates graded at once across every cohort, defaults to the number of graders of an
+            exam corrector.
+        max_concurrent_cohorts: The number of cohorts graded at once.
+
+    Methods:
+        run(): Grades every cohort and prints a summary of the batch.
+    """
+
+    def __init__(self, cohorts: list[Cohort], create_exam_corrector, workers: int = None,
+                 max_concurrent_cohorts: int = 2):
+        self.cohorts = cohorts
+        self.create_exam_corrector = create_exam_corrector
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_concurrent_cohorts = max_concurrent_cohorts
+        self._worker_budget = threading.BoundedSemaphore(self.workers)
+
+    def _grade_cohort(self, cohort: Cohort):
+        exam_corrector = self.create_exam_corrector(cohort, self._worker_budget)
+        # Counted before the results are filtered for the sinks, e.g. when only the failed exams are shown
+        results = []
+        exam_corrector.result_listeners.append(results.append)
+        start_time = time.perf_counter()
+        exam_corrector.correct_candidate_files()
+        return {
+            'cohort': cohort.name,
+            'type': cohort.type,
+            'candidates': len(results),
+            'passed': sum(result['result'] == 'Passed' for result in results),
+            'duration': round(time.perf_counter() - start_time, 1),
+            'error': '',
+        }
+
+    def run(self):
+        """
+        Grades every cohort, a failing cohort not preventing the others from being graded.
+
+        Returns:
+            The summary of every cohort, in the order of the batch.
+        """
+
+        from tabulate import tabulate
+
+        with futures.ThreadPoolExecutor(self.max_concurrent_cohorts) as executor:
+            gradings = [executor.submit(self._grade_cohort, cohort) for cohort in self.cohorts]
+        summaries = []
+        for cohort, grading in zip(self.cohorts, gradings):
+            if exception := grading.exception():
+                print(f"An error occurred while grading the cohort {cohort.name}: {exception}")
+                summaries.append({'cohort': cohort.name, 'type': cohort.type, 'candidates': 0, 'passed': 0,
+                                  'duration': 0.0, 'error': str(exception)})
+            else:
+                summaries.append(grading.result())
+        print(tabulate([summary.values() for summary in summaries], headers=summaries[0].keys(), tablefmt="grid")
+              if summaries else "No cohort to grade")
+        return summaries
@@ -0,0 +1,116 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import contextlib
+import threading
+import time
+from pathlib import Path
+
+try:
+    # Optional inotify bindings, waking the watcher up as soon as a file lands instead of polling the folder
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+class FolderWatcher:
+    """
+    Watches a folder for files landing in it or changing, yielding each file once it has stopped changing.
+
+    The folder is scanned every poll interval. When inotify is available, the watcher is also woken up by the changes
+    of the folder itself, so that new files are noticed at once. A file is yielded once its size and modification
+    time have not changed for the debounce delay, so that a partially written or copied file is never yielded.
+
+    Attributes:
+        folder: The watched folder.
+        list_files: Callable returning the files of the folder to watch, e.g. its archives.
+        debounce: The number of seconds a file must stay unchanged before being yielded.
+        poll_interval: The number of seconds between two scans of the folder.
+
+    Methods:
+        watch(stop_event): Yields the new and changed files until the event is set.
+    """
+
+    def __init__(self, folder: Path, list_files, debounce: float = 2.0, poll_interval: float = 1.0):
+        self.folder = Path(folder)
+        self.list_files = list_files
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+
+    @contextlib.contextmanager
+    def _open_notifier(self):
+        if inotify_simple is None:
+            yield None
+            return
+        notifier = inotify_simple.INotify()
+        try:
+            flags = inotify_simple.flags
+            notifier.add_watch(self.folder, flags.CREATE | flags.MODIFY | flags.CLOSE_WRITE | flags.MOVED_TO)
+            yield notifier
+        finally:
+            notifier.close()
+
+    @staticmethod
+    def _wait(notifier, stop_event: threading.Event, timeout: float):
+        if notifier is None:
+            stop_event.wait(timeout)
+        else:
+            notifier.read(timeout=int(timeout * 1000))
+
+    @staticmethod
+    def _fetch_signature(file: Path):
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def watch(self, stop_event: threading.Event = None):
+        """
+        Yields the files already in the folder, then every file landing in it or changing, once it stopped changing.
+
+        Args:
+            stop_event: Event stopping the watch once set, defaults to watching until interrupted.
+
+        Yields:
+            The path to every new or changed file.
+        """
+
+        stop_event = stop_event or threading.Event()
+        # File -> signature and time it was first seen with it, and file -> signature it was yielded with
+        pending_files, yielded_files = {}, {}
+        with self._open_notifier() as notifier:
+            while not stop_event.is_set():
+                now = time.monotonic()
+                files = self.list_files()
+                for file in files:
+                    signature = self._fetch_signature(file)
+                    if signature is None or signature[0] == 0 or yielded_files.get(file) == signature:
+                        continue
+                    if file not in pending_files or pending_files[file][0] != signature:
+                        pending_files[file] = (signature, now)
+                    elif now - pending_files[file][1] >= self.debounce:
+                        del pending_files[file]
+                        yielded_files[file] = signature
+                        yield file
+                # Deleted files are forgotten, so that a file landing again under the same name is yielded again
+                for forgotten_files in (pending_files, yielded_files):
+                    for file in forgotten_files.keys() - set(files):
+                        del forgotten_files[file]
+                timeout = min(self.poll_interval, self.debounce) if pending_files else self.poll_interval
+                self._wait(notifier, stop_event, timeout)
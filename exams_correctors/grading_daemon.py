@@ -0,0 +1,316 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import json
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent import futures
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from exams_correctors.interfaces import ExamCorrector
+
+
+@dataclass
+class Submission:
+    """
+    An exam archive submitted to the grading daemon, and its grading status.
+
+    Attributes:
+        id: The identifier of the submission.
+        type: The type of the exam, e.g. 'bash' or 'fastapi'.
+        candidate_name: The name of the candidate.
+        status: One of QUEUED, GRADING, GRADED or ERROR.
+        submitted_at: The submission timestamp.
+        graded_at: The timestamp the grading ended at, if it did.
+        result: The result of the candidate, once graded.
+        error: The error the grading failed with, if any.
+    """
+
+    QUEUED = 'queued'
+    GRADING = 'grading'
+    GRADED = 'graded'
+    ERROR = 'error'
+
+    id: str
+    type: str
+    candidate_name: str
+    status: str = QUEUED
+    submitted_at: float = None
+    graded_at: float = None
+    result: dict = None
+    error: str = None
+
+
+class SubmissionRejected(Exception):
+    """
+    Raised when a submission cannot be accepted, with the HTTP status it is answered with.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class GradingDaemon:
+    """
+    Resident grading service accepting exam archives over a local HTTP API and grading them as soon as they arrive.
+
+    Submissions are queued to a bounded pool of graders, each one graded by the long-lived exam corrector of its exam
+    type, so that the warmed resources of the backend correctors are shared by every submission.
+
+    Graded submissions, and the ones whose grading failed, stay retrievable for result_ttl seconds after their
+    grading ended. Only the max_finished_submissions most recently graded ones are kept beyond that, the oldest being
+    forgotten first, so that a long-running daemon does not grow without bound.
+
+    Endpoints:
+        POST /submissions?type=<type>&candidate=<name>: Submits the archive sent as request body, answers the
+            queued submission with a 202 status.
+        GET /submissions/<id>: Answers the status, and the result once graded, of a submission.
+        GET /health: Answers the number of submissions per status.
+
+    Methods:
+        submit(exam_type, candidate_name, archive): Queues an archive for grading.
+        fetch(submission_id): Returns a submission, unless it was graded too long ago.
+        start(): Serves the API from a background thread.
+        serve_forever(): Serves the API from the calling thread until interrupted.
+        stop(): Stops serving and waits for the queued submissions to be graded.
+    """
+
+    _MAX_ARCHIVE_SIZE = 64 * 1024 ** 2
+    _DEFAULT_RESULT_TTL = 3600
+    _DEFAULT_MAX_FINISHED_SUBMISSIONS = 10000
+    _CANDIDATE_NAME_PATTERN = re.compile(r'[^\w -]+|_')
+
+    def __init__(self, exam_correctors: dict[str, ExamCorrector], uploads_directory: Path, host: str = '127.0.0.1',
+                 port: int = 8080, workers: int = 4, max_queued_submissions: int = 256,
+                 result_ttl: float = _DEFAULT_RESULT_TTL,
+                 max_finished_submissions: int = _DEFAULT_MAX_FINISHED_SUBMISSIONS):
+        self.exam_correctors = exam_correctors
+        self.uploads_directory = Path(uploads_directory)
+        self.host = host
+        self.max_queued_submissions = max_queued_submissions
+        self.result_ttl = result_ttl
+        self.max_finished_submissions = max_finished_submissions
+        self._requested_port = port
+        self._submissions = {}
+        self._submissions_lock = threading.Lock()
+        self._executor = futures.ThreadPoolExecutor(workers, thread_name_prefix='grader')
+        self._server = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def _count_pending_submissions(self):
+        return sum(submission.status in (Submission.QUEUED, Submission.GRADING)
+                   for submission in self._submissions.values())
+
+    def _evict_finished_submissions(self):
+        """
+        Forgets the submissions whose grading ended more than result_ttl seconds ago, then the oldest finished ones
+        beyond max_finished_submissions. Must be called holding the submissions lock.
+
+        Returns:
+            None
+        """
+
+        expiry = time.time() - self.result_ttl
+        finished_submissions = sorted(
+            (submission for submission in self._submissions.values() if submission.graded_at is not None),
+            key=lambda submission: submission.graded_at)
+        evicted_count = max(sum(submission.graded_at < expiry for submission in finished_submissions),
+                            len(finished_submissions) - self.max_finished_submissions)
+        for submission in finished_submissions[:evicted_count]:
+            del self._submissions[submission.id]
+
+    def submit(self, exam_type: str, candidate_name: str, archive: bytes) -> Submission:
+        """
+        Queues an archive for grading.
+
+        Args:
+            exam_type: The type of the exam.
+            candidate_name: The name of the candidate.
+            archive: The content of the tar or zip archive, compressed or not.
+
+        Returns:
+            The queued Submission.
+
+        Raises:
+            SubmissionRejected: If the exam type is unknown, the archive is empty or too large, or the queue is full.
+        """
+
+        if exam_type not in self.exam_correctors:
+            raise SubmissionRejected(400, f"Unknown exam type {exam_type!r}, expected one of "
+                                          f"{sorted(self.exam_correctors)}")
+        # The candidate name is read back from the archive name, where underscores separate its parts
+        candidate_name = self._CANDIDATE_NAME_PATTERN.sub('-', candidate_name or '').strip()
+        if not candidate_name:
+            raise SubmissionRejected(400, "A candidate name is required")
+        if not archive:
+            raise SubmissionRejected(400, "The archive is empty")
+        if len(archive) > self._MAX_ARCHIVE_SIZE:
+            raise SubmissionRejected(413, f"The archive exceeds {self._MAX_ARCHIVE_SIZE} bytes")
+        submission = Submission(uuid.uuid4().hex, exam_type, candidate_name, submitted_at=time.time())
+        with self._submissions_lock:
+            self._evict_finished_submissions()
+            if self._count_pending_submissions() >= self.max_queued_submissions:
+                raise SubmissionRejected(503, "Too many submissions are waiting to be graded, retry later")
+            self._submissions[submission.id] = submission
+        exam_file = self.uploads_directory / submission.id / f'exam_{candidate_name}'
+        exam_file.parent.mkdir(parents=True, exist_ok=True)
+        exam_file.write_bytes(archive)
+        self._executor.submit(self._grade_submission, submission, exam_file)
+        return submission
+
+    def _grade_submission(self, submission: Submission, exam_file: Path):
+        submission.status = Submission.GRADING
+        try:
+            submission.result = self.exam_correctors[submission.type].correct_exam_file(exam_file)
+            submission.status = Submission.GRADED
+        except Exception as e:
+            print(f"An error occurred while grading the submission {submission.id}: {e}")
+            submission.error = str(e)
+            submission.status = Submission.ERROR
+        finally:
+            submission.graded_at = time.time()
+            shutil.rmtree(exam_file.parent, ignore_errors=True)
+
+    def fetch(self, submission_id: str):
+        """
+        Returns a submission.
+
+        Args:
+            submission_id: The identifier of the submission.
+
+        Returns:
+            The Submission, or None if it is unknown or was graded too long ago.
+        """
+
+        with self._submissions_lock:
+            self._evict_finished_submissions()
+            return self._submissions.get(submission_id)
+
+    def _fetch_health(self):
+        with self._submissions_lock:
+            self._evict_finished_submissions()
+            statuses = [submission.status for submission in self._submissions.values()]
+        return {status: statuses.count(status)
+                for status in (Submission.QUEUED, Submission.GRADING, Submission.GRADED, Submission.ERROR)}
+
+    def _build_request_handler(self):
+        daemon = self
+
+        class GradingRequestHandler(BaseHTTPRequestHandler):
+            def _reply(self, status, payload, headers=None):
+                body = json.dumps(payload, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = urlsplit(self.path).path.rstrip('/')
+                if path == '/health':
+                    self._reply(200, daemon._fetch_health())
+                elif path.startswith('/submissions/') and (
+                        submission := daemon.fetch(path.removeprefix('/submissions/'))):
+                    self._reply(200, asdict(submission))
+                else:
+                    self._reply(404, {'error': f"Unknown resource {path}"})
+
+            def do_POST(self):
+                url = urlsplit(self.path)
+                if url.path.rstrip('/') != '/submissions':
+                    self._reply(404, {'error': f"Unknown resource {url.path}"})
+                    return
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                content_length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    if content_length > daemon._MAX_ARCHIVE_SIZE:
+                        # Rejected before reading, the connection is closed along with the unread body
+                        self.close_connection = True
+                        raise SubmissionRejected(413, f"The archive exceeds {daemon._MAX_ARCHIVE_SIZE} bytes")
+                    submission = daemon.submit(query.get('type'), query.get('candidate'),
+                                               self.rfile.read(content_length))
+                except SubmissionRejected as e:
+                    self._reply(e.status, {'error': str(e)})
+                    return
+                self._reply(202, asdict(submission), {'Location': f'/submissions/{submission.id}'})
+
+            def log_message(self, format, *args):
+                pass
+
+        return GradingRequestHandler
+
+    def _create_server(self):
+        self._server = ThreadingHTTPServer((self.host, self._requested_port), self._build_request_handler())
+        self._server.daemon_threads = True
+
+    def start(self):
+        """
+        Serves the API from a background thread.
+
+        Returns:
+            The started GradingDaemon.
+        """
+
+        self._create_server()
+        threading.Thread(target=self._server.serve_forever, name='grading-daemon', daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        """
+        Serves the API from the calling thread until it is interrupted, then stops the daemon.
+
+        Returns:
+            None
+        """
+
+        self._create_server()
+        print(f"Grading submissions sent to http://{self.host}:{self.port}/submissions")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            self._server = None
+            self._executor.shutdown(wait=True)
+
+    def stop(self):
+        """
+        Stops serving and waits for the queued submissions to be graded.
+
+        Returns:
+            None
+        """
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._executor.shutdown(wait=True)
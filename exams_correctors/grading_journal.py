@@ -0,0 +1,116 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class GradingJournal:
+    """
+    Append-only checkpoint journal of the candidates graded by a run, so that an interrupted run can be resumed.
+
+    The journal is a JSON lines file: a header naming the corrector, then one entry per graded archive, flushed to
+    disk as soon as the candidate is graded. A line torn by a crash is ignored when the journal is read back.
+
+    Methods:
+        open(corrector, corrector_version): Opens the journal and returns the results of the archives already graded.
+        record(archive_digest, archive_name, result): Appends the result of an archive to the journal.
+        close(): Closes the journal.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = Path(path)
+        self.resume = resume
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _read_entries(self):
+        if not self.path.is_file():
+            return None, []
+        with open(self.path, 'r', encoding='utf-8') as file:
+            lines = []
+            for line in file:
+                try:
+                    lines.append(json.loads(line))
+                except ValueError:
+                    # Interrupted in the middle of an entry
+                    break
+        return (lines[0], lines[1:]) if lines else (None, [])
+
+    def open(self, corrector: str, corrector_version: str):
+        """
+        Opens the journal, keeping the entries of the previous run when resuming with the same corrector version.
+
+        Args:
+            corrector: The name of the corrector.
+            corrector_version: The version of the corrector.
+
+        Returns:
+            A dictionary mapping the digest of every archive graded by the resumed run to its result, empty if the run
+            is not resumed.
+        """
+
+        header = {'corrector': corrector, 'corrector_version': corrector_version}
+        completed_results = {}
+        if self.resume:
+            previous_header, entries = self._read_entries()
+            if previous_header == header:
+                completed_results = {entry['archive_digest']: entry['result'] for entry in entries}
+            elif previous_header is not None:
+                print(f"The journal {self.path} was written by another corrector version, every candidate is graded "
+                      f"again")
+        # The journal is rewritten rather than appended to, dropping any torn entry, and atomically replaced so that
+        # a crash while rewriting it cannot lose the resumed entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        rewritten_path = self.path.with_name(f'{self.path.name}.tmp')
+        with open(rewritten_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(header) + '\n')
+            for archive_digest, result in completed_results.items():
+                file.write(json.dumps({'archive_digest': archive_digest, 'result': result}, ensure_ascii=False) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(rewritten_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return completed_results
+
+    def record(self, archive_digest: str, archive_name: str, result: dict):
+        """
+        Appends the result of an archive to the journal and flushes it to disk.
+
+        Args:
+            archive_digest: The digest of the archive content.
+            archive_name: The name of the archive, kept for the record.
+            result: The result of the candidate.
+
+        Returns:
+            None
+        """
+
+        entry = {'archive_digest': archive_digest, 'archive': archive_name, 'result': result}
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -18,16 +18,31 @@
 #
 #
 
+import contextlib
+import copy
+import hashlib
+import json
+import inspect
 import os
+import queue
 import shutil
+import tempfile
+import threading
+import time
 from abc import ABC, ABCMeta
+from dataclasses import asdict
 from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-import tqdm
-from tabulate import tabulate
 
 from backend_correctors.interfaces import BackendCorrector
+from check_reports import CheckReport, run_check
+from exams_correctors.folder_watcher import FolderWatcher
+from exams_correctors.grading_journal import GradingJournal
+from exams_correctors.result_sinks import ResultSink, TableResultSink
+from exams_correctors.results_store import ResultsStore
 from helpers import ArchiveFileHelper
+from profiler import StageProfiler, profile_stage
 
 
 class ExamCorrectorMeta(ABCMeta):
@@ -40,27 +55,584 @@ class ExamCorrectorMeta(ABCMeta):
 class ExamCorrector(ABC, ArchiveFileHelper, metaclass=ExamCorrectorMeta):
     _EXAM_FILES_EXTRACTION_TARGET_FOLDER = Path('../extracted_exam_files')
     _FILES_TO_CORRECT = None
+    # Files that must be written to disk to be executed, the others are checked in memory. None extracts everything.
+    _FILES_TO_MATERIALIZE = None
+    THREAD_ENGINE = 'thread'
+    PROCESS_ENGINE = 'process'
+    ENGINES = [THREAD_ENGINE, PROCESS_ENGINE]
+    _DEFAULT_EXTRACTORS = 4
+    # Marks the end of the extracted candidates stream
+    _END_OF_CANDIDATES = None
+    _SCRATCH_FOLDER_PREFIX = 'candidate_'
+    # Reason codes of the candidates whose archive could not be extracted, and of the ones whose grading raised
+    _UNREADABLE_ARCHIVE = 'unreadable_archive'
+    _GRADING_ERROR = 'grading_error'
+    # Failures that may not happen again, e.g. a full disk, whose results must be graded again rather than stored.
+    # Backend correctors add their own through their TRANSIENT_FAILURE_REASONS attribute.
+    _TRANSIENT_FAILURE_REASONS = {_UNREADABLE_ARCHIVE, _GRADING_ERROR}
 
     def __init__(self, candidates_exams_path: str,
 
                  backend_corrector: BackendCorrector,
-                 show_only_failed_exams: bool = False):
+                 show_only_failed_exams: bool = False,
+                 engine: str = THREAD_ENGINE,
+                 workers: int = None,
+                 extractors: int = _DEFAULT_EXTRACTORS,
+                 max_pending_candidates: int = None,
+                 results_store: ResultsStore = None,
+                 profiler: StageProfiler = None,
+                 result_sinks: list[ResultSink] = None,
+                 result_listeners: list = None,
+                 journal: GradingJournal = None,
+                 deduplicate: bool = True,
+                 worker_budget: threading.Semaphore = None,
+                 owns_backend_corrector: bool = True):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {self.ENGINES}")
         self.backend_corrector = backend_corrector
         self._ROOT_DIRECTORY = Path(__file__).parent.absolute()
         self.candidates_exams_path = Path(candidates_exams_path)
         self.show_only_failed_exams = show_only_failed_exams
+        self.engine = engine
+        self.workers = workers
+        self.extractors = extractors
+        self.max_pending_candidates = max_pending_candidates
+        self.results_store = results_store
+        self.profiler = profiler
+        # The results are printed in a single table once the whole cohort is graded unless told otherwise
+        self.result_sinks = [TableResultSink()] if result_sinks is None else result_sinks
+        self._result_sinks_lock = threading.Lock()
+        # Called with every result, including the ones not written to the sinks because only failed exams are shown
+        self.result_listeners = [] if result_listeners is None else result_listeners
+        self.journal = journal
+        self.deduplicate = deduplicate
+        # Held while grading a candidate when the graders of several cohorts share a budget
+        self.worker_budget = worker_budget
+        # A backend corrector shared by several cohorts is closed by its owner once they are all graded
+        self.owns_backend_corrector = owns_backend_corrector
+        self._archive_digests = {}
+        # Exam files graded once for every other exam file sharing the same content, and the files to correct each
+        # exam file shares with other candidates
+        self._duplicate_exam_files = {}
+        self._shared_files = {}
+        self._corrector_version = None
+
+    def __getstate__(self):
+        # Exception classes generated on the fly cannot be pickled to the worker processes, and the results are only
+        # written by the main process
+        return {
+            key: value
+            for key, value in self.__dict__.items()
+            if not (isinstance(value, type) and issubclass(value, FileNotFoundError))
+            and key not in ('result_sinks', 'result_listeners', '_result_sinks_lock', 'journal', '_duplicate_exam_files', '_shared_files',
+                            'worker_budget')
+        }
+
+    def _fetch_corrector_name(self):
+        return f'{type(self).__name__}/{type(self.backend_corrector).__name__}'
+
+    def _fetch_corrector_version(self):
+        """
+        Computes the version of the corrector as the digest of the source files of its classes.
+
+        Any change to the exam corrector, the backend corrector, the helpers they inherit from or the modules next
+        to them invalidates the stored results, as does any change to the grading settings of the backend corrector.
+
+        Returns:
+            The hex digest of the corrector source files and grading settings.
+        """
+
+        if self._corrector_version is None:
+            project_directory = self._ROOT_DIRECTORY.parent
+            class_files = {
+                Path(inspect.getsourcefile(cls))
+                for cls in type(self).__mro__ + type(self.backend_corrector).__mro__
+                if cls.__module__ != 'builtins'
+            }
+            source_files = class_files.union(*(file.parent.glob('*.py') for file in class_files))
+            digest = hashlib.sha256()
+            for source_file in sorted(file for file in source_files if file.is_relative_to(project_directory)):
+                digest.update(source_file.read_bytes())
+            fetch_grading_settings = getattr(self.backend_corrector, 'fetch_grading_settings', None)
+            if fetch_grading_settings is not None:
+                digest.update(json.dumps(fetch_grading_settings(), sort_keys=True).encode())
+            self._corrector_version = digest.hexdigest()
+        return self._corrector_version
+
+    def _fetch_cached_results(self, exam_files):
+        """
+        Splits the exam files between the ones already graded by this version of the corrector and the others.
+
+        Args:
+            exam_files: The paths to the candidates archives.
+
+        Returns:
+            The (exam file, stored result) pairs of the already graded exam files, and the exam files left to grade.
+        """
+
+        if self.results_store is None:
+            return [], exam_files
+        corrector, corrector_version = self._fetch_corrector_name(), self._fetch_corrector_version()
+        cached_results, exam_files_to_grade = [], []
+        for exam_file in exam_files:
+            if result := self.results_store.fetch(self._fetch_archive_digest(exam_file), corrector,
+                                                  corrector_version):
+                # Identical archives may have been uploaded under another name
+                result['candidate_name'] = self._fetch_candidate_name_from_folder_path(exam_file)
+                cached_results.append((exam_file, result))
+            else:
+                exam_files_to_grade.append(exam_file)
+        return cached_results, exam_files_to_grade
+
+    def _fetch_archive_digest(self, exam_file):
+        if exam_file not in self._archive_digests:
+            self._archive_digests[exam_file] = self._compute_file_digest(exam_file)
+        return self._archive_digests[exam_file]
+
+    def _fetch_journaled_results(self, exam_files):
+        """
+        Opens the grading journal and splits the exam files between the ones graded by the resumed run and the others.
+
+        Args:
+            exam_files: The paths to the candidates archives.
+
+        Returns:
+            The (exam file, journaled result) pairs of the already graded exam files, and the exam files left to grade.
+        """
+
+        if self.journal is None:
+            return [], exam_files
+        completed_results = self.journal.open(self._fetch_corrector_name(), self._fetch_corrector_version())
+        journaled_results, exam_files_to_grade = [], []
+        for exam_file in exam_files:
+            # Transient failures journaled by older runs are graded again too
+            result = completed_results.get(self._fetch_archive_digest(exam_file))
+            if result and self._is_result_storable(result):
+                result['candidate_name'] = self._fetch_candidate_name_from_folder_path(exam_file)
+                journaled_results.append((exam_file, result))
+            else:
+                exam_files_to_grade.append(exam_file)
+        return journaled_results, exam_files_to_grade
+
+    def _fetch_grading_input_digests(self, exam_files):
+        """
+        Preflight stage: computes the digest of every file an exam file is graded on, without extracting it.
+
+        Correctors materializing only some files are graded on the files to correct alone, the others may read any
+        file of the archive.
+
+        Args:
+            exam_files: The paths to the candidates archives.
+
+        Returns:
+            A dictionary mapping every readable exam file to its (base name, hex digest) pairs.
+        """
+
+        file_names = None if self._FILES_TO_MATERIALIZE is None else self._FILES_TO_CORRECT
+        with profile_stage('preflight'):
+            return {
+                exam_file: member_digests
+                for exam_file in exam_files
+                if (member_digests := self._compute_member_digests(exam_file, file_names)) is not None
+            }
+
+    def _find_shared_files(self, grading_input_digests):
+        """
+        Finds the files to correct shared, byte for byte, between candidates, as a plagiarism signal.
+
+        Args:
+            grading_input_digests: The digests returned by _fetch_grading_input_digests.
+
+        Returns:
+            A dictionary mapping every exam file sharing files to the names of the other candidates sharing each one.
+        """
+
+        file_owners = {}
+        for exam_file, member_digests in grading_input_digests.items():
+            files_to_correct = {}
+            for file_name, digest in member_digests:
+                if file_name in self._FILES_TO_CORRECT:
+                    files_to_correct.setdefault(file_name, digest)
+            for file_name, digest in files_to_correct.items():
+                file_owners.setdefault((file_name, digest), []).append(exam_file)
+        shared_files = {}
+        for (file_name, digest), owners in file_owners.items():
+            for owner in owners if len(owners) > 1 else []:
+                shared_files.setdefault(owner, {})[file_name] = sorted(
+                    self._fetch_candidate_name_from_folder_path(other_owner)
+                    for other_owner in owners if other_owner != owner
+                )
+        return shared_files
+
+    def _deduplicate_exam_files(self, exam_files, grading_input_digests):
+        """
+        Keeps a single exam file of every group of exam files graded on the same content.
+
+        The verdict of the kept exam file is fanned out to the others once it is graded.
+
+        Args:
+            exam_files: The paths to the candidates archives left to grade.
+            grading_input_digests: The digests returned by _fetch_grading_input_digests.
+
+        Returns:
+            The exam files to grade.
+        """
+
+        representatives, exam_files_to_grade = {}, []
+        for exam_file in exam_files:
+            if exam_file not in grading_input_digests:
+                exam_files_to_grade.append(exam_file)
+                continue
+            grading_input = tuple(sorted(grading_input_digests[exam_file]))
+            if representative := representatives.get(grading_input):
+                self._duplicate_exam_files.setdefault(representative, []).append(exam_file)
+            else:
+                representatives[grading_input] = exam_file
+                exam_files_to_grade.append(exam_file)
+        return exam_files_to_grade
+
+    def correct_exam_file(self, exam_file: Path):
+        """
+        Grades a single exam file on demand, e.g. a submission uploaded to the grading daemon.
+
+        The stored result of an identical archive is reused. The result is written to the result sinks, which are
+        left open for the next exam files.
+
+        Args:
+            exam_file: The path to the candidate archive.
+
+        Returns:
+            The result of the candidate.
+        """
+
+        exam_file = Path(exam_file)
+        try:
+            cached_results, _ = self._fetch_cached_results([exam_file])
+            if cached_results:
+                result = cached_results[0][1]
+                self._write_result(exam_file, result)
+                return result
+            result = self._grade_exam_file(exam_file)
+            self._record_result(exam_file, result)
+            return result
+        finally:
+            # Exam files graded on demand are not seen twice
+            self._archive_digests.pop(exam_file, None)
+
+    def _correct_watched_exam_file(self, exam_file):
+        try:
+            self.correct_exam_file(exam_file)
+        except Exception as e:
+            print(f"An error occurred while grading {exam_file.name}: {e}")
+
+    def watch_candidate_files(self, debounce: float = 2.0, poll_interval: float = 1.0, stop_event=None):
+        """
+        Grades the candidates of the exams folder, then every archive landing in it or changing, until stopped.
+
+        Archives are graded once they stopped changing for the debounce delay, as they arrive, and their results are
+        written to the result sinks as soon as they are known. The sinks are closed once the watch is stopped, e.g.
+        by a keyboard interrupt.
+
+        Args:
+            debounce: The number of seconds an archive must stay unchanged before being graded.
+            poll_interval: The number of seconds between two scans of the exams folder.
+            stop_event: Event stopping the watch once set, defaults to watching until interrupted.
+
+        Returns:
+            None
+        """
+
+        self._clean_abandoned_scratch_folders()
+        watcher = FolderWatcher(self.candidates_exams_path, self._fetch_exam_files_from_exams_folder, debounce,
+                                poll_interval)
+        if self.profiler is not None:
+            self.profiler.activate()
+        try:
+            # Interrupting the watch lets the archives being graded finish
+            with futures.ThreadPoolExecutor(self._fetch_grading_workers_count()) as executor, \
+                    contextlib.suppress(KeyboardInterrupt):
+                for exam_file in watcher.watch(stop_event):
+                    executor.submit(self._correct_watched_exam_file, exam_file)
+        finally:
+            if self.owns_backend_corrector:
+                self._close_backend_corrector()
+            if self.profiler is not None:
+                self.profiler.deactivate()
+            self._close_result_sinks()
+
+    def _on_candidate_graded(self, exam_file, result):
+        self._record_result(exam_file, result)
+        for duplicate_exam_file in self._duplicate_exam_files.get(exam_file, []):
+            duplicate_result = copy.deepcopy(result)
+            duplicate_result['candidate_name'] = self._fetch_candidate_name_from_folder_path(duplicate_exam_file)
+            duplicate_result['identical_to'] = result['candidate_name']
+            self._record_result(duplicate_exam_file, duplicate_result)
+
+    def _is_result_storable(self, result):
+        """
+        Tells whether a result only depends on the archive and the corrector, and may be reused for the same archive.
+
+        Args:
+            result: The result of a candidate.
+
+        Returns:
+            False if a check failed for a transient infrastructure reason, e.g. a failed pip install, True otherwise.
+        """
+
+        transient_failure_reasons = self._TRANSIENT_FAILURE_REASONS.union(
+            getattr(self.backend_corrector, 'TRANSIENT_FAILURE_REASONS', ()))
+        return not any(check['reason'] in transient_failure_reasons for check in result.get('checks', []))
+
+    def _record_result(self, exam_file, result):
+        if self.results_store is not None and self._is_result_storable(result):
+            self.results_store.save(self._fetch_archive_digest(exam_file), self._fetch_corrector_name(),
+                                    self._fetch_corrector_version(), result)
+        # A candidate failed by a transient infrastructure failure is graded again by a resumed run
+        if self.journal is not None and self._is_result_storable(result):
+            self.journal.record(self._fetch_archive_digest(exam_file), exam_file.name, result)
+        self._write_result(exam_file, result)
+
+    def _write_result(self, exam_file, result):
+        """
+        Writes the result of a candidate to every result sink, as soon as the candidate is graded.
+
+        The result listeners are called first, with every result, whether it is filtered out of the sinks or not.
+
+        Args:
+            exam_file: The path to the candidate archive.
+            result: The result of the candidate.
+
+        Returns:
+            None
+        """
+
+        if shared_files := self._shared_files.get(exam_file):
+            # Depends on the cohort, so it is never stored along with the result
+            result = {**result, 'shared_files': shared_files}
+        with self._result_sinks_lock:
+            for result_listener in self.result_listeners:
+                result_listener(result)
+            if self.show_only_failed_exams and result['result'] != 'Failed':
+                return
+            for result_sink in self.result_sinks:
+                result_sink.write(result)
+
+    def _close_result_sinks(self):
+        for result_sink in self.result_sinks:
+            result_sink.close()
 
     def _fetch_exam_files_from_exams_folder(self):
         return self._fetch_archive_files_from_folder(self.candidates_exams_path)
 
-    def _extract_exam_file_to_destination(self, exam_file):
-        destination = self._ROOT_DIRECTORY / self._EXAM_FILES_EXTRACTION_TARGET_FOLDER / exam_file.name
+    def _extract_exam_file_to_destination(self, exam_file, destination=None):
+        """
+        Extracts the files to correct of an exam file.
+
+        Args:
+            exam_file: The path to the candidate archive.
+            destination: The candidate folder, defaults to a folder named after the archive in the extraction folder.
+
+        Returns:
+            The candidate folder, and the files to correct found in the archive or None if the whole archive was
+            extracted and must be walked.
+        """
+
+        destination = destination or self._ROOT_DIRECTORY / self._EXAM_FILES_EXTRACTION_TARGET_FOLDER / exam_file.name
         destination.mkdir(parents=True, exist_ok=True)
-        self._extract_archive_file(exam_file, destination)
+        with profile_stage('extract'):
+            if self._FILES_TO_MATERIALIZE is None:
+                self._extract_archive_file(exam_file, destination)
+                return destination, None
+            candidate_files = self._read_archive_members(exam_file, self._FILES_TO_CORRECT, destination,
+                                                         self._FILES_TO_MATERIALIZE)
+        return destination, candidate_files
+
+    def _profile_candidate(self, path):
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.candidate(self._fetch_candidate_name_from_folder_path(path))
+
+    def _create_candidate_scratch_folder(self):
+        extraction_folder = self._ROOT_DIRECTORY / self._EXAM_FILES_EXTRACTION_TARGET_FOLDER
+        extraction_folder.mkdir(parents=True, exist_ok=True)
+        # Named after the grading process, so that the folders left behind by a crashed run can be told apart
+        return Path(tempfile.mkdtemp(prefix=f'{self._SCRATCH_FOLDER_PREFIX}{os.getpid()}_', dir=extraction_folder))
+
+    @staticmethod
+    def _process_is_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _clean_abandoned_scratch_folders(self):
+        """
+        Removes the half-finished scratch folders left behind by grading processes that are no longer running.
+
+        Returns:
+            The number of removed folders.
+        """
+
+        extraction_folder = self._ROOT_DIRECTORY / self._EXAM_FILES_EXTRACTION_TARGET_FOLDER
+        removed_folders = 0
+        for scratch_folder in extraction_folder.glob(f'{self._SCRATCH_FOLDER_PREFIX}*'):
+            pid = scratch_folder.name.removeprefix(self._SCRATCH_FOLDER_PREFIX).split('_')[0]
+            if not pid.isdigit() or not self._process_is_alive(int(pid)):
+                shutil.rmtree(scratch_folder, ignore_errors=True)
+                removed_folders += 1
+        return removed_folders
+
+    def _extract_exam_file_to_scratch_folder(self, exam_file):
+        scratch_folder = self._create_candidate_scratch_folder()
+        try:
+            with self._profile_candidate(exam_file):
+                return self._extract_exam_file_to_destination(exam_file, scratch_folder / exam_file.name)
+        except BaseException:
+            shutil.rmtree(scratch_folder, ignore_errors=True)
+            raise
+
+    def _grade_candidate_folder(self, candidate_folder, candidate_files=None):
+        try:
+            with self._profile_candidate(candidate_folder), profile_stage('grade_candidate'):
+                return self._process_candidate(candidate_folder, candidate_files)
+        finally:
+            # The scratch folder is the parent of the candidate folder
+            shutil.rmtree(candidate_folder.parent, ignore_errors=True)
+
+    def _build_failed_result(self, exam_file, reason, detail):
+        """
+        Builds the Failed result of a candidate that could not be graded, e.g. because its archive is unreadable.
+
+        Args:
+            exam_file: The path to the candidate archive.
+            reason: The reason code reported for every file to correct.
+            detail: A human-readable detail of the failure.
+
+        Returns:
+            The result of the candidate.
+        """
+
+        return {
+            'candidate_name': self._fetch_candidate_name_from_folder_path(exam_file),
+            'result': 'Failed',
+            'remarques supplémentaires': f'- {detail}',
+            'duration': 0.0,
+            'checks': [
+                asdict(CheckReport(file, CheckReport.FAILED, reason, detail)) for file in self._FILES_TO_CORRECT
+            ],
+        }
+
+    def _build_unreadable_archive_result(self, exam_file, exception):
+        # The archive helpers print why an archive cannot be read
+        return self._build_failed_result(exam_file, self._UNREADABLE_ARCHIVE,
+                                         f'the archive could not be extracted: {exception}')
+
+    def _build_grading_error_result(self, exam_file, exception):
+        # Recorded like any result, so that the duplicates of the exam file are reported too
+        print(f"An error occurred while grading {exam_file.name}: {exception}")
+        return self._build_failed_result(exam_file, self._GRADING_ERROR, f'the grading failed: {exception}')
+
+    def _grade_exam_file(self, exam_file):
+        """
+        Grades a single exam file inside a private scratch folder, removed once the candidate is graded.
 
-    def _fetch_candidates_folders(self):
-        return [item for item in (self._ROOT_DIRECTORY / self._EXAM_FILES_EXTRACTION_TARGET_FOLDER).iterdir() if
-                item.is_dir()]
+        Args:
+            exam_file: The path to the candidate archive.
+
+        Returns:
+            The result of the candidate, Failed with the unreadable_archive reason if the archive cannot be extracted.
+        """
+
+        try:
+            extracted_candidate = self._extract_exam_file_to_scratch_folder(exam_file)
+        except Exception as e:
+            return self._build_unreadable_archive_result(exam_file, e)
+        return self._grade_candidate_folder(*extracted_candidate)
+
+    def _grade_exam_file_in_worker(self, exam_file):
+        """
+        Grades a single exam file in a worker process, recording its stages if the run is profiled.
+
+        Args:
+            exam_file: The path to the candidate archive.
+
+        Returns:
+            The result of the candidate, and the stages recorded by the worker to be merged in the run profile.
+        """
+
+        if self.profiler is None:
+            return self._grade_exam_file(exam_file), []
+        self.profiler.activate()
+        try:
+            return self._grade_exam_file(exam_file), self.profiler.spans
+        finally:
+            self.profiler.deactivate()
+
+    def _fetch_grading_workers_count(self):
+        return self.workers or min(32, (os.cpu_count() or 1) + 4)
+
+    def _extract_exam_files_in_background(self, exam_files, extracted_candidates: queue.Queue, graders_count):
+        """
+        Producer stage: extracts the exam files in parallel and feeds the candidate folders to the graders.
+
+        Putting a folder blocks while the queue is full, so no more than the queue size, plus the folders being
+        extracted or graded, are waiting on disk at any time. An archive that cannot be extracted is put along with
+        its extraction error instead, so that the graders report it like any other candidate.
+
+        Args:
+            exam_files: The paths to the candidates archives.
+            extracted_candidates: The bounded queue the candidate folders, files and extraction errors are put into.
+            graders_count: The number of graders to send the end of stream marker to.
+
+        Returns:
+            None
+        """
+
+        def extract(exam_file):
+            try:
+                extracted_candidate = (exam_file, *self._extract_exam_file_to_scratch_folder(exam_file), None)
+            except Exception as e:
+                extracted_candidate = (exam_file, None, None, e)
+            extracted_candidates.put(extracted_candidate)
+
+        try:
+            with futures.ThreadPoolExecutor(self.extractors) as executor:
+                for file in exam_files:
+                    executor.submit(extract, file)
+        finally:
+            for _ in range(graders_count):
+                extracted_candidates.put(self._END_OF_CANDIDATES)
+
+    def _grade_extracted_candidates(self, extracted_candidates: queue.Queue, progress_bar):
+        """
+        Consumer stage: grades the candidate folders as soon as they are extracted.
+
+        Args:
+            extracted_candidates: The bounded queue the candidate folders, files and extraction errors are taken from.
+            progress_bar: The progress bar updated after each candidate.
+
+        Returns:
+            None
+        """
+
+        while (extracted_candidate := extracted_candidates.get()) is not self._END_OF_CANDIDATES:
+            exam_file, candidate_folder, candidate_files, extraction_error = extracted_candidate
+            try:
+                if extraction_error is not None:
+                    result = self._build_unreadable_archive_result(exam_file, extraction_error)
+                else:
+                    with self.worker_budget or contextlib.nullcontext():
+                        result = self._grade_candidate_folder(candidate_folder, candidate_files)
+            except Exception as e:
+                result = self._build_grading_error_result(exam_file, e)
+            try:
+                self._on_candidate_graded(exam_file, result)
+            except Exception as e:
+                print(f"An error occurred while recording the result of {exam_file.name}: {e}")
+            progress_bar.update()
 
     @staticmethod
     def _fetch_candidate_name_from_folder_path(folder_path):
@@ -78,12 +650,31 @@ class ExamCorrector(ABC, ArchiveFileHelper, metaclass=ExamCorrectorMeta):
 
     @staticmethod
     def _print_as_table(data):
+        # The grading dependencies are imported once grading starts, not when main.py is imported
+        from tabulate import tabulate
+
         headers = data[0].keys()
 
         table_data = [[d[key] for key in headers] for d in data]
 
         print(tabulate(table_data, headers=headers, tablefmt="grid"))
 
+    def _print_shared_files(self):
+        shared_file_groups = {
+            (file_name, tuple(sorted([self._fetch_candidate_name_from_folder_path(exam_file)] + other_candidates)))
+            for exam_file, files in self._shared_files.items()
+            for file_name, other_candidates in files.items()
+        }
+        self._print_as_table([
+            {'identical file': file_name, 'candidates': ', '.join(candidates)}
+            for file_name, candidates in sorted(shared_file_groups)
+        ])
+
+    def _close_backend_corrector(self):
+        # Backend correctors may hold resources shared by every candidate of the run, e.g. a local API
+        if close := getattr(self.backend_corrector, 'close', None):
+            close()
+
     def _clean_environment(self):
         self._clean_extracted_files()
 
@@ -97,24 +688,46 @@ class ExamCorrector(ABC, ArchiveFileHelper, metaclass=ExamCorrectorMeta):
             exception_class = type(exception_name, (FileNotFoundError,), {})
             setattr(self, exception_name, exception_class)
 
-    def _fetch_candidate_files(self, candidate_folder_path):
+    def _fetch_candidate_files(self, candidate_folder_path, candidate_files=None):
         self._generate_exception_classes()
 
-        files_found = {
-            file: os.path.join(root, file)
-            for root, directories, files in os.walk(candidate_folder_path)
-            for file in files if file in self._FILES_TO_CORRECT
-        }
+        with profile_stage('walk'):
+            files_found = candidate_files if candidate_files is not None else {
+                file: os.path.join(root, file)
+                for root, directories, files in os.walk(candidate_folder_path)
+                for file in files if file in self._FILES_TO_CORRECT
+            }
 
         if missing_files := self._FILES_TO_CORRECT - files_found.keys():
             exceptions = [getattr(self, f'{file.capitalize()}FileNotFound')() for file in missing_files]
             raise ExceptionGroup('Some files were not found', exceptions)
         return files_found
 
-    def _process_candidate(self, candidate_folder_path: Path):
+    def _correct_file(self, file_name, file):
+        """
+        Checks a candidate file with the backend corrector.
+
+        Args:
+            file_name: The name of the file to check.
+            file: The path to the file, or an in-memory text stream.
+
+        Returns:
+            The CheckReport of the file, holding the reason the backend corrector reported if the check failed.
+        """
+
+        method_name = self._fetch_method_name_from_file_name(file_name)
+        with profile_stage(method_name), run_check(file_name) as check:
+            passed = getattr(self.backend_corrector, method_name)(file)
+        check.status = CheckReport.PASSED if passed else CheckReport.FAILED
+        if not passed:
+            check.fail('incorrect')
+        return check
+
+    def _process_candidate(self, candidate_folder_path: Path, candidate_files: dict = None):
         self._generate_exception_classes()
 
         candidate_name = self._fetch_candidate_name_from_folder_path(candidate_folder_path)
+        start_time = time.perf_counter()
         description = ''
         error_description_map = {
             f'{file.capitalize()}FileNotFound': f'- {file} file not found'
@@ -122,9 +735,15 @@ class ExamCorrector(ABC, ArchiveFileHelper, metaclass=ExamCorrectorMeta):
         }
 
         try:
-            files_found = self._fetch_candidate_files(candidate_folder_path)
+            files_found = self._fetch_candidate_files(candidate_folder_path, candidate_files)
         except ExceptionGroup as e:
             result = 'Failed'
+            missing_files = {type(exception).__name__ for exception in e.exceptions}
+            checks = [
+                CheckReport(file, CheckReport.MISSING, 'file_not_found')
+                if f'{file.capitalize()}FileNotFound' in missing_files else CheckReport(file)
+                for file in self._FILES_TO_CORRECT
+            ]
             for exception in e.exceptions:
                 # TODO refactor this
                 if not description:
@@ -133,11 +752,9 @@ class ExamCorrector(ABC, ArchiveFileHelper, metaclass=ExamCorrectorMeta):
                     description += f'\n{error_description_map[type(exception).__name__]}'
 
         else:
+            checks = [self._correct_file(file, files_found.get(file)) for file in self._FILES_TO_CORRECT]
             file_checks = {
-                'incorrect': {file: not getattr(self.backend_corrector, f"correct_{file.split('.')[0]}_file")(
-                    files_found.get(file))
-                              for file
-                              in self._FILES_TO_CORRECT}
+                'incorrect': {check.file: check.status != CheckReport.PASSED for check in checks}
             }
             for file, failed in file_checks['incorrect'].items():
                 if failed:
@@ -153,27 +770,119 @@ class ExamCorrector(ABC, ArchiveFileHelper, metaclass=ExamCorrectorMeta):
             'candidate_name': candidate_name,
             'result': result,
             'remarques supplémentaires': description,
+            'duration': time.perf_counter() - start_time,
+            # Machine-readable detail of every file, the files left unchecked because others are missing have no
+            # status
+            'checks': [asdict(check) for check in checks],
         }
 
+    def _correct_candidate_files_in_threads(self, exam_files):
+        import tqdm
+
+        graders_count = self._fetch_grading_workers_count()
+        extracted_candidates = queue.Queue(self.max_pending_candidates or 2 * graders_count)
+        producer = threading.Thread(target=self._extract_exam_files_in_background,
+                                    args=(exam_files, extracted_candidates, graders_count), daemon=True)
+        producer.start()
+        with tqdm.tqdm(total=len(exam_files)) as progress_bar, \
+                futures.ThreadPoolExecutor(graders_count) as executor:
+            for _ in range(graders_count):
+                executor.submit(self._grade_extracted_candidates, extracted_candidates, progress_bar)
+        producer.join()
+
+    def _grade_exam_files_in_process_pool(self, exam_files, workers, progress_bar):
+        """
+        Grades exam files in a new pool of worker processes, until every one is graded or a worker dies.
+
+        Args:
+            exam_files: The paths to the candidates archives.
+            workers: The number of worker processes of the pool.
+            progress_bar: The progress bar of the run, advanced once per graded candidate.
+
+        Returns:
+            The set of the graded exam files, the ones left unfinished by a dead worker excluded.
+        """
+
+        graded_exam_files = set()
+        with futures.ProcessPoolExecutor(workers) as executor:
+            gradings = {executor.submit(self._grade_exam_file_in_worker, exam_file): exam_file
+                        for exam_file in exam_files}
+            for grading in futures.as_completed(gradings):
+                try:
+                    result, spans = grading.result()
+                except BrokenProcessPool:
+                    # Every candidate not graded yet when a worker dies is failed with it, they are graded again
+                    continue
+                except Exception as e:
+                    result, spans = self._build_grading_error_result(gradings[grading], e), []
+                if self.profiler is not None:
+                    self.profiler.add_spans(spans)
+                self._on_candidate_graded(gradings[grading], result)
+                graded_exam_files.add(gradings[grading])
+                progress_bar.update()
+        return graded_exam_files
+
+    def _correct_candidate_files_in_processes(self, exam_files):
+        import tqdm
+
+        exam_files_to_grade = list(exam_files)
+        with tqdm.tqdm(total=len(exam_files)) as progress_bar:
+            while exam_files_to_grade:
+                graded_exam_files = self._grade_exam_files_in_process_pool(exam_files_to_grade, self.workers,
+                                                                           progress_bar)
+                exam_files_to_grade = [exam_file for exam_file in exam_files_to_grade
+                                       if exam_file not in graded_exam_files]
+                if exam_files_to_grade and not graded_exam_files:
+                    # A worker died before any candidate was graded, the first candidate left is graded alone to
+                    # tell whether it is the one killing its worker
+                    exam_file = exam_files_to_grade.pop(0)
+                    if not self._grade_exam_files_in_process_pool([exam_file], 1, progress_bar):
+                        self._on_candidate_graded(exam_file, self._build_grading_error_result(
+                            exam_file, 'the worker process grading the candidate died'))
+                        progress_bar.update()
+
     def correct_candidate_files(self):
+        """
+        Grades every candidate of the exams folder, writing each result to the result sinks as soon as it is known.
+
+        A preflight stage hashes the files every candidate is graded on, so that candidates sharing the same content
+        are graded once. Results already journaled by the resumed run or stored for an archive are written first. The
+        sinks are closed even if the grading fails, so that the results of the candidates graded so far are kept. The
+        scratch folders left behind by crashed runs are removed beforehand.
+
+        Returns:
+            None
+        """
+
+        self._clean_abandoned_scratch_folders()
         exam_files = self._fetch_exam_files_from_exams_folder()
-        for exam_file in exam_files:
-            self._extract_exam_file_to_destination(exam_file)
-        candidates_folders = self._fetch_candidates_folders()
-
-        # TODO think about making all candidates files processing asynchronous
-        with futures.ThreadPoolExecutor() as executor:
-            results = list(
-                tqdm.tqdm(executor.map(self._process_candidate, candidates_folders),
-                          total=len(candidates_folders)))
-
-        candidates_result = [
-            e
-            for e in results
-            if e['result'] == 'Failed'
-            and self.show_only_failed_exams
-            or not self.show_only_failed_exams
-        ]
-
-        self._print_as_table(candidates_result)
+        if self.profiler is not None:
+            self.profiler.activate()
+        try:
+            if self.deduplicate:
+                grading_input_digests = self._fetch_grading_input_digests(exam_files)
+                self._shared_files = self._find_shared_files(grading_input_digests)
+            journaled_results, exam_files = self._fetch_journaled_results(exam_files)
+            cached_results, exam_files = self._fetch_cached_results(exam_files)
+            if self.deduplicate:
+                exam_files = self._deduplicate_exam_files(exam_files, grading_input_digests)
+            for exam_file, result in journaled_results + cached_results:
+                self._write_result(exam_file, result)
+            if self.engine == self.PROCESS_ENGINE:
+                self._correct_candidate_files_in_processes(exam_files)
+            else:
+                self._correct_candidate_files_in_threads(exam_files)
+        finally:
+            if self.owns_backend_corrector:
+                self._close_backend_corrector()
+            if self.profiler is not None:
+                self.profiler.deactivate()
+            self._close_result_sinks()
+            if self.journal is not None:
+                self.journal.close()
+
+        if self._shared_files:
+            self._print_shared_files()
+        if self.profiler is not None and self.profiler.spans:
+            self._print_as_table(self.profiler.summarize())
         # self._clean_environment()
@@ -0,0 +1,113 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import importlib
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CorrectorSpec:
+    """
+    Where the exam corrector and the backend corrector of an exam type are defined, imported only once selected.
+
+    Attributes:
+        exam_corrector: The 'module:class' path of the ExamCorrector subclass.
+        backend_corrector: The 'module:class' path of the backend corrector.
+    """
+
+    exam_corrector: str
+    backend_corrector: str
+
+    @staticmethod
+    def _import(path: str):
+        module_name, _, class_name = path.partition(':')
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def load(self):
+        return self._import(self.exam_corrector), self._import(self.backend_corrector)
+
+
+# Plugins register a CorrectorSpec under their exam type in this entry point group
+ENTRY_POINT_GROUP = 'exam_correctors'
+
+_CORRECTORS = {
+    'bash': CorrectorSpec('exams_correctors.bash_linux.bash_linux_exam_correctors:BashLinuxExamCorrector',
+                          'backend_correctors.bash_linux.bash_linux_backend_correctors:SimpleBashLinuxBackendCorrector'),
+    'fastapi': CorrectorSpec('exams_correctors.fastapi.fastapi_exam_correctors:FastApiExamCorrector',
+                             'backend_correctors.fastapi.fastapi_backend_correctors:SimpleFastApiBackendCorrector'),
+}
+
+
+def register_corrector(corrector_type: str, spec: CorrectorSpec):
+    """
+    Registers the correctors of an exam type, replacing the ones it was registered with.
+
+    Args:
+        corrector_type: The exam type, as given to --type.
+        spec: Where its correctors are defined.
+
+    Returns:
+        None
+    """
+
+    _CORRECTORS[corrector_type] = spec
+
+
+def _fetch_plugin_entry_points():
+    # Importing importlib.metadata and scanning the installed distributions are slow, both are only done for exam
+    # types that are not built in
+    from importlib import metadata
+
+    return {entry_point.name: entry_point for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def fetch_corrector_types(include_plugins: bool = True) -> list[str]:
+    """
+    Returns the registered exam types.
+
+    Args:
+        include_plugins: Whether the exam types of the installed plugins are included.
+
+    Returns:
+        The sorted exam types.
+    """
+
+    plugin_types = _fetch_plugin_entry_points().keys() if include_plugins else []
+    return sorted({*_CORRECTORS, *plugin_types})
+
+
+def load_corrector(corrector_type: str):
+    """
+    Imports the correctors of an exam type, along with their dependencies.
+
+    Args:
+        corrector_type: The exam type.
+
+    Returns:
+        The ExamCorrector subclass and the backend corrector class of the exam type.
+
+    Raises:
+        ValueError: If no corrector is registered for the exam type.
+    """
+
+    if corrector_type not in _CORRECTORS:
+        entry_point = _fetch_plugin_entry_points().get(corrector_type)
+        if entry_point is None:
+            raise ValueError(f"Unknown exam type {corrector_type!r}, expected one of {fetch_corrector_types()}")
+        register_corrector(corrector_type, entry_point.load())
+    return _CORRECTORS[corrector_type].load()
@@ -0,0 +1,214 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import csv
+import json
+import os
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+
+class ResultSink(ABC):
+    """
+    Destination of the candidates results, written one by one as soon as each candidate is graded.
+
+    Methods:
+        write(result): Writes the result of a candidate.
+        close(): Flushes and releases the sink once every candidate is graded.
+    """
+
+    # Detail of the result left out of the human-readable tables
+    _DETAIL_KEYS = ('duration', 'checks', 'identical_to', 'shared_files')
+
+    @abstractmethod
+    def write(self, result: dict):
+        pass
+
+    @classmethod
+    def _summarize(cls, result: dict):
+        return {key: value for key, value in result.items() if key not in cls._DETAIL_KEYS}
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class FileResultSink(ResultSink, ABC):
+    """
+    Result sink writing to a file, flushed to disk after every result so that a crash keeps the results written so far.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', newline='', encoding='utf-8')
+
+    def _flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class JsonLinesResultSink(FileResultSink):
+    """
+    Writes every result as a line of JSON.
+    """
+
+    def write(self, result: dict):
+        self._file.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self._flush()
+
+
+class CsvResultSink(FileResultSink):
+    """
+    Writes every result as a CSV row, the columns being the scalar keys of the first result.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._writer = None
+
+    def write(self, result: dict):
+        if self._writer is None:
+            fieldnames = [key for key, value in result.items() if not isinstance(value, (list, dict))]
+            self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow(result)
+        self._flush()
+
+
+class LiveTableResultSink(ResultSink):
+    """
+    Prints every result as a row of a fixed-width table, above the progress bar, as soon as it is graded.
+    """
+
+    _COLUMN_WIDTHS = [24, 8, 80]
+
+    def __init__(self, stream=None):
+        self._stream = stream
+        self._header_printed = False
+
+    def _format_row(self, values):
+        cells = [
+            str(value).replace('\n', '; ')[:width].ljust(width)
+            for value, width in zip(values, self._COLUMN_WIDTHS)
+        ]
+        return '| ' + ' | '.join(cells) + ' |'
+
+    def _print(self, line):
+        # Imported on first use, like every dependency of the sinks, so that building the sinks costs nothing
+        import tqdm
+
+        tqdm.tqdm.write(line, file=self._stream or sys.stdout)
+
+    def write(self, result: dict):
+        result = self._summarize(result)
+        if not self._header_printed:
+            self._print(self._format_row(result.keys()))
+            self._print('|' + '|'.join('-' * (width + 2) for width in self._COLUMN_WIDTHS) + '|')
+            self._header_printed = True
+        self._print(self._format_row(result.values()))
+
+
+class MemoryResultSink(ResultSink):
+    """
+    Keeps every result in memory.
+
+    Attributes:
+        results: The results written so far.
+    """
+
+    def __init__(self):
+        self.results = []
+
+    def write(self, result: dict):
+        self.results.append(result)
+
+
+class TableResultSink(MemoryResultSink):
+    """
+    Prints every result in a single grid once the whole cohort is graded, under an optional title.
+    """
+
+    def __init__(self, title: str = None):
+        super().__init__()
+        self.title = title
+
+    def close(self):
+        from tabulate import tabulate
+
+        if self.results:
+            headers = self._summarize(self.results[0]).keys()
+            table = tabulate([[result[key] for key in headers] for result in self.results], headers=headers,
+                             tablefmt="grid")
+            # Printed at once, so that the tables of cohorts graded side by side never interleave
+            print(f'{self.title}\n{table}' if self.title else table)
+
+
+class ColumnarResultSink(ResultSink):
+    """
+    Writes the checks of every candidate as columns, one row per candidate file, to be loaded and aggregated in bulk.
+
+    The columns are written to a Parquet file when the path ends with '.parquet' and pyarrow is installed, to a JSON
+    object mapping every column name to its values otherwise. Since columns can only be written whole, the checks
+    are kept in memory until the sink is closed.
+    """
+
+    COLUMNS = ['candidate_name', 'result', 'candidate_duration', 'file', 'status', 'reason', 'detail', 'duration',
+               'stdout', 'stderr', 'cpu_time', 'max_memory']
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.columns = {column: [] for column in self.COLUMNS}
+
+    def write(self, result: dict):
+        for check in result.get('checks', []):
+            row = {
+                'candidate_name': result['candidate_name'],
+                'result': result['result'],
+                'candidate_duration': result.get('duration'),
+                **check,
+            }
+            for column, values in self.columns.items():
+                values.append(row.get(column))
+
+    def close(self):
+        path = self.path
+        if path.suffix == '.parquet':
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                pyarrow = None
+            if pyarrow is not None:
+                pyarrow.parquet.write_table(pyarrow.table(self.columns), path)
+                return
+            path = path.with_suffix('.json')
+            print(f"pyarrow is not installed, the checks are written to {path} instead")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.columns, file, ensure_ascii=False)
@@ -0,0 +1,93 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+
+class ResultsStore:
+    """
+    Persistent SQLite store of candidates results keyed by archive digest, corrector and corrector version.
+
+    A connection is opened per operation, so that the store can be shared by threads and pickled to worker processes.
+
+    Methods:
+        fetch(archive_digest, corrector, corrector_version): Returns the stored result of an archive, if any.
+        save(archive_digest, corrector, corrector_version, result): Stores the result of an archive.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            archive_digest TEXT NOT NULL,
+            corrector TEXT NOT NULL,
+            corrector_version TEXT NOT NULL,
+            result TEXT NOT NULL,
+            graded_at REAL NOT NULL,
+            PRIMARY KEY (archive_digest, corrector, corrector_version)
+        )
+    """
+
+    def __init__(self, database_path: Path):
+        self.database_path = Path(database_path)
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(self._SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.database_path, timeout=30)
+
+    def fetch(self, archive_digest: str, corrector: str, corrector_version: str):
+        """
+        Returns the stored result of an archive.
+
+        Args:
+            archive_digest: The digest of the archive content.
+            corrector: The name of the corrector that graded the archive.
+            corrector_version: The version of the corrector that graded the archive.
+
+        Returns:
+            The stored result, or None if the archive was never graded by this version of the corrector.
+        """
+
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                'SELECT result FROM results WHERE archive_digest = ? AND corrector = ? AND corrector_version = ?',
+                (archive_digest, corrector, corrector_version)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, archive_digest: str, corrector: str, corrector_version: str, result: dict):
+        """
+        Stores the result of an archive, replacing any previous result of the same corrector version.
+
+        Args:
+            archive_digest: The digest of the archive content.
+            corrector: The name of the corrector that graded the archive.
+            corrector_version: The version of the corrector that graded the archive.
+            result: The result of the candidate.
+
+        Returns:
+            None
+        """
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                (archive_digest, corrector, corrector_version, json.dumps(result), time.time()))
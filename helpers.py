@@ -16,20 +16,93 @@
 #    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
 #     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
 #
+import bz2
+import contextlib
+import fcntl
+import gzip
+import hashlib
+import io
+import lzma
 import os
 import re
+import selectors
+import shutil
+import signal
+import socket
 import subprocess
 import tarfile
+import tempfile
 import time
 import zipfile
+from dataclasses import dataclass
 from pathlib import Path
 
+from profiler import profile_stage
+from sandbox import ResourceUsage, Sandbox
+
+try:
+    # Optional faster gzip decompressor, backed by Intel ISA-L
+    from isal import igzip
+except ImportError:
+    igzip = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 
 class ArchiveFileHelper:
-    @staticmethod
-    def _fetch_archive_files_from_folder(folder):
+    _TAR = 'tar'
+    _ZIP = 'zip'
+    _GZIP = 'gz'
+    _BZIP2 = 'bz2'
+    _XZ = 'xz'
+    _ZSTD = 'zst'
+    _MAGIC_NUMBERS = {
+        b'\x1f\x8b': _GZIP,
+        b'BZh': _BZIP2,
+        b'\xfd7zXZ\x00': _XZ,
+        b'\x28\xb5\x2f\xfd': _ZSTD,
+        b'PK\x03\x04': _ZIP,
+        b'PK\x05\x06': _ZIP,
+    }
+    _TAR_MAGIC_NUMBER_OFFSET = 257
+    _TAR_MAGIC_NUMBER = b'ustar'
+    # Used when the content is not recognized, e.g. old tar files without magic number
+    _ARCHIVE_SUFFIXES = {
+        '.tar': _TAR, '.zip': _ZIP, '.tgz': _GZIP, '.gz': _GZIP, '.tbz2': _BZIP2, '.bz2': _BZIP2, '.txz': _XZ,
+        '.xz': _XZ, '.tzst': _ZSTD, '.zst': _ZSTD,
+    }
+
+    @classmethod
+    def _detect_archive_format(cls, archive_file):
+        """
+        Detects the format of an archive file from its magic number, falling back on its suffix.
+
+        Args:
+            archive_file: The path to the archive file.
+
+        Returns:
+            The archive format ('tar', 'zip', or the compression of a compressed tar), or None if unknown.
         """
-        Fetches all archive files (tar and zip) from a specified folder.
+
+        with open(archive_file, 'rb') as file:
+            header = file.read(cls._TAR_MAGIC_NUMBER_OFFSET + len(cls._TAR_MAGIC_NUMBER))
+        for magic_number, archive_format in cls._MAGIC_NUMBERS.items():
+            if header.startswith(magic_number):
+                return archive_format
+        if header[cls._TAR_MAGIC_NUMBER_OFFSET:].startswith(cls._TAR_MAGIC_NUMBER):
+            return cls._TAR
+        return cls._ARCHIVE_SUFFIXES.get(Path(archive_file).suffix.lower())
+
+    @classmethod
+    def _fetch_archive_files_from_folder(cls, folder):
+        """
+        Fetches all archive files (tar, compressed tar and zip) from a specified folder.
+
+        Files that cannot be read, e.g. because of their permissions or because they were removed meanwhile, are
+        skipped with a warning.
 
         Args:
             folder: The folder to fetch archive files from.
@@ -37,32 +110,242 @@ class ArchiveFileHelper:
         Returns:
             List of archive files in the folder.
         """
-        return list(folder.rglob('*.tar')) + list(folder.rglob('*.zip'))
+        return [file for file in sorted(folder.rglob('*')) if cls._is_archive_file(file)]
+
+    @classmethod
+    def _is_archive_file(cls, file):
+        try:
+            return file.is_file() and (file.suffix.lower() in cls._ARCHIVE_SUFFIXES or
+                                       cls._detect_archive_format(file) is not None)
+        except OSError as e:
+            print(f"Warning: {file} is skipped, it could not be read: {e}")
+            return False
+
+    @staticmethod
+    def _compute_file_digest(file, chunk_size=1024 * 1024):
+        """
+        Computes the SHA-256 digest of a file content, reading it by chunks.
+
+        Args:
+            file: The path to the file.
+            chunk_size: The number of bytes read at once.
+
+        Returns:
+            The hex digest of the file content.
+        """
+
+        digest = hashlib.sha256()
+        with open(file, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @classmethod
+    def _open_decompressed_stream(cls, archive_file, archive_format):
+        if archive_format == cls._GZIP:
+            return (igzip or gzip).open(archive_file, 'rb')
+        if archive_format == cls._BZIP2:
+            return bz2.open(archive_file, 'rb')
+        if archive_format == cls._XZ:
+            return lzma.open(archive_file, 'rb')
+        if archive_format == cls._ZSTD:
+            if zstandard is None:
+                raise tarfile.CompressionError("zstd compressed archives require the zstandard package")
+            return zstandard.ZstdDecompressor().stream_reader(open(archive_file, 'rb'), closefd=True)
+        return open(archive_file, 'rb')
+
+    @classmethod
+    @contextlib.contextmanager
+    def _open_tar_archive(cls, archive_file, archive_format):
+        """
+        Opens a plain or compressed tar archive in streaming mode, so that it is never buffered whole.
+
+        Args:
+            archive_file: The path to the archive file.
+            archive_format: The format returned by _detect_archive_format.
+
+        Returns:
+            A context manager yielding the tar archive, whose members can only be read in order.
+        """
+
+        with cls._open_decompressed_stream(archive_file, archive_format) as stream, \
+                tarfile.open(fileobj=stream, mode='r|') as tar:
+            yield tar
 
     @classmethod
     def _extract_archive_file(cls, archive_file, destination):
         try:
-            if archive_file.suffix == '.tar':
-                with tarfile.open(archive_file, 'r') as tar:
-                    tar.extractall(path=destination)
-            elif archive_file.suffix == '.zip':
+            archive_format = cls._detect_archive_format(archive_file)
+            if archive_format == cls._ZIP:
                 with zipfile.ZipFile(archive_file, 'r') as zip_ref:
                     zip_ref.extractall(destination)
+            elif archive_format is not None:
+                with cls._open_tar_archive(archive_file, archive_format) as tar:
+                    tar.extractall(path=destination)
+            else:
+                raise tarfile.ReadError(f"unknown archive format: {archive_file}")
             # print("Extraction completed successfully!")
         except FileNotFoundError:
             print("The specified file does not exist.")
+            raise
+        except tarfile.ReadError:
+            print("The file is not a valid tar file.")
+            raise
+        except zipfile.BadZipFile:
+            print("The file is not a valid zip file.")
+            raise
+        except Exception as e:
+            print(f"An Extraction error occurred: {e}")
+            raise
+
+    @classmethod
+    def _read_tar_members(cls, archive_file, archive_format, file_names, destination, files_to_materialize):
+        members_found = {}
+        with cls._open_tar_archive(archive_file, archive_format) as tar:
+            # Iterating reads the member headers one after another without extracting anything
+            for member in tar:
+                file_name = os.path.basename(member.name)
+                if not member.isfile() or file_name not in file_names or file_name in members_found:
+                    continue
+                with tar.extractfile(member) as member_file:
+                    members_found[file_name] = ArchiveFileHelper._load_member(
+                        member_file, file_name, destination, files_to_materialize)
+        return members_found
+
+    @staticmethod
+    def _read_zip_members(archive_file, file_names, destination, files_to_materialize):
+        members_found = {}
+        with zipfile.ZipFile(archive_file, 'r') as zip_ref:
+            # The central directory is the table of contents of the archive
+            for member in zip_ref.infolist():
+                file_name = os.path.basename(member.filename)
+                if member.is_dir() or file_name not in file_names or file_name in members_found:
+                    continue
+                with zip_ref.open(member) as member_file:
+                    members_found[file_name] = ArchiveFileHelper._load_member(
+                        member_file, file_name, destination, files_to_materialize)
+        return members_found
+
+    @staticmethod
+    def _load_member(member_file, file_name, destination, files_to_materialize):
+        if file_name in files_to_materialize:
+            member_path = Path(destination) / file_name
+            with open(member_path, 'wb') as file:
+                shutil.copyfileobj(member_file, file)
+            return member_path
+        return io.StringIO(member_file.read().decode(errors='replace'))
+
+    @classmethod
+    def _read_archive_members(cls, archive_file, file_names, destination, files_to_materialize):
+        """
+        Reads only the wanted members of an archive, located through its table of contents.
+
+        Members that must be executed are written to the destination folder, the others are kept in memory.
+
+        Args:
+            archive_file: The path to the archive file.
+            file_names: The base names of the members to read.
+            destination: The folder the members to materialize are written to.
+            files_to_materialize: The base names of the members that must exist on disk.
+
+        Returns:
+            A dict mapping each member found to its path on disk or to an in-memory text stream.
+
+        Raises:
+            OSError, EOFError, tarfile.TarError or zipfile.BadZipFile: If the archive cannot be read.
+        """
+
+        try:
+            archive_format = cls._detect_archive_format(archive_file)
+            if archive_format == cls._ZIP:
+                return cls._read_zip_members(archive_file, file_names, destination, files_to_materialize)
+            elif archive_format is not None:
+                return cls._read_tar_members(archive_file, archive_format, file_names, destination,
+                                             files_to_materialize)
+            raise tarfile.ReadError(f"unknown archive format: {archive_file}")
+        except FileNotFoundError:
+            print("The specified file does not exist.")
+            raise
         except tarfile.ReadError:
             print("The file is not a valid tar file.")
+            raise
         except zipfile.BadZipFile:
             print("The file is not a valid zip file.")
+            raise
         except Exception as e:
             print(f"An Extraction error occurred: {e}")
+            raise
+
+    @classmethod
+    def _iterate_archive_files(cls, archive_file):
+        """
+        Iterates over the regular files of an archive, in archive order, without extracting them.
+
+        Args:
+            archive_file: The path to the archive file.
+
+        Yields:
+            The path of every file in the archive and a binary stream of its content, valid until the next file.
+        """
+
+        archive_format = cls._detect_archive_format(archive_file)
+        if archive_format == cls._ZIP:
+            with zipfile.ZipFile(archive_file, 'r') as zip_ref:
+                for member in zip_ref.infolist():
+                    if not member.is_dir():
+                        with zip_ref.open(member) as member_file:
+                            yield member.filename, member_file
+        elif archive_format is not None:
+            with cls._open_tar_archive(archive_file, archive_format) as tar:
+                for member in tar:
+                    if member.isfile():
+                        with tar.extractfile(member) as member_file:
+                            yield member.name, member_file
+        else:
+            raise tarfile.ReadError(f"unknown archive format: {archive_file}")
+
+    @classmethod
+    def _compute_member_digests(cls, archive_file, file_names=None, chunk_size=1024 * 1024):
+        """
+        Computes the digest of the content of the members of an archive, without extracting it.
+
+        Args:
+            archive_file: The path to the archive file.
+            file_names: The base names of the members to digest, the first member of each name being the one read.
+                None digests every file of the archive.
+            chunk_size: The number of bytes read at once.
+
+        Returns:
+            A list of (base name, hex digest) pairs in archive order, or None if the archive could not be read.
+        """
+
+        member_digests, names_found = [], set()
+        try:
+            for member_name, member_file in cls._iterate_archive_files(archive_file):
+                file_name = os.path.basename(member_name)
+                if file_names is not None and (file_name not in file_names or file_name in names_found):
+                    continue
+                names_found.add(file_name)
+                digest = hashlib.sha256()
+                while chunk := member_file.read(chunk_size):
+                    digest.update(chunk)
+                member_digests.append((file_name, digest.hexdigest()))
+        except (OSError, EOFError, tarfile.TarError, zipfile.BadZipFile) as e:
+            print(f"An error occurred while reading {archive_file}: {e}")
+            return None
+        return member_digests
+
 
 class FileHelper:
     """
     Class for handling file operations like removing empty lines and comments from files.
 
+    Every clean up is a single streaming pass over the file, composing its transforms (blank line removal, comment
+    stripping, text rewrites) with precompiled patterns. The file is only written back when asked to, i.e. when it
+    must be executed.
+
     Methods:
+        _normalize_text_file(file, comment_pattern, rewrites, write): Normalizes a file in a single pass.
         _remove_empty_lines(file_path): Removes empty lines from a file.
         _remove_comments_from_file_according_to_regex(file_path, regex): Removes comments from a file based on a specified regex pattern.
         _remove_comments_from_bash_file(bash_file_path): Removes comments from a bash file.
@@ -72,64 +355,104 @@ class FileHelper:
     """
 
     _CRON_FILE_COMMENT_REGEX = r'^\s*#.*$'
-    _BASH_FILE_COMMENT_REGEX = r'(?<!^#!.*\n|^)#.*\n'
+    # Whole-line comments, except the shebang which may only be the first line
+    _BASH_FILE_COMMENT_REGEX = r'^\s*#(?!!)'
+    _CRON_FILE_COMMENT_PATTERN = re.compile(_CRON_FILE_COMMENT_REGEX)
+    _BASH_FILE_COMMENT_PATTERN = re.compile(_BASH_FILE_COMMENT_REGEX)
 
     @staticmethod
-    def _remove_empty_lines(file_path):
+    def _is_in_memory_file(file):
+        return isinstance(file, io.TextIOBase)
+
+    @classmethod
+    def _open_text_file(cls, file):
         """
-        Removes empty lines from a file.
+        Opens a file for reading, whether it lives on disk or was read in memory from the archive.
 
         Args:
-            file_path: The path to the file to remove empty lines from.
+            file: The path to the file, or an in-memory text stream.
 
         Returns:
-            True if empty lines are successfully removed, False otherwise.
+            A context manager yielding a text stream positioned at the start of the file.
         """
 
-        try:
-            # Read the file
-            with open(file_path, 'r') as file:
-                lines = file.readlines()
+        if cls._is_in_memory_file(file):
+            file.seek(0)
+            return contextlib.nullcontext(file)
+        return open(file, 'r')
+
+    @staticmethod
+    def _normalize_lines(lines, comment_pattern=None, rewrites=()):
+        for line in lines:
+            if not line.strip() or comment_pattern is not None and comment_pattern.match(line):
+                continue
+            for pattern, replacement in rewrites:
+                line = pattern.sub(replacement, line)
+            yield line
+
+    @classmethod
+    def _normalize_text_file(cls, file, comment_pattern=None, rewrites=(), write=False):
+        """
+        Normalizes a file in a single pass: removes its empty lines, its comments and applies the rewrites.
+
+        Args:
+            file: The path to the file, or an in-memory text stream.
+            comment_pattern: The compiled pattern matching comment lines, None to keep every comment.
+            rewrites: The (compiled pattern, replacement) pairs applied to every kept line.
+            write: Whether the normalized content must be written back, e.g. to be executed.
+
+        Returns:
+            The normalized content.
+        """
 
-            # Remove empty lines
-            non_empty_lines = [line for line in lines if line.strip()]
+        with profile_stage('normalize'), cls._open_text_file(file) as text_file:
+            content = ''.join(cls._normalize_lines(text_file, comment_pattern, rewrites))
+        if write:
+            if cls._is_in_memory_file(file):
+                file.seek(0)
+                file.truncate()
+                file.write(content)
+            else:
+                if not os.access(file, os.W_OK):
+                    os.chmod(file, 0o744)
+                with open(file, 'w') as text_file:
+                    text_file.write(content)
+        return content
 
-            # Write the non-empty lines back to the file
-            with open(file_path, 'w') as file:
-                file.writelines(non_empty_lines)
+    @classmethod
+    def _remove_empty_lines(cls, file_path):
+        """
+        Removes empty lines from a file.
+
+        Args:
+            file_path: The path to the file to remove empty lines from, or an in-memory text stream.
 
+        Returns:
+            True if empty lines are successfully removed, False otherwise.
+        """
+
+        try:
+            cls._normalize_text_file(file_path, write=True)
             return True
         except Exception as e:
             print(f"An error occurred: {e}")
             return False
 
-    @staticmethod
-    def _remove_comments_from_file_according_to_regex(file_path, regex):
+    @classmethod
+    def _remove_comments_from_file_according_to_regex(cls, file_path, regex):
         """
-        Removes comments from a file based on a specified regex pattern.
+        Removes comments, and empty lines, from a file based on a specified regex pattern.
 
         Args:
-            file_path: The path to the file to remove comments from.
-            regex: The regular expression pattern to match comments.
+            file_path: The path to the file to remove comments from, or an in-memory text stream.
+            regex: The regular expression pattern, or compiled pattern, to match comments.
 
         Returns:
             True if comments are successfully removed, False otherwise.
         """
 
         try:
-            with open(file_path, 'r') as f:
-                lines = f.readlines()
-
-            # Regular expression to match comments in cron file
-            comment_pattern = re.compile(regex)
-
-            # Filter out lines that are not comments
-            lines = [line for line in lines if not comment_pattern.match(line)]
-
-            # Write the modified lines back to the file
-            with open(file_path, 'w') as f:
-                f.writelines(lines)
-
+            cls._normalize_text_file(file_path, re.compile(regex), write=True)
             return True
         except Exception as e:
             print(f"An error occurred: {e}")
@@ -146,7 +469,7 @@ class FileHelper:
             Result of removing comments from the bash file.
         """
 
-        return self._remove_comments_from_file_according_to_regex(bash_file_path, self._BASH_FILE_COMMENT_REGEX)
+        return self._remove_comments_from_file_according_to_regex(bash_file_path, self._BASH_FILE_COMMENT_PATTERN)
 
     def _remove_comments_from_cron_file(self, cron_file_path: Path):
         """
@@ -159,37 +482,135 @@ class FileHelper:
             Result of removing comments from the cron file.
         """
 
-        return self._remove_comments_from_file_according_to_regex(cron_file_path, self._CRON_FILE_COMMENT_REGEX)
+        return self._remove_comments_from_file_according_to_regex(cron_file_path, self._CRON_FILE_COMMENT_PATTERN)
 
     def _clean_up_cron_file(self, cron_file_path: Path):
         """
-        Cleans up a cron file by removing empty lines and comments.
+        Cleans up a cron file by removing empty lines and comments, without writing it back.
 
         Args:
-            cron_file_path: The path to the cron file to clean up.
+            cron_file_path: The path to the cron file to clean up, or an in-memory text stream.
 
         Returns:
-            None
+            The cleaned up content.
         """
 
-        self._remove_empty_lines(cron_file_path)
-        self._remove_comments_from_cron_file(cron_file_path)
+        return self._normalize_text_file(cron_file_path, self._CRON_FILE_COMMENT_PATTERN)
 
     def _clean_up_ordinary_file(self, ordinary_file_path: Path):
         """
-        Cleans up an ordinary file by removing empty lines.
+        Cleans up an ordinary file by removing empty lines, without writing it back.
 
         Args:
-            ordinary_file_path: The path to the ordinary file to clean up.
+            ordinary_file_path: The path to the ordinary file to clean up, or an in-memory text stream.
+
+        Returns:
+            The cleaned up content.
+        """
+
+        return self._normalize_text_file(ordinary_file_path)
+
+
+class PortAllocator:
+    """
+    Class leasing TCP ports out of a bounded pool so concurrent candidates never share a server port.
+
+    A lease is an exclusive flock on a per-port lock file: it is honoured by every thread and process of the
+    grading run, and the kernel drops it automatically if the process holding it crashes.
+
+    Methods:
+        lease(): Context manager leasing a free port of the pool.
+    """
+
+    _LOCKS_DIRECTORY = Path(tempfile.gettempdir()) / 'exam_corrector_ports'
+
+    def __init__(self, first_port: int, pool_size: int = 64, timeout: float = 60):
+        self.first_port = first_port
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+    @staticmethod
+    def _is_port_free(port):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind(('127.0.0.1', port))
+            except OSError:
+                return False
+        return True
+
+    def _try_lock_port(self, port):
+        self._LOCKS_DIRECTORY.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self._LOCKS_DIRECTORY / f'{port}.lock', 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        if not self._is_port_free(port):
+            # Held by a process foreign to the grading run
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+            return None
+        return lock_file
+
+    @contextlib.contextmanager
+    def lease(self):
+        """
+        Leases a free port of the pool, waiting for one to be released if they are all taken.
 
         Returns:
-            None
+            The leased port number, released when the context exits.
+
+        Raises:
+            TimeoutError: If no port was released before the allocator timeout.
         """
 
-        self._remove_empty_lines(ordinary_file_path)
+        deadline = time.monotonic() + self.timeout
+        delay = 0.01
+        while True:
+            for port in range(self.first_port, self.first_port + self.pool_size):
+                if lock_file := self._try_lock_port(port):
+                    try:
+                        yield port
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+                        lock_file.close()
+                    return
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No free port in [{self.first_port}, {self.first_port + self.pool_size})")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+
+@dataclass
+class ScriptExecution:
+    """
+    Outcome of a script execution.
+
+    Attributes:
+        returncode: The exit code of the script, negative if it was killed by a signal.
+        stdout: The beginning of the script standard output.
+        stderr: The beginning of the script standard error.
+        duration: The wall-clock duration of the execution, in seconds.
+        timed_out: Whether the script was killed because it exceeded its timeout.
+        truncated: Whether stdout or stderr were cut to the maximum output size.
+        resource_usage: The resources used by the script and the children it waited for.
+    """
+
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+    timed_out: bool
+    truncated: bool
+    resource_usage: ResourceUsage = None
 
 
 class ProcessRunnerHelper:
+    # Bounds the delay before noticing a script exited, when the system cannot notify it
+    _EXIT_POLL_INTERVAL = 0.05
+
     @staticmethod
     def _release_port(port):
         try:
@@ -206,29 +627,148 @@ class ProcessRunnerHelper:
             return f"Error while releasing port {port}: {e}"
 
     @staticmethod
-    def _run_script(script_file: Path, timeout=3) -> str:
+    def _open_exit_notifier(process):
+        # A pidfd becomes readable once the process exits, without reaping it
         try:
-            if not os.access(script_file, os.X_OK):
-                # Change the permission of the script file to make it executable
-                os.chmod(script_file, 0o755)  # 0o755 sets permission to rwxr-xr-x
-            # Execute the script with timeout
-            process = subprocess.Popen(['bash', script_file], stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
-            start_time = time.time()
-
-            while process.poll() is None:
-                time.sleep(0.1)
-                if time.time() - start_time > timeout:
-                    process.kill()
-                    return "Execution timed out after 3 seconds."
-
-            # Capture output
-            stdout, stderr = process.communicate()
+            return os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            return None
+
+    @staticmethod
+    def _has_exited(process):
+        # Does not reap the process, whose resource usage is collected by the sandbox
+        return os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+
+    @classmethod
+    def _capture_bounded_output(cls, process, timeout, max_output_size):
+        """
+        Reads the output of a process as it is written, until the process exits or the timeout expires.
+
+        Output beyond max_output_size bytes is read and discarded, so that the process never blocks on a full pipe.
+        Children left running in the background may keep the pipes open once the process exited, so only the output
+        already written at that time is read.
+
+        Args:
+            process: The process, started with piped stdout and stderr.
+            timeout: The number of seconds after which reading stops.
+            max_output_size: The maximum number of bytes kept per pipe.
+
+        Returns:
+            The kept stdout and stderr bytes, whether some output was discarded and whether the process was still
+            running when the timeout expired.
+        """
+
+        outputs = {process.stdout: bytearray(), process.stderr: bytearray()}
+        truncated = False
+        deadline = time.monotonic() + timeout
+        exit_notifier = cls._open_exit_notifier(process)
+        # Without exit notification, the exit of the process is checked between two reads
+        poll_interval = None if exit_notifier is not None else cls._EXIT_POLL_INTERVAL
+
+        def read(pipe):
+            nonlocal truncated
+            chunk = os.read(pipe.fileno(), 64 * 1024)
+            if not chunk:
+                selector.unregister(pipe)
+                return
+            output = outputs[pipe]
+            kept = chunk[:max(0, max_output_size - len(output))]
+            output += kept
+            truncated = truncated or len(kept) < len(chunk)
+
+        try:
+            with selectors.DefaultSelector() as selector:
+                for pipe in outputs:
+                    selector.register(pipe, selectors.EVENT_READ)
+                if exit_notifier is not None:
+                    selector.register(exit_notifier, selectors.EVENT_READ)
+                exited = False
+                while not exited and (remaining := deadline - time.monotonic()) > 0:
+                    for key, _ in selector.select(min(remaining, poll_interval or remaining)):
+                        if key.fileobj == exit_notifier:
+                            exited = True
+                        else:
+                            read(key.fileobj)
+                    exited = exited or (exit_notifier is None and cls._has_exited(process))
+                exited = exited or cls._has_exited(process)
+                if exited:
+                    if exit_notifier is not None:
+                        selector.unregister(exit_notifier)
+                    # Drains what is left in the pipes, without waiting for the children still holding them
+                    while time.monotonic() < deadline and (ready := selector.select(0)):
+                        for key, _ in ready:
+                            read(key.fileobj)
+        finally:
+            if exit_notifier is not None:
+                os.close(exit_notifier)
+        return bytes(outputs[process.stdout]), bytes(outputs[process.stderr]), truncated, not exited
+
+    @staticmethod
+    def _kill_process_group(process):
+        # The script runs in its own session, so its children (curl loops, background jobs) share its group
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(process.pid, signal.SIGKILL)
+
+    @classmethod
+    def _execute_script(cls, script_file: Path, timeout=3, max_output_size=64 * 1024, cwd=None,
+                        sandbox: Sandbox = None) -> ScriptExecution:
+        """
+        Executes a bash script in a sandbox, killing its whole process group once it exits or times out.
+
+        The script is timed out only if bash itself is still running at the deadline, background children it left
+        behind are killed along with the group without failing it.
+
+        Args:
+            script_file: The path to the script to execute.
+            timeout: The number of seconds after which the script is killed.
+            max_output_size: The maximum number of bytes of stdout and stderr kept.
+            cwd: The working directory of the script, defaults to a private one.
+            sandbox: The sandbox the script runs in, defaults to one with the default limits and no isolation.
+
+        Returns:
+            The ScriptExecution describing the run.
+        """
+
+        if not os.access(script_file, os.X_OK):
+            # Change the permission of the script file to make it executable
+            os.chmod(script_file, 0o755)  # 0o755 sets permission to rwxr-xr-x
+        sandbox = sandbox or Sandbox()
+        # An isolated script no longer sees /tmp, where candidates are extracted, but keeps its working directory
+        script_path = os.path.relpath(script_file, cwd) if cwd else os.path.abspath(script_file)
+        start_time = time.monotonic()
+        with profile_stage('execute_script'), sandbox.prepare(['bash', script_path], cwd) as (command, cwd, env):
+            process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, cwd=cwd, env=env, start_new_session=True)
+            try:
+                stdout, stderr, truncated, timed_out = cls._capture_bounded_output(process, timeout, max_output_size)
+            finally:
+                cls._kill_process_group(process)
+                resource_usage = sandbox.wait(process)
+                process.stdout.close()
+                process.stderr.close()
+        return ScriptExecution(
+            returncode=process.returncode,
+            stdout=stdout.decode(errors='replace'),
+            stderr=stderr.decode(errors='replace'),
+            duration=time.monotonic() - start_time,
+            timed_out=timed_out,
+            truncated=truncated,
+            resource_usage=resource_usage,
+        )
+
+    @classmethod
+    def _run_script(cls, script_file: Path, timeout=3) -> str:
+        try:
+            execution = cls._execute_script(script_file, timeout)
+
+            if execution.timed_out:
+                return f"Execution timed out after {timeout} seconds."
 
             # Check if there was any error during execution
-            if process.returncode != 0:
-                return f"Error: {stderr.decode()}"
+            if execution.returncode != 0:
+                return f"Error: {execution.stderr}"
 
             # Return the output
-            return stdout.decode()
+            return execution.stdout
         except Exception as e:
             return f"Error during execution: {e}"
@@ -1,26 +1,218 @@
 import argparse
+import hashlib
+from pathlib import Path
+
+from exams_correctors.batch_grader import BatchGrader, load_manifest
+from exams_correctors.grading_journal import GradingJournal
+from exams_correctors.result_sinks import (ColumnarResultSink, CsvResultSink, JsonLinesResultSink, LiveTableResultSink,
+                                          TableResultSink)
+from exams_correctors.registry import fetch_corrector_types, load_corrector
+from exams_correctors.results_store import ResultsStore
+from profiler import StageProfiler
+from sandbox import SandboxLimits
+
+
+def build_backend_corrector(corrector_type, args):
+    # Only the correctors of the selected exam types, and their dependencies, are ever imported
+    _, BackendCorrector = load_corrector(corrector_type)
+    # Every backend corrector picks its own options, the ones of plugins without any are built with their defaults
+    from_args = getattr(BackendCorrector, 'from_args', None)
+    return from_args(args) if from_args is not None else BackendCorrector()
+
+
+def name_cohort_path(path, cohort_name):
+    # Every cohort of a batch gets its own file next to the requested one, e.g. results.bash-session_1.jsonl
+    path = Path(path)
+    return path.with_name(f'{path.stem}.{cohort_name}{path.suffix}') if cohort_name else path
+
+
+def build_result_sinks(args, cohort_name=None):
+    # Watched folders are never done, their results are printed as they come
+    result_sinks = [LiveTableResultSink() if args.live or args.watch else TableResultSink(cohort_name)]
+    if args.output_jsonl:
+        result_sinks.append(JsonLinesResultSink(name_cohort_path(args.output_jsonl, cohort_name)))
+    if args.output_csv:
+        result_sinks.append(CsvResultSink(name_cohort_path(args.output_csv, cohort_name)))
+    if args.output_checks:
+        result_sinks.append(ColumnarResultSink(name_cohort_path(args.output_checks, cohort_name)))
+    return result_sinks
+
+
+def build_journal(args, exams_folder, corrector_type, cohort_name=None):
+    if args.journal:
+        journal_path = name_cohort_path(args.journal, cohort_name)
+    else:
+        exams_folder_digest = hashlib.sha256(str(Path(exams_folder).resolve()).encode()).hexdigest()[:16]
+        journal_path = Path(__file__).parent / '.journals' / f'{corrector_type}-{exams_folder_digest}.jsonl'
+    return GradingJournal(journal_path, resume=args.resume)
+
+
+def build_exam_corrector(args, exams_folder, corrector_type, backend_corrector, results_store, profiler,
+                         cohort_name=None, **options):
+    ExamCorrector, _ = load_corrector(corrector_type)
+    return ExamCorrector(
+        exams_folder, backend_corrector, args.show_only_failed_exams, args.engine, args.workers,
+        max_pending_candidates=args.max_pending, results_store=results_store, profiler=profiler,
+        result_sinks=build_result_sinks(args, cohort_name),
+        # Watched archives graded before a restart are found in the results store
+        journal=None if args.watch else build_journal(args, exams_folder, corrector_type, cohort_name),
+        deduplicate=not args.no_dedup,
+        **options)
+
+
+def serve(args, results_store):
+    # The HTTP server stack is only imported by the grading service
+    from exams_correctors.grading_daemon import GradingDaemon
+
+    # Every exam type is accepted, each one graded by a single long-lived corrector
+    backend_correctors = {corrector_type: build_backend_corrector(corrector_type, args)
+                          for corrector_type in fetch_corrector_types()}
+    result_sinks = [LiveTableResultSink()] if args.live else []
+    if args.output_jsonl:
+        result_sinks.append(JsonLinesResultSink(args.output_jsonl))
+    exam_correctors = {
+        corrector_type: load_corrector(corrector_type)[0](
+            args.uploads, backend_corrector, results_store=results_store, result_sinks=result_sinks,
+            owns_backend_corrector=False)
+        for corrector_type, backend_corrector in backend_correctors.items()
+    }
+    try:
+        GradingDaemon(exam_correctors, args.uploads, args.host, args.port, args.workers or 4,
+                      result_ttl=args.result_ttl).serve_forever()
+    finally:
+        for result_sink in result_sinks:
+            result_sink.close()
+        for backend_corrector in backend_correctors.values():
+            if close := getattr(backend_corrector, 'close', None):
+                close()
+
+
+def correct_batch(args, results_store, profiler):
+    cohorts = load_manifest(args.manifest, fetch_corrector_types())
+    # A single backend corrector per exam type, so that its local API, virtualenvs and workers are warmed once
+    backend_correctors = {
+        corrector_type: build_backend_corrector(corrector_type, args)
+        for corrector_type in {cohort.type for cohort in cohorts}
+    }
+
+    def create_exam_corrector(cohort, worker_budget):
+        # The batch profiler is active for the whole batch, cohorts do not switch it on and off
+        return build_exam_corrector(args, cohort.path, cohort.type, backend_correctors[cohort.type], results_store,
+                                    None, cohort.name, worker_budget=worker_budget, owns_backend_corrector=False)
+
+    if profiler is not None:
+        profiler.activate()
+    try:
+        BatchGrader(cohorts, create_exam_corrector, args.workers, args.concurrent_cohorts).run()
+    finally:
+        if profiler is not None:
+            profiler.deactivate()
+        for backend_corrector in backend_correctors.values():
+            if close := getattr(backend_corrector, 'close', None):
+                close()
 
-from backend_correctors.bash_linux.bash_linux_backend_correctors import SimpleBashLinuxBackendCorrector
-from backend_correctors.fastapi.fastapi_backend_correctors import SimpleFastApiBackendCorrector
-from exams_correctors.bash_linux.bash_linux_exam_correctors import BashLinuxExamCorrector
-from exams_correctors.fastapi.fastapi_exam_correctors import FastApiExamCorrector
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Bash Linux Exam Corrector')
-    parser.add_argument('path_to_exams_folder', help='Path to the exams folder')
-    parser.add_argument('--type', choices=['bash', 'fastapi'], default='bash',
-                        help='Type of corrector to use (default: bash)')
+    parser.add_argument('path_to_exams_folder', nargs='?', default=None, help='Path to the exams folder')
+    parser.add_argument('--manifest', default=None,
+                        help='Path of a JSON list of {"path", "type", "name"} cohorts to grade in a single run, '
+                             'instead of a single exams folder')
+    parser.add_argument('--concurrent-cohorts', type=int, default=2,
+                        help='Number of cohorts of the manifest graded at once (default: 2)')
+    parser.add_argument('--serve', action='store_true',
+                        help='Run a resident grading service, grading the archives uploaded to its local HTTP API as '
+                             'soon as they arrive, instead of an exams folder')
+    parser.add_argument('--host', default='127.0.0.1', help='Address the grading service listens on')
+    parser.add_argument('--port', type=int, default=8080, help='Port the grading service listens on (default: 8080)')
+    parser.add_argument('--uploads', default=Path(__file__).parent / '.uploads',
+                        help='Folder the grading service keeps the archives waiting to be graded in')
+    parser.add_argument('--result-ttl', type=float, default=3600,
+                        help='Number of seconds the grading service keeps a graded submission retrievable '
+                             '(default: 3600)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep watching the exams folder once graded, grading every archive landing in it or '
+                             'changing as soon as it is completely written')
+    parser.add_argument('--debounce', type=float, default=2.0,
+                        help='Number of seconds an archive must stay unchanged before being graded in watch mode '
+                             '(default: 2)')
+    parser.add_argument('--type', default='bash',
+                        help=f"Type of corrector to use, one of {', '.join(fetch_corrector_types(False))} or the "
+                             f"type of an installed plugin (default: bash)")
     parser.add_argument('--show-only-failed-exams', action='store_true',
                         help='Show only the failed exams')
+    parser.add_argument('--engine', choices=['thread', 'process'], default='thread',
+                        help='Run each candidate in a thread or in its own worker process (default: thread)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of candidates graded at once, across every cohort of the manifest '
+                             '(default: chosen by the executor)')
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='Maximum number of extracted candidates waiting to be graded (default: twice the workers)')
+    parser.add_argument('--results-cache', default=Path(__file__).parent / '.results_cache.sqlite',
+                        help='SQLite file storing the results of the graded archives (default: .results_cache.sqlite)')
+    parser.add_argument('--no-results-cache', action='store_true',
+                        help='Grade every archive again, even the ones already graded by this corrector version')
+    parser.add_argument('--expected-cron-interval', type=int, default=None,
+                        help='Number of seconds between two runs the cron schedules must fire at (bash exams only)')
+    parser.add_argument('--isolate-scripts', action='store_true',
+                        help='Run the candidate scripts in their own user and mount namespaces, with a private /tmp, '
+                             'when unprivileged namespaces are available (bash exams only)')
+    parser.add_argument('--script-cpu-time', type=int, default=SandboxLimits.cpu_time,
+                        help='Number of CPU seconds every process of a candidate script may use (bash exams only)')
+    parser.add_argument('--script-memory', type=int, default=SandboxLimits.memory // 1024 ** 2,
+                        help='Number of MiB of address space every process of a candidate script may use '
+                             '(bash exams only)')
+    parser.add_argument('--script-processes', type=int, default=None,
+                        help='Number of processes the candidate scripts may run, counted across every process and '
+                             'thread of the user running the grader, so only fit for a dedicated user (default: no '
+                             'limit, bash exams only)')
+    parser.add_argument('--profile', default=None,
+                        help='Path of the file the latency of every grading stage is written to')
+    parser.add_argument('--profile-format', choices=StageProfiler.FORMATS, default=StageProfiler.SUMMARY_FORMAT,
+                        help="Format of the profile: per-stage and per-candidate latencies, or a Chrome trace")
+    parser.add_argument('--output-jsonl', default=None,
+                        help='Path of a JSON lines file every result is appended to as soon as it is graded')
+    parser.add_argument('--output-csv', default=None,
+                        help='Path of a CSV file every result is appended to as soon as it is graded')
+    parser.add_argument('--output-checks', default=None,
+                        help='Path of a columnar file (.parquet if pyarrow is installed, JSON otherwise) the status, '
+                             'reason, duration and outputs of every file check are written to')
+    parser.add_argument('--live', action='store_true',
+                        help='Print every result as soon as it is graded instead of a single table at the end')
+    parser.add_argument('--no-dedup', action='store_true',
+                        help='Grade every candidate, even the ones whose files are identical to another candidate')
+    parser.add_argument('--resume', action='store_true',
+                        help='Resume the last run on the exams folder, skipping the candidates it already graded')
+    parser.add_argument('--journal', default=None,
+                        help='Path of the journal the graded candidates are checkpointed to, defaults to one per '
+                             'exams folder and exam type in .journals')
     args = parser.parse_args()
-
-    exams_folder = args.path_to_exams_folder
-    corrector_type = args.type
-
-    backend_corrector = SimpleBashLinuxBackendCorrector() if corrector_type == 'bash' else (
-        SimpleFastApiBackendCorrector())
-    ExamCorrector = BashLinuxExamCorrector if corrector_type == 'bash' else FastApiExamCorrector
+    if [args.path_to_exams_folder is not None, args.manifest is not None, args.serve].count(True) != 1:
+        parser.error('Either an exams folder, a manifest or --serve is required')
+    if args.watch and args.path_to_exams_folder is None:
+        parser.error('--watch requires an exams folder')
+    if args.path_to_exams_folder is not None:
+        try:
+            load_corrector(args.type)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.manifest and args.engine != 'thread':
+        parser.error('The cohorts of a manifest share their backend correctors, they are graded in threads only')
 
     # TODO check backend corrector typing
-    corrector = ExamCorrector(exams_folder, backend_corrector, args.show_only_failed_exams)
-    corrector.correct_candidate_files()
+    results_store = None if args.no_results_cache else ResultsStore(args.results_cache)
+    profiler = StageProfiler() if args.profile else None
+    if args.serve:
+        serve(args, results_store)
+    elif args.manifest:
+        correct_batch(args, results_store, profiler)
+    else:
+        backend_corrector = build_backend_corrector(args.type, args)
+        corrector = build_exam_corrector(args, args.path_to_exams_folder, args.type, backend_corrector,
+                                         results_store, profiler)
+        if args.watch:
+            corrector.watch_candidate_files(args.debounce)
+        else:
+            corrector.correct_candidate_files()
+    if profiler is not None:
+        profiler.export(args.profile, args.profile_format)
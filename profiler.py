@@ -0,0 +1,239 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+# The profiler the stages of the current process are recorded by, None when the run is not profiled
+_ACTIVE_PROFILER = None
+
+
+@dataclass
+class StageSpan:
+    """
+    A single timed execution of a grading stage.
+
+    Attributes:
+        stage: The name of the stage, e.g. 'extract' or 'correct_exam_file'.
+        candidate: The name of the candidate the stage ran for, None outside of any candidate.
+        start: The wall-clock start of the stage, in seconds since the epoch.
+        duration: The duration of the stage, in seconds.
+        pid: The id of the process the stage ran in.
+        tid: The id of the thread the stage ran in.
+    """
+
+    stage: str
+    candidate: str
+    start: float
+    duration: float
+    pid: int
+    tid: int
+
+
+class StageProfiler:
+    """
+    Collects the latency of the grading stages of a run, per candidate and in aggregate.
+
+    Stages are recorded with the module level profile_stage context manager, which does nothing but yield when no
+    profiler is active. The candidate a stage belongs to is tracked per thread.
+
+    Methods:
+        activate(): Makes the profiler record the stages of the current process.
+        deactivate(): Stops recording the stages of the current process.
+        candidate(name): Attributes the stages run by the current thread to a candidate.
+        add_spans(spans): Adds spans recorded by another process.
+        summarize(): Returns the count, p50, p95, max and total latency of every stage.
+        summarize_candidates(): Returns the total latency of every stage of every candidate.
+        export(path, trace_format): Writes the spans to a JSON summary or a Chrome trace file.
+    """
+
+    SUMMARY_FORMAT = 'summary'
+    CHROME_TRACE_FORMAT = 'chrome'
+    FORMATS = [SUMMARY_FORMAT, CHROME_TRACE_FORMAT]
+
+    def __init__(self):
+        self.spans = []
+        self._spans_lock = threading.Lock()
+        self._current_candidate = threading.local()
+
+    def __getstate__(self):
+        # Worker processes record their own spans, sent back with the candidates results
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def activate(self):
+        global _ACTIVE_PROFILER
+        _ACTIVE_PROFILER = self
+        return self
+
+    def deactivate(self):
+        global _ACTIVE_PROFILER
+        if _ACTIVE_PROFILER is self:
+            _ACTIVE_PROFILER = None
+
+    @contextlib.contextmanager
+    def candidate(self, name: str):
+        """
+        Attributes the stages run by the current thread to a candidate.
+
+        Args:
+            name: The name of the candidate.
+
+        Yields:
+            None
+        """
+
+        previous_candidate = getattr(self._current_candidate, 'name', None)
+        self._current_candidate.name = name
+        try:
+            yield
+        finally:
+            self._current_candidate.name = previous_candidate
+
+    def _record(self, stage: str, start: float, duration: float):
+        span = StageSpan(stage, getattr(self._current_candidate, 'name', None), start, duration, os.getpid(),
+                         threading.get_ident())
+        with self._spans_lock:
+            self.spans.append(span)
+
+    def add_spans(self, spans):
+        with self._spans_lock:
+            self.spans.extend(spans)
+
+    @staticmethod
+    def _percentile(sorted_durations, percent):
+        # Nearest-rank percentile
+        return sorted_durations[max(0, math.ceil(percent / 100 * len(sorted_durations)) - 1)]
+
+    def summarize(self):
+        """
+        Returns the latency distribution of every stage.
+
+        Returns:
+            A list of dictionaries holding the stage, its count, p50, p95, max and total latency in seconds, slowest
+            stages first.
+        """
+
+        durations = {}
+        for span in self.spans:
+            durations.setdefault(span.stage, []).append(span.duration)
+        summary = []
+        for stage, stage_durations in durations.items():
+            stage_durations.sort()
+            summary.append({
+                'stage': stage,
+                'count': len(stage_durations),
+                'p50': self._percentile(stage_durations, 50),
+                'p95': self._percentile(stage_durations, 95),
+                'max': stage_durations[-1],
+                'total': sum(stage_durations),
+            })
+        return sorted(summary, key=lambda stage_summary: stage_summary['total'], reverse=True)
+
+    def summarize_candidates(self):
+        """
+        Returns the time spent in every stage for every candidate.
+
+        Returns:
+            A dictionary mapping every candidate name to the total latency of each of its stages, in seconds.
+        """
+
+        candidates = {}
+        for span in self.spans:
+            if span.candidate is not None:
+                stages = candidates.setdefault(span.candidate, {})
+                stages[span.stage] = stages.get(span.stage, 0) + span.duration
+        return candidates
+
+    def _build_chrome_trace(self):
+        return {
+            'traceEvents': [
+                {
+                    'name': span.stage,
+                    'cat': 'grading',
+                    'ph': 'X',
+                    'ts': span.start * 1e6,
+                    'dur': span.duration * 1e6,
+                    'pid': span.pid,
+                    'tid': span.tid,
+                    'args': {'candidate': span.candidate},
+                }
+                for span in self.spans
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def export(self, path: Path, trace_format: str = SUMMARY_FORMAT):
+        """
+        Writes the profile of the run to a file.
+
+        Args:
+            path: The path of the profile file.
+            trace_format: 'summary' for the stages and candidates latencies and the raw spans, 'chrome' for a trace
+                loadable in chrome://tracing or Perfetto.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+
+        if trace_format == self.CHROME_TRACE_FORMAT:
+            profile = self._build_chrome_trace()
+        elif trace_format == self.SUMMARY_FORMAT:
+            profile = {
+                'stages': self.summarize(),
+                'candidates': self.summarize_candidates(),
+                'spans': [asdict(span) for span in self.spans],
+            }
+        else:
+            raise ValueError(f"Unknown profile format '{trace_format}', expected one of {self.FORMATS}")
+        with open(path, 'w') as file:
+            json.dump(profile, file, indent=2)
+
+
+@contextlib.contextmanager
+def profile_stage(stage: str):
+    """
+    Times a grading stage with the active profiler, if any.
+
+    Args:
+        stage: The name of the stage.
+
+    Yields:
+        None
+    """
+
+    profiler = _ACTIVE_PROFILER
+    if profiler is None:
+        yield
+        return
+    start, start_counter = time.time(), time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler._record(stage, start, time.perf_counter() - start_counter)
@@ -0,0 +1,184 @@
+# Copyright (c) 2024. THIS SOURCE CODE BELONGS TO DATASCIENTEST. ANY OUTSIDER REPLICATION OF IT IS LEGALLY
+# PERSECUTED
+#  _______      ___    ___ ________  _____ ______
+# |\  ___ \    |\  \  /  /|\   __  \|\   _ \  _   \
+# \ \   __/|   \ \  \/  / | \  \|\  \ \  \\\__\ \  \
+#  \ \  \_|/__  \ \    / / \ \   __  \ \  \\|__| \  \
+#   \ \  \_|\ \  /     \/   \ \  \ \  \ \  \    \ \  \
+#    \ \_______\/  /\   \    \ \__\ \__\ \__\    \ \__\
+#     \|_______/__/ /\ __\    \|__|\|__|\|__|     \|__|
+#              |__|/ \|__|
+#  ________  ________  ________  ________  _______   ________ _________  ________  ________
+# |\   ____\|\   __  \|\   __  \|\   __  \|\  ___ \ |\   ____\\___   ___\\   __  \|\   __  \
+# \ \  \___|\ \  \|\  \ \  \|\  \ \  \|\  \ \   __/|\ \  \___\|___ \  \_\ \  \|\  \ \  \|\  \
+#  \ \  \    \ \  \\\  \ \   _  _\ \   _  _\ \  \_|/_\ \  \       \ \  \ \ \  \\\  \ \   _  _\
+#   \ \  \____\ \  \\\  \ \  \\  \\ \  \\  \\ \  \_|\ \ \  \____   \ \  \ \ \  \\\  \ \  \\  \|
+#    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
+#     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
+#
+import contextlib
+import functools
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class SandboxLimits:
+    """
+    Resource limits of every process run in a sandbox, applied by the shell before the command is executed.
+
+    Attributes:
+        cpu_time: The CPU time of each process, in seconds.
+        memory: The address space of each process, in bytes.
+        processes: The number of processes, None for no limit. The kernel counts every process and thread of the
+            user running the grader, not only the ones of the command, so the limit only fits a dedicated user.
+        file_size: The size of every file written, in bytes.
+        open_files: The number of file descriptors of each process.
+    """
+
+    cpu_time: int = 10
+    memory: int = 512 * 1024 ** 2
+    processes: int = None
+    file_size: int = 16 * 1024 ** 2
+    open_files: int = 256
+
+    def to_ulimit_command(self):
+        # bash counts memory and file sizes in kibibytes
+        processes_option = f'-u {self.processes} ' if self.processes is not None else ''
+        return (f'ulimit -t {self.cpu_time} -v {self.memory // 1024} {processes_option}'
+                f'-f {self.file_size // 1024} -n {self.open_files}')
+
+
+@dataclass
+class ResourceUsage:
+    """
+    Resources used by a sandboxed process and by the children it waited for.
+
+    Attributes:
+        user_time: The CPU time spent in user mode, in seconds.
+        system_time: The CPU time spent in kernel mode, in seconds.
+        max_memory: The peak resident memory of the largest process, in bytes.
+    """
+
+    user_time: float
+    system_time: float
+    max_memory: int
+
+    @property
+    def cpu_time(self):
+        return self.user_time + self.system_time
+
+
+class Sandbox:
+    """
+    Runs untrusted candidate commands under resource limits, with a private temporary and working directory.
+
+    When isolation is requested and unprivileged user namespaces are available, the command also runs in its own
+    user and mount namespaces, where the private temporary directory is mounted over /tmp, and optionally in its own
+    network namespace. The network namespace only has a loopback interface that is down, cutting the command off any
+    local server.
+
+    Methods:
+        prepare(command, cwd): Context manager returning the sandboxed command, working directory and environment.
+        wait(process): Reaps a sandboxed process and returns its resource usage.
+    """
+
+    _SHELL = 'bash'
+
+    def __init__(self, limits: SandboxLimits = None, isolate: bool = False, isolate_network: bool = False):
+        self.limits = limits or SandboxLimits()
+        self.isolate = isolate
+        self.isolate_network = isolate_network
+
+    def fetch_settings(self):
+        return {**asdict(self.limits), 'isolate': self.is_isolated, 'isolate_network': self.isolate_network}
+
+    @staticmethod
+    def _build_namespaces_options(isolate_network):
+        return ['--user', '--map-root-user', '--mount'] + (['--net'] if isolate_network else [])
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _namespaces_are_available(cls, isolate_network: bool):
+        """
+        Tells whether unprivileged namespaces can be created and /tmp be mounted over in them.
+
+        Args:
+            isolate_network: Whether a network namespace is also needed.
+
+        Returns:
+            True if commands can be isolated, False otherwise.
+        """
+
+        if shutil.which('unshare') is None:
+            return False
+        with tempfile.TemporaryDirectory() as private_tmp:
+            probe = ['unshare', *cls._build_namespaces_options(isolate_network), '--',
+                     'mount', '--bind', private_tmp, '/tmp']
+            try:
+                return subprocess.run(probe, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                      timeout=10).returncode == 0
+            except (OSError, subprocess.TimeoutExpired):
+                return False
+
+    @property
+    def is_isolated(self):
+        return self.isolate and self._namespaces_are_available(self.isolate_network)
+
+    def _wrap_command(self, command):
+        setup = self.limits.to_ulimit_command()
+        if not self.is_isolated:
+            return [self._SHELL, '-c', f'{setup} && exec "$@"', 'sandbox', *command]
+        # Paths under /tmp are hidden by the mount, the command must refer to them relatively to its cwd
+        setup = f'mount --bind "$SANDBOX_TMPDIR" /tmp && {setup}'
+        return ['unshare', *self._build_namespaces_options(self.isolate_network), '--',
+                self._SHELL, '-c', f'{setup} && exec "$@"', 'sandbox', *command]
+
+    @contextlib.contextmanager
+    def prepare(self, command: list, cwd=None):
+        """
+        Prepares a private directory and the sandboxed form of a command, removed once the command is done.
+
+        Args:
+            command: The command to run.
+            cwd: The working directory of the command, defaults to a private one.
+
+        Yields:
+            The sandboxed command, its working directory and its environment.
+        """
+
+        sandbox_directory = tempfile.mkdtemp(prefix='sandbox_')
+        try:
+            private_tmp = os.path.join(sandbox_directory, 'tmp')
+            private_home = os.path.join(sandbox_directory, 'home')
+            os.mkdir(private_tmp)
+            os.mkdir(private_home)
+            environment = {
+                **os.environ,
+                'HOME': private_home,
+                'TMPDIR': '/tmp' if self.is_isolated else private_tmp,
+                'SANDBOX_TMPDIR': private_tmp,
+            }
+            yield self._wrap_command(command), cwd or private_home, environment
+        finally:
+            shutil.rmtree(sandbox_directory, ignore_errors=True)
+
+    @staticmethod
+    def wait(process: subprocess.Popen) -> ResourceUsage:
+        """
+        Reaps a sandboxed process, setting its return code, and returns its resource usage.
+
+        Args:
+            process: The process, which must not have been waited for yet.
+
+        Returns:
+            The ResourceUsage of the process and of the children it waited for.
+        """
+
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is in kibibytes on Linux
+        return ResourceUsage(rusage.ru_utime, rusage.ru_stime, rusage.ru_maxrss * 1024)
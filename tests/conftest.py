@@ -0,0 +1,124 @@
+import io
+import os
+import tarfile
+import threading
+import time
+
+import pytest
+
+from check_reports import report_check_failure
+
+EXAM_FILES = {"cron.txt": "* * * * * exam.sh\n", "sales.txt": "sales\n", "exam.sh": "exit 0\n"}
+
+
+class ScriptBackendCorrector:
+    """
+    Bash backend corrector grading the exam.sh of a candidate by its content, without running it.
+
+    A script containing 'exit 0' passes, 'raise' makes the backend corrector raise and 'report <reason>' fails it with
+    that reason, execution_error being a transient one. 'crash' kills the process grading it, to be graded by the
+    process engine only. The cron and sales files always pass.
+
+    Attributes:
+        graded_scripts: The content of every script graded by this instance, in the process that graded it.
+    """
+
+    TRANSIENT_FAILURE_REASONS = {'execution_error'}
+
+    def __init__(self):
+        self.graded_scripts = []
+
+    def correct_cron_file(self, cron_file):
+        return True
+
+    def correct_sales_file(self, sales_file):
+        return True
+
+    def correct_exam_file(self, script_file):
+        script = script_file.read_text()
+        self.graded_scripts.append(script)
+        if script.startswith('crash'):
+            os._exit(1)
+        if 'raise' in script:
+            raise RuntimeError('backend crashed')
+        if script.startswith('report '):
+            report_check_failure(script.split()[1])
+            return False
+        return 'exit 0' in script
+
+
+class SlowBackendCorrector(ScriptBackendCorrector):
+    """
+    Script backend corrector taking a while to check the cron files, keeping track of how many it checks at once.
+
+    Attributes:
+        max_grading: The largest number of cron files checked at once.
+        closed: Whether the backend corrector was closed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.grading = 0
+        self.max_grading = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def correct_cron_file(self, cron_file):
+        with self._lock:
+            self.grading += 1
+            self.max_grading = max(self.max_grading, self.grading)
+        time.sleep(0.05)
+        with self._lock:
+            self.grading -= 1
+        return True
+
+    def close(self):
+        self.closed = True
+
+
+def build_exam_archive(name, script="exit 0\n", files=None):
+    """
+    Builds the tar archive of a bash exam, its files in a folder named after the candidate.
+
+    Args:
+        name: The name of the candidate.
+        script: The content of its exam.sh.
+        files: The content of every file of the archive by file name, replacing the default files and script.
+
+    Returns:
+        The bytes of the archive.
+    """
+
+    archive_bytes = io.BytesIO()
+    with tarfile.open(fileobj=archive_bytes, mode="w") as archive:
+        for file_name, content in (files if files is not None else {**EXAM_FILES, "exam.sh": script}).items():
+            member = tarfile.TarInfo(f"{name}/{file_name}")
+            member.size = len(content.encode())
+            archive.addfile(member, io.BytesIO(content.encode()))
+    return archive_bytes.getvalue()
+
+
+def write_exam(folder, name, script="exit 0\n", files=None):
+    exam_file = folder / f"exam_{name}.tar"
+    exam_file.write_bytes(build_exam_archive(name, script, files))
+    return exam_file
+
+
+@pytest.fixture(name="build_exam_archive")
+def build_exam_archive_fixture():
+    return build_exam_archive
+
+
+@pytest.fixture(name="write_exam")
+def write_exam_fixture():
+    return write_exam
+
+
+@pytest.fixture
+def script_backend_corrector():
+    return ScriptBackendCorrector()
+
+
+@pytest.fixture
+def slow_backend_corrector():
+    return SlowBackendCorrector()
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from exams_correctors.bash_linux.bash_linux_exam_correctors import BashLinuxExamCorrector
+from exams_correctors.batch_grader import BatchGrader, Cohort, load_manifest
+from exams_correctors.result_sinks import MemoryResultSink
+
+
+@pytest.mark.parametrize("manifest, expected_error", [
+    ([{"path": "session_1", "type": "bash"}, {"path": "session_1", "type": "fastapi"}], None),
+    ({"path": "session_1", "type": "bash"}, "must be a list"),
+    ([{"type": "bash"}], "has no path"),
+    ([{"path": "session_1", "type": "mongo"}], "unknown type"),
+    ([{"path": "session_1", "type": "bash"}, {"path": "other/session_1", "type": "bash"}], "unique names"),
+], ids=["HappyPath-TwoTypes", "ErrorCase-NotAList", "ErrorCase-MissingPath", "ErrorCase-UnknownType",
+        "ErrorCase-DuplicateNames"])
+def test_load_manifest(manifest, expected_error, tmp_path):
+    # Arrange
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest))
+
+    # Act
+    if expected_error:
+        with pytest.raises(ValueError, match=expected_error):
+            load_manifest(manifest_path, ['bash', 'fastapi'])
+        return
+    cohorts = load_manifest(manifest_path, ['bash', 'fastapi'])
+
+    # Assert
+    assert cohorts == [Cohort('bash-session_1', tmp_path / 'session_1', 'bash'),
+                       Cohort('fastapi-session_1', tmp_path / 'session_1', 'fastapi')]
+
+
+def test_batch_grader_shares_worker_budget_and_backend_corrector(tmp_path, write_exam, slow_backend_corrector):
+    # Arrange
+    cohorts = []
+    for cohort_index in range(3):
+        folder = tmp_path / f"session_{cohort_index}"
+        folder.mkdir()
+        for candidate_index in range(4):
+            write_exam(folder, f"candidate{candidate_index}", f"exit {candidate_index}\n")
+        cohorts.append(Cohort(folder.name, folder, 'bash'))
+
+    def create_exam_corrector(cohort, worker_budget):
+        return BashLinuxExamCorrector(cohort.path, slow_backend_corrector, workers=4, result_sinks=[],
+                                      worker_budget=worker_budget, owns_backend_corrector=False)
+
+    # Act
+    summaries = BatchGrader(cohorts, create_exam_corrector, workers=2, max_concurrent_cohorts=3).run()
+
+    # Assert
+    assert [(summary['cohort'], summary['candidates']) for summary in summaries] == [
+        ('session_0', 4), ('session_1', 4), ('session_2', 4)]
+    assert slow_backend_corrector.max_grading <= 2
+    assert not slow_backend_corrector.closed
+
+
+def test_batch_grader_counts_results_hidden_from_the_sinks(tmp_path, write_exam, slow_backend_corrector):
+    # Arrange
+    folder = tmp_path / "session_1"
+    folder.mkdir()
+    write_exam(folder, "alice")
+    write_exam(folder, "bob", files={"sales.txt": "sales\n", "exam.sh": "exit 0\n"})
+    result_sink = MemoryResultSink()
+
+    def create_exam_corrector(cohort, worker_budget):
+        return BashLinuxExamCorrector(cohort.path, slow_backend_corrector, show_only_failed_exams=True,
+                                      result_sinks=[result_sink], worker_budget=worker_budget)
+
+    # Act
+    summaries = BatchGrader([Cohort(folder.name, folder, 'bash')], create_exam_corrector).run()
+
+    # Assert
+    assert [result['candidate_name'] for result in result_sink.results] == ['bob']
+    assert (summaries[0]['candidates'], summaries[0]['passed']) == (2, 1)
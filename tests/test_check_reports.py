@@ -0,0 +1,34 @@
+import pytest
+
+from check_reports import CheckReport, report_check_failure, report_check_output, run_check
+
+
+def test_report_check_failure_keeps_the_first_reason():
+    # Arrange & Act
+    with run_check('cron.txt') as check:
+        report_check_failure('invalid_cron_format', 'Error in line 1')
+        report_check_failure('invalid_cron_schedule')
+
+    # Assert
+    assert check.file == 'cron.txt'
+    assert (check.reason, check.detail) == ('invalid_cron_format', 'Error in line 1')
+    assert check.duration >= 0
+
+
+def test_report_check_output_is_truncated():
+    # Arrange & Act
+    with run_check('exam.sh') as check:
+        report_check_output('x' * 10_000, 'error')
+
+    # Assert
+    assert len(check.stdout) == CheckReport._MAX_EXCERPT_SIZE
+    assert check.stderr == 'error'
+
+
+@pytest.mark.parametrize("report", [
+    lambda: report_check_failure('script_failed'),
+    lambda: report_check_output('out', 'err'),
+], ids=["failure", "output"])
+def test_reports_outside_of_a_check_are_ignored(report):
+    # Arrange & Act & Assert
+    report()
@@ -0,0 +1,32 @@
+import pytest
+
+from benchmarks.cohort_generator import CohortGenerator
+from helpers import ArchiveFileHelper
+
+
+@pytest.mark.parametrize("archive_format", list(CohortGenerator.ARCHIVE_FORMATS))
+def test_generate_bash_cohort(archive_format, tmp_path):
+    # Arrange
+    generator = CohortGenerator(tmp_path / "cohort", seed=1)
+
+    # Act
+    cohort = generator.generate_bash_cohort(10, valid_ratio=0.7, archive_format=archive_format, nesting_depth=3)
+
+    # Assert
+    assert len(cohort) == 10
+    assert sum(cohort.values()) == 7
+    assert sorted(ArchiveFileHelper._fetch_archive_files_from_folder(tmp_path / "cohort")) == sorted(cohort)
+
+
+def test_generated_cohort_is_determined_by_seed(tmp_path):
+    # Arrange
+    first_generator = CohortGenerator(tmp_path / "first", seed=3)
+    second_generator = CohortGenerator(tmp_path / "second", seed=3)
+
+    # Act
+    first_cohort = first_generator.generate_fastapi_cohort(5, valid_ratio=0.4)
+    second_cohort = second_generator.generate_fastapi_cohort(5, valid_ratio=0.4)
+
+    # Assert
+    assert [(archive.name, passes) for archive, passes in first_cohort.items()] == \
+           [(archive.name, passes) for archive, passes in second_cohort.items()]
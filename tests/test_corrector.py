@@ -21,6 +21,7 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from exams_correctors.bash_linux.bash_linux_exam_correctors import BashLinuxExamCorrector
+from exams_correctors.result_sinks import MemoryResultSink
 from helpers import ArchiveFileHelper, ProcessRunnerHelper
 
 
@@ -97,3 +98,66 @@ def test_correct_candidate_files_error_cases(exception, expected_result):
     # Assert
     assert all(candidate['result'] == expected_result for candidate in
                result), "All candidates should fail due to file not found error"
+
+
+def test_process_engine_keeps_grading_after_a_candidate_raises(tmp_path, capsys, write_exam, script_backend_corrector):
+    # Arrange
+    write_exam(tmp_path, "alice", "exit 0\n")
+    write_exam(tmp_path, "bob", "raise\n")
+    result_sink = MemoryResultSink()
+    corrector = BashLinuxExamCorrector(tmp_path, script_backend_corrector, engine=BashLinuxExamCorrector.PROCESS_ENGINE,
+                                       workers=2, result_sinks=[result_sink], deduplicate=False)
+
+    # Act
+    corrector.correct_candidate_files()
+
+    # Assert
+    results = {result['candidate_name']: result for result in result_sink.results}
+    assert results['alice']['result'] == 'Passed'
+    assert results['bob']['result'] == 'Failed'
+    assert {check['reason'] for check in results['bob']['checks']} == {'grading_error'}
+    assert "An error occurred while grading exam_bob.tar: backend crashed" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("workers", [1, 4], ids=["single-worker", "several-workers"])
+def test_process_engine_fails_only_the_candidate_killing_its_worker(tmp_path, capsys, write_exam,
+                                                                    script_backend_corrector, workers):
+    # Arrange
+    for name in ("alice", "bob", "dave", "erin", "frank"):
+        write_exam(tmp_path, name, f"exit 0 # {name}\n")
+    write_exam(tmp_path, "carol", "crash\n")
+    result_sink = MemoryResultSink()
+    corrector = BashLinuxExamCorrector(tmp_path, script_backend_corrector, engine=BashLinuxExamCorrector.PROCESS_ENGINE,
+                                       workers=workers, result_sinks=[result_sink])
+
+    # Act
+    corrector.correct_candidate_files()
+
+    # Assert
+    results = {result['candidate_name']: result for result in result_sink.results}
+    assert {name: result['result'] for name, result in results.items()} == {
+        'alice': 'Passed', 'bob': 'Passed', 'carol': 'Failed', 'dave': 'Passed', 'erin': 'Passed', 'frank': 'Passed'}
+    assert {check['reason'] for check in results['carol']['checks']} == {'grading_error'}
+    assert "An error occurred while grading exam_carol.tar: the worker process" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("engine", [
+    BashLinuxExamCorrector.THREAD_ENGINE,
+    BashLinuxExamCorrector.PROCESS_ENGINE,
+], ids=["thread-engine", "process-engine"])
+def test_unreadable_archive_is_reported_as_failed(tmp_path, write_exam, script_backend_corrector, engine):
+    # Arrange
+    write_exam(tmp_path, "alice", "exit 0\n")
+    (tmp_path / "exam_bob.tar").write_bytes(b"not an archive")
+    result_sink = MemoryResultSink()
+    corrector = BashLinuxExamCorrector(tmp_path, script_backend_corrector, engine=engine, workers=2,
+                                       result_sinks=[result_sink])
+
+    # Act
+    corrector.correct_candidate_files()
+
+    # Assert
+    results = {result['candidate_name']: result for result in result_sink.results}
+    assert results['alice']['result'] == 'Passed'
+    assert results['bob']['result'] == 'Failed'
+    assert {check['reason'] for check in results['bob']['checks']} == {'unreadable_archive'}
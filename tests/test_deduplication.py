@@ -0,0 +1,41 @@
+from exams_correctors.bash_linux.bash_linux_exam_correctors import BashLinuxExamCorrector
+from exams_correctors.result_sinks import MemoryResultSink
+
+
+def test_identical_submissions_are_graded_once(tmp_path, write_exam, script_backend_corrector):
+    # Arrange
+    write_exam(tmp_path, "alice")
+    write_exam(tmp_path, "bob")
+    write_exam(tmp_path, "carol", "exit 1\n")
+    result_sink = MemoryResultSink()
+    corrector = BashLinuxExamCorrector(tmp_path, script_backend_corrector, result_sinks=[result_sink])
+
+    # Act
+    corrector.correct_candidate_files()
+
+    # Assert
+    results = {result['candidate_name']: result for result in result_sink.results}
+    assert len(script_backend_corrector.graded_scripts) == 2
+    assert {name: result['result'] for name, result in results.items()} == {
+        'alice': 'Passed', 'bob': 'Passed', 'carol': 'Failed'}
+    assert 'identical_to' not in results['alice']
+    assert results['bob']['identical_to'] == 'alice'
+    assert results['carol']['shared_files'] == {'cron.txt': ['alice', 'bob'], 'sales.txt': ['alice', 'bob']}
+
+
+def test_duplicates_are_reported_when_the_representative_raises(tmp_path, write_exam, script_backend_corrector):
+    # Arrange
+    write_exam(tmp_path, "alice", "raise\n")
+    write_exam(tmp_path, "bob", "raise\n")
+    result_sink = MemoryResultSink()
+    corrector = BashLinuxExamCorrector(tmp_path, script_backend_corrector, result_sinks=[result_sink])
+
+    # Act
+    corrector.correct_candidate_files()
+
+    # Assert
+    results = {result['candidate_name']: result for result in result_sink.results}
+    assert len(script_backend_corrector.graded_scripts) == 1
+    assert {name: result['result'] for name, result in results.items()} == {'alice': 'Failed', 'bob': 'Failed'}
+    assert {check['reason'] for check in results['bob']['checks']} == {'grading_error'}
+    assert results['bob']['identical_to'] == 'alice'
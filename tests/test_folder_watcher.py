@@ -0,0 +1,63 @@
+import threading
+import time
+
+from exams_correctors.bash_linux.bash_linux_exam_correctors import BashLinuxExamCorrector
+from exams_correctors.folder_watcher import FolderWatcher
+from exams_correctors.result_sinks import MemoryResultSink
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.02)
+
+
+def test_watch_yields_files_once_they_stopped_changing(tmp_path):
+    # Arrange
+    watcher = FolderWatcher(tmp_path, lambda: sorted(tmp_path.iterdir()), debounce=0.3, poll_interval=0.05)
+    stop_event, yielded_files = threading.Event(), []
+    thread = threading.Thread(target=lambda: yielded_files.extend(watcher.watch(stop_event)))
+    thread.start()
+
+    # Act
+    try:
+        with open(tmp_path / "exam_alice.tar", "w") as file:
+            for _ in range(5):
+                # Still being written
+                file.write("chunk")
+                file.flush()
+                time.sleep(0.1)
+                assert not yielded_files
+        wait_for(lambda: len(yielded_files) == 1)
+        (tmp_path / "exam_alice.tar").write_text("resubmitted")
+        wait_for(lambda: len(yielded_files) == 2)
+    finally:
+        stop_event.set()
+        thread.join()
+
+    # Assert
+    assert yielded_files == [tmp_path / "exam_alice.tar"] * 2
+
+
+def test_watch_candidate_files_grades_archives_as_they_land(tmp_path, write_exam, script_backend_corrector):
+    # Arrange
+    write_exam(tmp_path, "alice", "exit 0\n")
+    result_sink = MemoryResultSink()
+    corrector = BashLinuxExamCorrector(tmp_path, script_backend_corrector, result_sinks=[result_sink])
+    stop_event = threading.Event()
+    thread = threading.Thread(target=corrector.watch_candidate_files, args=(0.1, 0.05, stop_event))
+    thread.start()
+
+    # Act
+    try:
+        wait_for(lambda: len(result_sink.results) == 1)
+        write_exam(tmp_path, "bob", "exit 1\n")
+        wait_for(lambda: len(result_sink.results) == 2)
+    finally:
+        stop_event.set()
+        thread.join()
+
+    # Assert
+    assert [(result['candidate_name'], result['result']) for result in result_sink.results] == [
+        ('alice', 'Passed'), ('bob', 'Failed')]
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+import requests
+
+from exams_correctors.bash_linux.bash_linux_exam_correctors import BashLinuxExamCorrector
+from exams_correctors.grading_daemon import GradingDaemon, Submission
+
+
+@pytest.fixture
+def daemon(tmp_path, script_backend_corrector):
+    exam_corrector = BashLinuxExamCorrector(tmp_path, script_backend_corrector, result_sinks=[])
+    daemon = GradingDaemon({'bash': exam_corrector}, tmp_path / "uploads", port=0, workers=2).start()
+    yield daemon
+    daemon.stop()
+
+
+def wait_until_graded(base_url, location, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        submission = requests.get(base_url + location).json()
+        if submission['status'] not in (Submission.QUEUED, Submission.GRADING):
+            return submission
+        time.sleep(0.05)
+    raise TimeoutError(location)
+
+
+@pytest.mark.parametrize("script, expected_result", [
+    ("exit 0\n", "Passed"),
+    ("exit 1\n", "Failed"),
+], ids=["HappyPath-Passed", "HappyPath-Failed"])
+def test_submission_is_graded(daemon, build_exam_archive, script, expected_result):
+    # Arrange
+    base_url = f"http://127.0.0.1:{daemon.port}"
+
+    # Act
+    response = requests.post(f"{base_url}/submissions", params={"type": "bash", "candidate": "jane_doe"},
+                             data=build_exam_archive("candidate", script))
+    submission = wait_until_graded(base_url, response.headers["Location"])
+
+    # Assert
+    assert response.status_code == 202
+    assert submission['status'] == Submission.GRADED
+    assert submission['result']['candidate_name'] == 'jane-doe'
+    assert submission['result']['result'] == expected_result
+    assert not any(daemon.uploads_directory.iterdir())
+
+
+@pytest.mark.parametrize("method, path, params, expected_status", [
+    ("post", "/submissions", {"type": "mongo", "candidate": "jane"}, 400),
+    ("post", "/submissions", {"type": "bash"}, 400),
+    ("get", "/submissions/unknown", {}, 404),
+], ids=["ErrorCase-UnknownType", "ErrorCase-MissingCandidate", "ErrorCase-UnknownSubmission"])
+def test_invalid_requests_are_rejected(daemon, build_exam_archive, method, path, params, expected_status):
+    # Act
+    response = getattr(requests, method)(f"http://127.0.0.1:{daemon.port}{path}", params=params,
+                                         data=build_exam_archive("candidate") if method == "post" else None)
+
+    # Assert
+    assert response.status_code == expected_status
+    assert 'error' in response.json()
+
+
+@pytest.mark.parametrize("result_ttl, max_finished_submissions, expected_kept", [
+    (3600, 10, ["recent", "old"]),
+    (60, 10, ["recent"]),
+    (3600, 1, ["recent"]),
+], ids=["HappyPath-Kept", "EdgeCase-Expired", "EdgeCase-TooMany"])
+def test_finished_submissions_are_evicted(tmp_path, result_ttl, max_finished_submissions, expected_kept):
+    # Arrange
+    daemon = GradingDaemon({}, tmp_path / "uploads", result_ttl=result_ttl,
+                           max_finished_submissions=max_finished_submissions)
+    now = time.time()
+    daemon._submissions = {
+        "recent": Submission("recent", "bash", "jane", Submission.GRADED, graded_at=now - 10),
+        "old": Submission("old", "bash", "john", Submission.ERROR, graded_at=now - 600),
+        "queued": Submission("queued", "bash", "jack"),
+    }
+
+    # Act
+    kept = [submission_id for submission_id in ("recent", "old") if daemon.fetch(submission_id)]
+
+    # Assert
+    assert kept == expected_kept
+    assert daemon.fetch("queued") is not None
@@ -0,0 +1,71 @@
+import pytest
+
+from exams_correctors.bash_linux.bash_linux_exam_correctors import BashLinuxExamCorrector
+from exams_correctors.grading_journal import GradingJournal
+from exams_correctors.result_sinks import MemoryResultSink
+
+RESULT = {'candidate_name': 'alice', 'result': 'Passed', 'remarques supplémentaires': ''}
+
+
+@pytest.mark.parametrize("resume, corrector_version, expected_results", [
+    (True, 'v1', {'digest': RESULT}),
+    (True, 'v2', {}),
+    (False, 'v1', {}),
+], ids=["resume", "resume-other-version", "no-resume"])
+def test_journal_resumes_completed_results(resume, corrector_version, expected_results, tmp_path):
+    # Arrange
+    journal_path = tmp_path / "journal.jsonl"
+    journal = GradingJournal(journal_path)
+    journal.open('corrector', 'v1')
+    journal.record('digest', 'exam_alice.tar', RESULT)
+    journal.close()
+
+    # Act
+    completed_results = GradingJournal(journal_path, resume=resume).open('corrector', corrector_version)
+
+    # Assert
+    assert completed_results == expected_results
+
+
+def test_journal_ignores_entry_torn_by_a_crash(tmp_path):
+    # Arrange
+    journal_path = tmp_path / "journal.jsonl"
+    journal = GradingJournal(journal_path)
+    journal.open('corrector', 'v1')
+    journal.record('digest', 'exam_alice.tar', RESULT)
+    journal.close()
+    with open(journal_path, 'a') as file:
+        file.write('{"archive_digest": "other", "res')
+
+    # Act
+    resumed_journal = GradingJournal(journal_path, resume=True)
+    completed_results = resumed_journal.open('corrector', 'v1')
+    resumed_journal.close()
+
+    # Assert
+    assert completed_results == {'digest': RESULT}
+    assert len(journal_path.read_text().splitlines()) == 2
+
+
+
+@pytest.mark.parametrize("script, expected_gradings", [
+    ("report script_failed\n", 1),
+    ("report execution_error\n", 2),
+], ids=["HappyPath-CandidateFailure", "EdgeCase-TransientFailure"])
+def test_resumed_run_grades_transient_failures_again(tmp_path, write_exam, script_backend_corrector, script,
+                                                     expected_gradings):
+    # Arrange
+    exams_folder = tmp_path / "exams"
+    exams_folder.mkdir()
+    write_exam(exams_folder, "alice", script)
+    BashLinuxExamCorrector(exams_folder, script_backend_corrector, result_sinks=[],
+                           journal=GradingJournal(tmp_path / "journal.jsonl")).correct_candidate_files()
+    result_sink = MemoryResultSink()
+
+    # Act
+    BashLinuxExamCorrector(exams_folder, script_backend_corrector, result_sinks=[result_sink],
+                           journal=GradingJournal(tmp_path / "journal.jsonl", resume=True)).correct_candidate_files()
+
+    # Assert
+    assert len(script_backend_corrector.graded_scripts) == expected_gradings
+    assert [result['result'] for result in result_sink.results] == ['Failed']
@@ -16,13 +16,15 @@
 #    \ \_______\ \_______\ \__\\ _\\ \__\\ _\\ \_______\ \_______\  \ \__\ \ \_______\ \__\\ _\
 #     \|_______|\|_______|\|__|\|__|\|__|\|__|\|_______|\|_______|   \|__|  \|_______|\|__|\|__|
 #
+import io
+import re
 import tarfile
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
-from helpers import ArchiveFileHelper
+from helpers import ArchiveFileHelper, FileHelper, PortAllocator, ProcessRunnerHelper
 
 
 # Test _fetch_tar_files_from_folder method
@@ -85,3 +87,177 @@ def test_extract_tar_file(test_id, tar_file_setup, destination_setup, expected_o
     # Assert
     captured = capsys.readouterr()
     assert captured.out == expected_output
+
+
+# Test PortAllocator.lease method
+def test_port_allocator_leases_distinct_ports(tmp_path):
+    # Arrange
+    with patch.object(PortAllocator, "_LOCKS_DIRECTORY", tmp_path):
+        allocator = PortAllocator(first_port=47000, pool_size=4)
+
+        # Act
+        with allocator.lease() as port_1, allocator.lease() as port_2:
+            leased_ports = {port_1, port_2}
+        with allocator.lease() as port_3:
+            pass
+
+    # Assert
+    assert len(leased_ports) == 2
+    assert leased_ports <= set(range(47000, 47004))
+    assert port_3 in leased_ports
+
+
+def test_port_allocator_times_out_when_pool_exhausted(tmp_path):
+    # Arrange
+    with patch.object(PortAllocator, "_LOCKS_DIRECTORY", tmp_path):
+        allocator = PortAllocator(first_port=47010, pool_size=1, timeout=0.05)
+
+        # Act & Assert
+        with allocator.lease():
+            with pytest.raises(TimeoutError):
+                with allocator.lease():
+                    pass
+
+
+# Test _read_archive_members method
+def test_read_archive_members_materializes_only_executed_files(tmp_path):
+    # Arrange
+    archive_file = tmp_path / "exam_candidate.tar"
+    destination = tmp_path / "destination"
+    destination.mkdir()
+    with tarfile.open(archive_file, "w") as tar:
+        for name, content in [("exam_candidate/exam_jq/people.json", b"{}"),
+                              ("exam_candidate/exam_bash/cron.txt", b"* * * * * exam.sh\n"),
+                              ("exam_candidate/exam_bash/exam.sh", b"#!/bin/bash\n")]:
+            member = tarfile.TarInfo(name)
+            member.size = len(content)
+            tar.addfile(member, io.BytesIO(content))
+
+    # Act
+    members = ArchiveFileHelper._read_archive_members(archive_file, ["cron.txt", "exam.sh", "sales.txt"],
+                                                      destination, ["exam.sh"])
+
+    # Assert
+    assert set(members) == {"cron.txt", "exam.sh"}
+    assert members["cron.txt"].read() == "* * * * * exam.sh\n"
+    assert members["exam.sh"] == destination / "exam.sh"
+    assert [path.name for path in destination.iterdir()] == ["exam.sh"]
+
+
+# Test _detect_archive_format and _read_archive_members methods on compressed archives
+@pytest.mark.parametrize("archive_name, tar_mode, expected_format", [
+    ("exam.tar", "w", "tar"),
+    ("exam.tar.gz", "w:gz", "gz"),
+    ("exam.tar.bz2", "w:bz2", "bz2"),
+    ("exam.tar.xz", "w:xz", "xz"),
+    ("exam_without_suffix", "w:gz", "gz"),
+], ids=["plain-tar", "gzip-tar", "bzip2-tar", "xz-tar", "gzip-tar-without-suffix"])
+def test_read_compressed_archive_members(archive_name, tar_mode, expected_format, tmp_path):
+    # Arrange
+    archive_file = tmp_path / archive_name
+    with tarfile.open(archive_file, tar_mode) as tar:
+        member = tarfile.TarInfo("exam_candidate/sales.txt")
+        member.size = len(b"rtx3060: 5\n")
+        tar.addfile(member, io.BytesIO(b"rtx3060: 5\n"))
+
+    # Act
+    archive_format = ArchiveFileHelper._detect_archive_format(archive_file)
+    members = ArchiveFileHelper._read_archive_members(archive_file, ["sales.txt"], tmp_path, [])
+
+    # Assert
+    assert archive_format == expected_format
+    assert members["sales.txt"].read() == "rtx3060: 5\n"
+    assert ArchiveFileHelper._fetch_archive_files_from_folder(tmp_path) == [archive_file]
+
+
+# Test _fetch_archive_files_from_folder method on unreadable files
+def test_fetch_archive_files_from_folder_skips_unreadable_files(tmp_path, capsys):
+    # Arrange
+    (tmp_path / "exam_alice.tar").write_bytes(b"")
+    (tmp_path / "exam_bob").write_bytes(b"")
+
+    # Act
+    with patch.object(ArchiveFileHelper, "_detect_archive_format", side_effect=PermissionError("Permission denied")):
+        archive_files = ArchiveFileHelper._fetch_archive_files_from_folder(tmp_path)
+
+    # Assert
+    assert archive_files == [tmp_path / "exam_alice.tar"]
+    assert "exam_bob is skipped, it could not be read: Permission denied" in capsys.readouterr().out
+
+
+# Test _execute_script and _run_script methods
+@pytest.mark.parametrize("script, timeout, expected_returncode, expected_stdout, expected_timed_out", [
+    ("echo rtx3060: 5", 3, 0, "rtx3060: 5\n", False),
+    ("echo failure >&2; exit 3", 3, 3, "", False),
+    ("sleep 30 & echo started; sleep 30", 0.2, -9, "started\n", True),
+    ("sleep 30 & echo done; exit 0", 3, 0, "done\n", False),
+], ids=["happy-path", "error-exit-code", "timeout-kills-children", "background-child-outlives-script"])
+def test_execute_script(script, timeout, expected_returncode, expected_stdout, expected_timed_out, tmp_path):
+    # Arrange
+    script_file = tmp_path / "exam.sh"
+    script_file.write_text(script)
+
+    # Act
+    execution = ProcessRunnerHelper._execute_script(script_file, timeout=timeout)
+
+    # Assert
+    assert execution.returncode == expected_returncode
+    assert execution.stdout == expected_stdout
+    assert execution.timed_out == expected_timed_out
+    assert execution.duration < 5
+
+
+def test_execute_script_does_not_wait_for_background_children(tmp_path):
+    # Arrange
+    script_file = tmp_path / "exam.sh"
+    script_file.write_text("sleep 30 & echo done; exit 0")
+
+    # Act
+    execution = ProcessRunnerHelper._execute_script(script_file, timeout=10)
+
+    # Assert
+    assert execution.returncode == 0
+    assert not execution.timed_out
+    assert execution.stdout == "done\n"
+    assert execution.duration < 2
+
+
+def test_execute_script_bounds_captured_output(tmp_path):
+    # Arrange
+    script_file = tmp_path / "exam.sh"
+    script_file.write_text("yes | head -c 1000000")
+
+    # Act
+    execution = ProcessRunnerHelper._execute_script(script_file, max_output_size=1024)
+
+    # Assert
+    assert len(execution.stdout) == 1024
+    assert execution.truncated
+
+
+def test_run_script_reports_timeout(tmp_path):
+    # Arrange
+    script_file = tmp_path / "exam.sh"
+    script_file.write_text("sleep 30")
+
+    # Act
+    output = ProcessRunnerHelper._run_script(script_file, timeout=0.1)
+
+    # Assert
+    assert output == "Execution timed out after 0.1 seconds."
+
+
+@pytest.mark.parametrize("in_memory", [False, True], ids=["on-disk", "in-memory"])
+def test_normalize_text_file_strips_comments_and_rewrites_in_one_pass(in_memory, tmp_path):
+    # Arrange
+    content = "#!/bin/bash\n\n  # a comment\ncurl http://api:5000/rtx3060 >> /home/me/sales.txt\n"
+    script_file = io.StringIO(content) if in_memory else tmp_path / "exam.sh"
+    if not in_memory:
+        script_file.write_text(content)
+    rewrites = [(re.compile(r'>>\s*\S+'), '>> sales_1.txt')]
+
+    # Act
+    normalized = FileHelper._normalize_text_file(script_file, FileHelper._BASH_FILE_COMMENT_PATTERN, rewrites)
+
+    # Assert
+    assert normalized == "#!/bin/bash\ncurl http://api:5000/rtx3060 >> sales_1.txt\n"
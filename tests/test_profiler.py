@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from profiler import StageProfiler, profile_stage
+
+
+def test_profile_stage_records_nothing_without_active_profiler():
+    # Arrange
+    profiler = StageProfiler()
+
+    # Act
+    with profile_stage('extract'):
+        pass
+
+    # Assert
+    assert profiler.spans == []
+
+
+def test_profiler_summarizes_stages_per_candidate():
+    # Arrange
+    profiler = StageProfiler().activate()
+
+    # Act
+    try:
+        for candidate in ['alice', 'bob']:
+            with profiler.candidate(candidate):
+                with profile_stage('extract'):
+                    pass
+                with profile_stage('execute_script'):
+                    pass
+    finally:
+        profiler.deactivate()
+
+    # Assert
+    summary = {stage_summary['stage']: stage_summary for stage_summary in profiler.summarize()}
+    assert summary.keys() == {'extract', 'execute_script'}
+    assert summary['extract']['count'] == 2
+    assert summary['extract']['p50'] <= summary['extract']['p95'] <= summary['extract']['max']
+    assert profiler.summarize_candidates().keys() == {'alice', 'bob'}
+
+
+@pytest.mark.parametrize("trace_format, expected_key", [
+    (StageProfiler.SUMMARY_FORMAT, 'stages'),
+    (StageProfiler.CHROME_TRACE_FORMAT, 'traceEvents'),
+], ids=["summary", "chrome-trace"])
+def test_profiler_export(trace_format, expected_key, tmp_path):
+    # Arrange
+    profiler = StageProfiler().activate()
+    with profile_stage('walk'):
+        pass
+    profiler.deactivate()
+    profile_file = tmp_path / "profile.json"
+
+    # Act
+    profiler.export(profile_file, trace_format)
+
+    # Assert
+    assert len(json.loads(profile_file.read_text())[expected_key]) == 1
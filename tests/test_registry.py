@@ -0,0 +1,117 @@
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from exams_correctors.registry import CorrectorSpec, fetch_corrector_types, load_corrector, register_corrector
+
+PROJECT_DIRECTORY = Path(__file__).parent.parent
+# Cumulative import time of main.py, measured with -X importtime, which every command line run pays before parsing
+# its arguments
+IMPORT_TIME_BUDGET = 0.15
+
+
+def import_main(code=''):
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import main\n{code}'], cwd=PROJECT_DIRECTORY,
+                          capture_output=True, text=True, check=True)
+
+
+def test_main_does_not_import_any_corrector():
+    # Act
+    output = import_main("import sys; print(sorted(m for m in sys.modules if m.startswith('backend_correctors.') "
+                         "or m in ('croniter', 'requests', 'tqdm', 'tabulate', 'pyarrow')))").stdout
+
+    # Assert
+    assert output.strip() == '[]'
+
+
+def test_main_import_time_is_within_budget():
+    # Act
+    import_times = [
+        int(re.search(r'\|\s*(\d+) \| main$', import_main().stderr, re.MULTILINE).group(1)) / 1e6
+        for _ in range(3)
+    ]
+
+    # Assert
+    assert min(import_times) < IMPORT_TIME_BUDGET
+
+
+@pytest.mark.parametrize("corrector_type, expected_classes", [
+    ("bash", ("BashLinuxExamCorrector", "SimpleBashLinuxBackendCorrector")),
+    ("fastapi", ("FastApiExamCorrector", "SimpleFastApiBackendCorrector")),
+], ids=["HappyPath-Bash", "HappyPath-FastApi"])
+def test_load_corrector(corrector_type, expected_classes):
+    # Act
+    exam_corrector, backend_corrector = load_corrector(corrector_type)
+
+    # Assert
+    assert (exam_corrector.__name__, backend_corrector.__name__) == expected_classes
+
+
+def test_load_corrector_rejects_unknown_type():
+    # Act / Assert
+    with pytest.raises(ValueError, match="Unknown exam type 'cobol'"):
+        load_corrector('cobol')
+
+
+def test_registered_corrector_is_loaded(monkeypatch):
+    # Arrange
+    monkeypatch.setattr('exams_correctors.registry._CORRECTORS', {})
+    register_corrector('mongodb', CorrectorSpec('exams_correctors.mongo_db.mongodb_exam_correctors:MongoDbExamCorrector',
+                                                'backend_correctors.mongo_db.mongodb_backend_correctors:'
+                                                'MongoDbBackendCorrector'))
+
+    # Act
+    exam_corrector, backend_corrector = load_corrector('mongodb')
+
+    # Assert
+    assert 'mongodb' in fetch_corrector_types()
+    assert (exam_corrector.__name__, backend_corrector.__name__) == ('MongoDbExamCorrector', 'MongoDbBackendCorrector')
+
+
+class OptionsBackendCorrector:
+    def __init__(self, seed=0):
+        self.seed = seed
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(args.seed)
+
+
+class DefaultsBackendCorrector:
+    def __init__(self):
+        self.seed = None
+
+
+@pytest.mark.parametrize("backend_corrector_class, expected_seed", [
+    (OptionsBackendCorrector, 42),
+    (DefaultsBackendCorrector, None),
+], ids=["BuiltFromArgs", "BuiltWithDefaults"])
+def test_backend_corrector_is_built_by_its_own_class(monkeypatch, backend_corrector_class, expected_seed):
+    # Arrange
+    import main
+
+    monkeypatch.setattr(main, 'load_corrector', lambda corrector_type: (None, backend_corrector_class))
+
+    # Act
+    backend_corrector = main.build_backend_corrector('plugin', argparse.Namespace(seed=42))
+
+    # Assert
+    assert (type(backend_corrector), backend_corrector.seed) == (backend_corrector_class, expected_seed)
+
+
+def test_bash_backend_corrector_is_built_from_its_options():
+    # Arrange
+    _, backend_corrector_class = load_corrector('bash')
+    args = argparse.Namespace(expected_cron_interval=60, script_cpu_time=5, script_memory=64, script_processes=None,
+                              isolate_scripts=False)
+
+    # Act
+    backend_corrector = backend_corrector_class.from_args(args)
+
+    # Assert
+    assert backend_corrector.expected_cron_interval == 60
+    assert backend_corrector.fetch_grading_settings()['sandbox']['memory'] == 64 * 1024 ** 2
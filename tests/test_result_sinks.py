@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+
+import pytest
+
+from exams_correctors.result_sinks import ColumnarResultSink, CsvResultSink, JsonLinesResultSink, LiveTableResultSink
+
+RESULTS = [
+    {'candidate_name': 'alice', 'result': 'Passed', 'remarques supplémentaires': ''},
+    {'candidate_name': 'bob', 'result': 'Failed', 'remarques supplémentaires': 'cron.txt is incorrect\nexam.sh is incorrect'},
+]
+
+
+def read_json_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.parametrize("sink_class, read_results", [
+    (JsonLinesResultSink, read_json_lines),
+    (CsvResultSink, read_csv),
+], ids=["jsonl", "csv"])
+def test_file_result_sink_flushes_every_result(sink_class, read_results, tmp_path):
+    # Arrange
+    results_file = tmp_path / "results"
+    sink = sink_class(results_file)
+
+    # Act
+    sink.write(RESULTS[0])
+    written_before_close = read_results(results_file)
+    sink.write(RESULTS[1])
+    sink.close()
+
+    # Assert
+    assert written_before_close == RESULTS[:1]
+    assert read_results(results_file) == RESULTS
+
+
+def test_live_table_result_sink_prints_a_row_per_result():
+    # Arrange
+    stream = io.StringIO()
+    sink = LiveTableResultSink(stream)
+
+    # Act
+    for result in RESULTS:
+        sink.write(result)
+
+    # Assert
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 4
+    assert 'cron.txt is incorrect; exam.sh is incorrect' in lines[3]
+
+
+def test_columnar_result_sink_writes_a_row_per_check(tmp_path):
+    # Arrange
+    checks_file = tmp_path / "checks.json"
+    sink = ColumnarResultSink(checks_file)
+    result = {
+        **RESULTS[1],
+        'duration': 1.5,
+        'checks': [
+            {'file': 'cron.txt', 'status': 'failed', 'reason': 'invalid_cron_schedule', 'detail': None,
+             'duration': 0.1, 'stdout': '', 'stderr': ''},
+            {'file': 'exam.sh', 'status': 'passed', 'reason': None, 'detail': None, 'duration': 1.4, 'stdout': 'ok',
+             'stderr': ''},
+        ],
+    }
+
+    # Act
+    with sink:
+        sink.write(result)
+
+    # Assert
+    columns = json.loads(checks_file.read_text(encoding='utf-8'))
+    assert columns['candidate_name'] == ['bob', 'bob']
+    assert columns['reason'] == ['invalid_cron_schedule', None]
+    assert columns['stdout'] == ['', 'ok']
@@ -0,0 +1,42 @@
+import pytest
+
+from exams_correctors.bash_linux.bash_linux_exam_correctors import BashLinuxExamCorrector
+from exams_correctors.results_store import ResultsStore
+
+
+@pytest.mark.parametrize("lookup, expected_found", [
+    (("digest", "BashLinuxExamCorrector", "v1"), True),
+    (("other-digest", "BashLinuxExamCorrector", "v1"), False),
+    (("digest", "FastApiExamCorrector", "v1"), False),
+    (("digest", "BashLinuxExamCorrector", "v2"), False),
+], ids=["HappyPath-SameKey", "EdgeCase-ChangedArchive", "EdgeCase-OtherCorrector", "EdgeCase-NewCorrectorVersion"])
+def test_results_store_fetch(tmp_path, lookup, expected_found):
+    # Arrange
+    result = {'candidate_name': 'JACOB', 'result': 'Failed', 'remarques supplémentaires': 'sales.txt is incorrect'}
+    store = ResultsStore(tmp_path / "results.sqlite")
+    store.save("digest", "BashLinuxExamCorrector", "v1", result)
+
+    # Act
+    fetched = ResultsStore(tmp_path / "results.sqlite").fetch(*lookup)
+
+    # Assert
+    assert (fetched == result) if expected_found else fetched is None
+
+
+@pytest.mark.parametrize("reason, expected_stored", [
+    ("script_failed", True),
+    ("execution_error", False),
+], ids=["HappyPath-CandidateFailure", "EdgeCase-TransientFailure"])
+def test_transient_failures_are_not_stored(tmp_path, write_exam, script_backend_corrector, reason, expected_stored):
+    # Arrange
+    write_exam(tmp_path, "alice", f"report {reason}\n")
+    store = ResultsStore(tmp_path / "results.sqlite")
+    corrector = BashLinuxExamCorrector(tmp_path, script_backend_corrector, results_store=store, result_sinks=[])
+
+    # Act
+    corrector.correct_candidate_files()
+
+    # Assert
+    stored_result = store.fetch(corrector._fetch_archive_digest(tmp_path / "exam_alice.tar"),
+                                corrector._fetch_corrector_name(), corrector._fetch_corrector_version())
+    assert (stored_result is not None) == expected_stored
@@ -0,0 +1,69 @@
+import signal
+
+import pytest
+
+from helpers import ProcessRunnerHelper
+from sandbox import Sandbox, SandboxLimits
+
+
+@pytest.mark.parametrize("script, limits, expected_returncode", [
+    ("head -c 100000 /dev/zero > output", SandboxLimits(file_size=1024 ** 2), 0),
+    ("head -c 2000000 /dev/zero > output", SandboxLimits(file_size=1024 ** 2), 128 + signal.SIGXFSZ),
+    ("while :; do :; done", SandboxLimits(cpu_time=1), -signal.SIGKILL),
+], ids=["HappyPath-WithinLimits", "ErrorCase-FileTooLarge", "ErrorCase-CpuTimeExceeded"])
+def test_execute_script_in_sandbox_enforces_limits(script, limits, expected_returncode, tmp_path):
+    # Arrange
+    script_file = tmp_path / "exam.sh"
+    script_file.write_text(script)
+
+    # Act
+    execution = ProcessRunnerHelper._execute_script(script_file, timeout=10, cwd=tmp_path, sandbox=Sandbox(limits))
+
+    # Assert
+    assert execution.returncode == expected_returncode
+    assert not execution.timed_out
+
+
+def test_execute_script_in_sandbox_reports_resource_usage(tmp_path):
+    # Arrange
+    script_file = tmp_path / "exam.sh"
+    script_file.write_text("for i in $(seq 100000); do :; done")
+
+    # Act
+    execution = ProcessRunnerHelper._execute_script(script_file, cwd=tmp_path, sandbox=Sandbox())
+
+    # Assert
+    assert execution.returncode == 0
+    assert execution.resource_usage.cpu_time > 0
+    assert execution.resource_usage.max_memory > 0
+
+
+def test_execute_script_in_isolated_sandbox_gets_private_tmp(tmp_path):
+    # Arrange
+    sandbox = Sandbox(isolate=True)
+    if not sandbox.is_isolated:
+        pytest.skip("Unprivileged user namespaces are not available")
+    marker = f"sandbox_marker_{tmp_path.name}"
+    script_file = tmp_path / "exam.sh"
+    script_file.write_text(f"touch /tmp/{marker} && ls /tmp > listing")
+
+    # Act
+    execution = ProcessRunnerHelper._execute_script(script_file, cwd=tmp_path, sandbox=sandbox)
+
+    # Assert
+    assert execution.returncode == 0
+    assert (tmp_path / "listing").read_text() == f"{marker}\n"
+    assert not (tmp_path.parent / marker).exists()
+
+
+@pytest.mark.parametrize("limits, expected_option", [
+    (SandboxLimits(), None),
+    (SandboxLimits(processes=64), "-u 64"),
+], ids=["HappyPath-NoProcessLimitByDefault", "HappyPath-OptInProcessLimit"])
+def test_process_limit_is_opt_in(limits, expected_option):
+    # Act
+    ulimit_command = limits.to_ulimit_command()
+
+    # Assert
+    assert ("-u" in ulimit_command.split()) == (expected_option is not None)
+    assert expected_option is None or expected_option in ulimit_command